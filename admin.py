@@ -1,835 +1,1036 @@
-import base64
-import tempfile
-import os
-import sys
-import signal
-
-from PyQt5.QtWidgets import (
-    QApplication, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
-    QTableWidgetItem, QWidget, QSplitter, QTextEdit, QComboBox, QHeaderView,
-    QDialog, QMessageBox, QLineEdit, QFrame
-)
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QColor, QPalette, QFont
-
-from firebase_connection import ref
-from session_handler import load_session
-from jops_panel import JobManager
-from enhanced_dashboard import EnhancedDashboard
-from chatbot import FloatingChatBot, RecruitmentChatBot
-
-
-class EnhancedAdminPage(QWidget):
-    def __init__(self):
-        super().__init__()
-        session = load_session()
-        self.company_name = session.get("company_name", "")
-        self.setWindowTitle('🎯 Recruitmentify - نظام الإدارة الذكية')
-        self.setGeometry(50, 50, 1400, 800)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f5f5f5;
-                color: #333333;
-                font-family: 'Segoe UI', Tahoma, Arial, sans-serif;
-                font-size: 14px;
-            }
-        """)
-        self.additional_data = {}
-        self.current_row = None
-        self.setProperty("dark_theme", False)  # ابدأ بالوضع الفاتح
-
-        self.init_ui()
-        self.load_data()
-        
-        # تحديث تلقائي كل دقيقة
-        self.auto_refresh_timer = QTimer()
-        self.auto_refresh_timer.timeout.connect(self.load_data)
-        self.auto_refresh_timer.start(60000)
-
-    def init_ui(self):
-        main_layout = QVBoxLayout(self)
-        main_layout.setSpacing(15)
-        main_layout.setContentsMargins(20, 20, 20, 20)
-
-        # الترويسة المحسنة
-        header = self.create_modern_header()
-        main_layout.addWidget(header)
-
-        # شريط البحث والفلتر
-        search_filter_bar = self.create_search_filter_bar()
-        main_layout.addWidget(search_filter_bar)
-
-        # منطقة المحتوى الرئيسية
-        splitter = QSplitter(Qt.Horizontal)
-        
-        # الجزء الأيسر - الجدول
-        left_widget = self.create_table_section()
-        
-        # الجزء الأيمن - التفاصيل
-        right_widget = self.create_details_section()
-        
-        splitter.addWidget(left_widget)
-        splitter.addWidget(right_widget)
-        splitter.setSizes([800, 600])
-
-        main_layout.addWidget(splitter)
-
-        # إضافة زر الشات بوت العائم
-        self.add_floating_chatbot()
-
-    def create_modern_header(self):
-        """ترويسة حديثة وجميلة"""
-        header = QFrame()
-        header.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #667eea, stop:1 #764ba2);
-                border-radius: 12px;
-                padding: 20px;
-            }
-        """)
-        
-        layout = QHBoxLayout()
-        
-        # القسم الأيسر - العنوان والترحيب
-        left_section = QVBoxLayout()
-        
-        title = QLabel("🎯 نظام الإدارة الذكية للتوظيف")
-        title.setStyleSheet("color: white; font-size: 24px; font-weight: bold;")
-        
-        welcome = QLabel(f"مرحباً {self.company_name}")
-        welcome.setStyleSheet("color: #e0e0e0; font-size: 16px;")
-        
-        left_section.addWidget(title)
-        left_section.addWidget(welcome)
-        
-        layout.addLayout(left_section)
-        layout.addStretch()
-        
-        # القسم الأيمن - أزرار التنقل السريع
-        buttons_layout = QHBoxLayout()
-        buttons_layout.setSpacing(10)
-        
-        # زر لوحة التحكم
-        dashboard_btn = QPushButton("📊 لوحة التحكم")
-        dashboard_btn.setStyleSheet(self.header_button_style())
-        dashboard_btn.clicked.connect(self.open_dashboard)
-        
-        # زر الوظائف
-        jobs_btn = QPushButton("💼 إدارة الوظائف")
-        jobs_btn.setStyleSheet(self.header_button_style())
-        jobs_btn.clicked.connect(self.open_jobs_window)
-        
-        # زر التقارير
-        reports_btn = QPushButton("📈 التقارير")
-        reports_btn.setStyleSheet(self.header_button_style())
-        reports_btn.clicked.connect(self.show_reports)
-        
-        # زر الثيم
-        self.theme_btn = QPushButton("🌙 الوضع الداكن")
-        self.theme_btn.setStyleSheet(self.header_button_style())
-        self.theme_btn.clicked.connect(self.toggle_theme)
-        
-        buttons_layout.addWidget(dashboard_btn)
-        buttons_layout.addWidget(jobs_btn)
-        buttons_layout.addWidget(reports_btn)
-        buttons_layout.addWidget(self.theme_btn)
-        
-        layout.addLayout(buttons_layout)
-        
-        header.setLayout(layout)
-        header.setMinimumHeight(100)
-        
-        return header
-
-    def create_search_filter_bar(self):
-        """شريط البحث والفلترة"""
-        bar = QFrame()
-        bar.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 15px;
-            }
-        """)
-        
-        layout = QHBoxLayout()
-        
-        # البحث
-        search_label = QLabel("🔍 البحث:")
-        search_label.setStyleSheet("font-weight: bold; color: #555;")
-        
-        self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("ابحث بالاسم، البريد، أو الوظيفة...")
-        self.search_input.setStyleSheet("""
-            QLineEdit {
-                padding: 10px;
-                border: 2px solid #e0e0e0;
-                border-radius: 8px;
-                font-size: 14px;
-                background-color: #f9f9f9;
-            }
-            QLineEdit:focus {
-                border: 2px solid #667eea;
-                background-color: white;
-            }
-        """)
-        self.search_input.textChanged.connect(self.filter_table)
-        
-        # الفلتر حسب الحالة
-        filter_label = QLabel("🎯 الحالة:")
-        filter_label.setStyleSheet("font-weight: bold; color: #555;")
-        
-        self.filter_dropdown = QComboBox()
-        self.filter_dropdown.addItems(["الكل", "مقبول", "قيد المراجعة", "مرفوض"])
-        self.filter_dropdown.setStyleSheet(self.modern_combo_style())
-        self.filter_dropdown.currentTextChanged.connect(self.filter_table)
-        
-        # الترتيب
-        sort_label = QLabel("📊 الترتيب:")
-        sort_label.setStyleSheet("font-weight: bold; color: #555;")
-        
-        self.sort_dropdown = QComboBox()
-        self.sort_dropdown.addItems(["الاسم", "الوظيفة", "التقييم", "الحالة"])
-        self.sort_dropdown.setStyleSheet(self.modern_combo_style())
-        self.sort_dropdown.currentIndexChanged.connect(self.sort_table)
-        
-        # زر التحديث
-        refresh_btn = QPushButton("🔄 تحديث")
-        refresh_btn.setStyleSheet(self.action_button_style("#4CAF50"))
-        refresh_btn.clicked.connect(self.load_data)
-        
-        layout.addWidget(search_label)
-        layout.addWidget(self.search_input, 3)
-        layout.addWidget(filter_label)
-        layout.addWidget(self.filter_dropdown, 1)
-        layout.addWidget(sort_label)
-        layout.addWidget(self.sort_dropdown, 1)
-        layout.addWidget(refresh_btn)
-        
-        bar.setLayout(layout)
-        
-        return bar
-
-    def create_table_section(self):
-        """قسم الجدول"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        layout.setSpacing(15)
-        
-        # عنوان القسم
-        section_header = QFrame()
-        section_header.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 8px;
-                padding: 10px;
-            }
-        """)
-        
-        header_layout = QHBoxLayout()
-        
-        title = QLabel("📋 قائمة المتقدمين")
-        title.setStyleSheet("font-size: 18px; font-weight: bold; color: #333;")
-        
-        self.count_label = QLabel("(0 متقدم)")
-        self.count_label.setStyleSheet("font-size: 14px; color: #666;")
-        
-        header_layout.addWidget(title)
-        header_layout.addWidget(self.count_label)
-        header_layout.addStretch()
-        
-        # أزرار الإجراءات
-        export_btn = QPushButton("📥 تصدير")
-        export_btn.setStyleSheet(self.action_button_style("#2196F3"))
-        export_btn.clicked.connect(self.export_data)
-        
-        delete_btn = QPushButton("🗑️ حذف المحدد")
-        delete_btn.setStyleSheet(self.action_button_style("#F44336"))
-        delete_btn.clicked.connect(self.delete_selected)
-        
-        header_layout.addWidget(export_btn)
-        header_layout.addWidget(delete_btn)
-        
-        section_header.setLayout(header_layout)
-        
-        # الجدول
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["الاسم الكامل", "البريد الإلكتروني", "الوظيفة", "الحالة", "التقييم"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setStyleSheet(self.modern_table_style())
-        self.table.cellClicked.connect(self.show_resume_details)
-        
-        # رسالة لا توجد بيانات
-        self.no_resume_label = QLabel("📭 لا توجد طلبات حالياً")
-        self.no_resume_label.setStyleSheet("""
-            QLabel {
-                color: #999;
-                font-size: 16px;
-                font-style: italic;
-                padding: 40px;
-            }
-        """)
-        self.no_resume_label.setAlignment(Qt.AlignCenter)
-        self.no_resume_label.hide()
-        
-        layout.addWidget(section_header)
-        layout.addWidget(self.table)
-        layout.addWidget(self.no_resume_label)
-        
-        return widget
-
-    def create_details_section(self):
-        """قسم التفاصيل"""
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        layout.setSpacing(15)
-        
-        # ترويسة القسم
-        header_frame = QFrame()
-        header_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 8px;
-                padding: 15px;
-            }
-        """)
-        
-        header_layout = QHBoxLayout()
-        
-        self.details_label = QLabel("👤 تفاصيل المتقدم")
-        self.details_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #333;")
-        
-        header_layout.addWidget(self.details_label)
-        header_layout.addStretch()
-        
-        header_frame.setLayout(header_layout)
-        
-        # منطقة التفاصيل
-        self.details_text = QTextEdit()
-        self.details_text.setReadOnly(True)
-        self.details_text.setStyleSheet("""
-            QTextEdit {
-                background-color: white;
-                color: #333;
-                padding: 15px;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-                font-size: 14px;
-                line-height: 1.6;
-            }
-        """)
-        self.details_text.setPlaceholderText("اختر متقدماً لعرض التفاصيل...")
-        
-        # أزرار الإجراءات
-        actions_layout = QHBoxLayout()
-        
-        self.open_resume_btn = QPushButton("📄 فتح السيرة الذاتية")
-        self.open_resume_btn.setStyleSheet(self.action_button_style("#667eea"))
-        self.open_resume_btn.clicked.connect(self.open_resume)
-        
-        self.send_email_btn = QPushButton("📧 إرسال بريد")
-        self.send_email_btn.setStyleSheet(self.action_button_style("#9C27B0"))
-        self.send_email_btn.clicked.connect(self.send_email_to_applicant)
-        
-        actions_layout.addWidget(self.open_resume_btn)
-        actions_layout.addWidget(self.send_email_btn)
-        
-        layout.addWidget(header_frame)
-        layout.addWidget(self.details_text)
-        layout.addLayout(actions_layout)
-        
-        return widget
-
-    def add_floating_chatbot(self):
-        """إضافة زر الشات بوت العائم"""
-        self.chatbot_btn = FloatingChatBot(self)
-        self.chatbot_btn.move(self.width() - 80, self.height() - 80)
-
-    def resizeEvent(self, event):
-        """إعادة وضع زر الشات بوت عند تغيير حجم النافذة"""
-        super().resizeEvent(event)
-        if hasattr(self, 'chatbot_btn'):
-            self.chatbot_btn.move(self.width() - 80, self.height() - 80)
-
-    # وظائف الأزرار
-    def open_dashboard(self):
-        """فتح لوحة التحكم"""
-        self.dashboard_window = EnhancedDashboard()
-        self.dashboard_window.show()
-
-    def open_jobs_window(self):
-        """فتح نافذة الوظائف"""
-        self.jobs_window = JobManager()
-        self.jobs_window.show()
-
-    def show_reports(self):
-        """عرض التقارير"""
-        QMessageBox.information(self, "التقارير", 
-            "سيتم فتح صفحة التقارير المتقدمة قريباً!\n\n"
-            "الميزات القادمة:\n"
-            "• تقارير PDF شاملة\n"
-            "• تصدير Excel\n"
-            "• رسوم بيانية تحليلية\n"
-            "• إحصائيات مفصلة"
-        )
-
-    def export_data(self):
-        """تصدير البيانات"""
-        QMessageBox.information(self, "تصدير", 
-            "سيتم تصدير البيانات بصيغة Excel/CSV قريباً!"
-        )
-
-    def delete_selected(self):
-        """حذف العنصر المحدد"""
-        if self.current_row is None:
-            QMessageBox.warning(self, "تنبيه", "الرجاء اختيار متقدم أولاً.")
-            return
-        
-        reply = QMessageBox.question(self, 'تأكيد الحذف', 
-            'هل أنت متأكد من حذف هذا الطلب؟',
-            QMessageBox.Yes | QMessageBox.No)
-        
-        if reply == QMessageBox.Yes:
-            try:
-                firebase_key = self.additional_data[self.current_row]['firebase_key']
-                ref.child(firebase_key).delete()
-                QMessageBox.information(self, "نجح", "تم الحذف بنجاح!")
-                self.load_data()
-            except Exception as e:
-                QMessageBox.critical(self, "خطأ", f"فشل الحذف: {str(e)}")
-
-    def send_email_to_applicant(self):
-        """إرسال بريد إلكتروني للمتقدم"""
-        if self.current_row is None:
-            QMessageBox.warning(self, "تنبيه", "الرجاء اختيار متقدم أولاً.")
-            return
-        
-        email = self.table.item(self.current_row, 1).text()
-        QMessageBox.information(self, "إرسال بريد", 
-            f"سيتم فتح برنامج البريد الإلكتروني للتواصل مع:\n{email}\n\n"
-            "(هذه الميزة قيد التطوير)"
-        )
-
-    def toggle_theme(self):
-        """تبديل الثيم"""
-        is_dark = self.property("dark_theme")
-        
-        if not is_dark:
-            # تطبيق الثيم الداكن
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #1e1e1e;
-                    color: #e0e0e0;
-                }
-            """)
-            self.theme_btn.setText("☀️ الوضع الفاتح")
-        else:
-            # تطبيق الثيم الفاتح
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #f5f5f5;
-                    color: #333333;
-                }
-            """)
-            self.theme_btn.setText("🌙 الوضع الداكن")
-        
-        self.setProperty("dark_theme", not is_dark)
-
-    def filter_table(self):
-        """فلترة الجدول"""
-        search_text = self.search_input.text().lower()
-        status_filter = self.filter_dropdown.currentText()
-        
-        for row in range(self.table.rowCount()):
-            name = self.table.item(row, 0).text().lower()
-            email = self.table.item(row, 1).text().lower()
-            job = self.table.item(row, 2).text().lower()
-            status_widget = self.table.cellWidget(row, 3)
-            
-            # فحص البحث
-            search_match = (search_text in name or 
-                          search_text in email or 
-                          search_text in job)
-            
-            # فحص الحالة
-            if status_widget:
-                row_status = status_widget.currentText()
-                if status_filter == "الكل":
-                    status_match = True
-                else:
-                    status_match = (row_status == status_filter)
-            else:
-                status_match = True
-            
-            should_show = search_match and status_match
-            self.table.setRowHidden(row, not should_show)
-
-    def sort_table(self, index):
-        """ترتيب الجدول"""
-        rows = []
-        for row in range(self.table.rowCount()):
-            name = self.table.item(row, 0).text()
-            email = self.table.item(row, 1).text()
-            job = self.table.item(row, 2).text()
-            status = self.table.cellWidget(row, 3).currentText()
-            rating = self.table.item(row, 4).text()
-            additional_info = self.additional_data.get(row, {})
-            rows.append((name, email, job, status, rating, additional_info))
-
-        if index == 0:  # الاسم
-            rows.sort(key=lambda x: x[0])
-        elif index == 1:  # الوظيفة
-            rows.sort(key=lambda x: x[2])
-        elif index == 2:  # التقييم
-            rows.sort(key=lambda x: float(x[4]) if x[4].replace('.','').isdigit() else 0, reverse=True)
-        elif index == 3:  # الحالة
-            rows.sort(key=lambda x: x[3])
-
-        self.repopulate_table(rows)
-
-    def load_data(self):
-        """تحميل البيانات من Firebase"""
-        try:
-            current_company = self.company_name
-            if not current_company:
-                self.no_resume_label.setText("❌ لم يتم العثور على الشركة في الجلسة")
-                self.no_resume_label.show()
-                return
-
-            all_data = ref.get()
-
-            if all_data:
-                filtered_data = {
-                    key: resume for key, resume in all_data.items()
-                    if resume.get("company") == current_company
-                }
-                self.populate_table(filtered_data)
-            else:
-                self.no_resume_label.setText("📭 لا توجد بيانات في قاعدة البيانات")
-                self.no_resume_label.show()
-
-        except Exception as e:
-            error_msg = f"❌ خطأ في الاتصال بقاعدة البيانات:\n{str(e)}"
-            self.no_resume_label.setText(error_msg)
-            self.no_resume_label.show()
-            QMessageBox.critical(self, "خطأ", error_msg)
-
-    def populate_table(self, data):
-        """ملء الجدول بالبيانات"""
-        self.table.setRowCount(0)
-        self.additional_data.clear()
-        
-        if not data:
-            self.no_resume_label.show()
-            self.count_label.setText("(0 متقدم)")
-            return
-        
-        self.no_resume_label.hide()
-        self.count_label.setText(f"({len(data)} متقدم)")
-
-        for key, resume in data.items():
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-
-            # الاسم
-            name_item = QTableWidgetItem(resume.get('full_name', ''))
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row_position, 0, name_item)
-
-            # البريد
-            email_item = QTableWidgetItem(resume.get('email', ''))
-            email_item.setFlags(email_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row_position, 1, email_item)
-
-            # الوظيفة
-            job_item = QTableWidgetItem(resume.get('job', ''))
-            job_item.setFlags(job_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(row_position, 2, job_item)
-
-            # الحالة
-            status_dropdown = QComboBox()
-            status_dropdown.addItems(["مقبول", "قيد المراجعة", "مرفوض"])
-            
-            # تعيين الحالة الحالية
-            current_status = resume.get('status', 'Pending')
-            status_map = {
-                'Approved': 'مقبول',
-                'Pending': 'قيد المراجعة',
-                'Rejected': 'مرفوض'
-            }
-            status_dropdown.setCurrentText(status_map.get(current_status, 'قيد المراجعة'))
-            
-            status_dropdown.setStyleSheet(self.modern_combo_style())
-            status_dropdown.currentTextChanged.connect(
-                lambda status, row=row_position: self.update_status(row, status)
-            )
-            self.table.setCellWidget(row_position, 3, status_dropdown)
-
-            # التقييم
-            rating_item = QTableWidgetItem(str(resume.get('raiting', '0')))
-            rating_item.setFlags(rating_item.flags() & ~Qt.ItemIsEditable)
-            
-            # تلوين التقييم
-            try:
-                rating_value = float(resume.get('raiting', 0))
-                if rating_value >= 8:
-                    rating_item.setForeground(QColor("#4CAF50"))  # أخضر
-                elif rating_value >= 6:
-                    rating_item.setForeground(QColor("#FF9800"))  # برتقالي
-                else:
-                    rating_item.setForeground(QColor("#F44336"))  # أحمر
-            except:
-                pass
-            
-            self.table.setItem(row_position, 4, rating_item)
-
-            # حفظ البيانات الإضافية
-            self.additional_data[row_position] = {
-                'summary': resume.get('summary', ''),
-                'resume_data': resume.get('resume_data', ''),
-                'firebase_key': key
-            }
-
-    def repopulate_table(self, rows):
-        """إعادة ملء الجدول بعد الترتيب"""
-        self.table.setRowCount(0)
-        self.additional_data.clear()
-        
-        for i, (name, email, job, status, rating, additional_info) in enumerate(rows):
-            self.table.insertRow(i)
-
-            name_item = QTableWidgetItem(name)
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(i, 0, name_item)
-
-            email_item = QTableWidgetItem(email)
-            email_item.setFlags(email_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(i, 1, email_item)
-
-            job_item = QTableWidgetItem(job)
-            job_item.setFlags(job_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(i, 2, job_item)
-
-            status_dropdown = QComboBox()
-            status_dropdown.addItems(["مقبول", "قيد المراجعة", "مرفوض"])
-            status_dropdown.setCurrentText(status)
-            status_dropdown.setStyleSheet(self.modern_combo_style())
-            status_dropdown.currentTextChanged.connect(
-                lambda s, row=i: self.update_status(row, s)
-            )
-            self.table.setCellWidget(i, 3, status_dropdown)
-
-            rating_item = QTableWidgetItem(rating)
-            rating_item.setFlags(rating_item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(i, 4, rating_item)
-
-            self.additional_data[i] = additional_info
-
-    def update_status(self, row, new_status):
-        """تحديث الحالة في Firebase"""
-        firebase_key = self.additional_data[row]['firebase_key']
-        
-        # تحويل من العربية للإنجليزية
-        status_map = {
-            'مقبول': 'Approved',
-            'قيد المراجعة': 'Pending',
-            'مرفوض': 'Rejected'
-        }
-        
-        try:
-            ref.child(firebase_key).update({'status': status_map.get(new_status, 'Pending')})
-        except Exception as e:
-            QMessageBox.critical(self, "خطأ", f"فشل تحديث الحالة: {str(e)}")
-
-    def show_resume_details(self, row, column):
-        """عرض تفاصيل السيرة الذاتية"""
-        self.current_row = row
-        
-        name = self.table.item(row, 0).text()
-        email = self.table.item(row, 1).text()
-        job = self.table.item(row, 2).text()
-        status = self.table.cellWidget(row, 3).currentText()
-        rating = self.table.item(row, 4).text()
-        
-        additional_info = self.additional_data.get(row, {})
-        summary = additional_info.get('summary', 'لا يوجد ملخص')
-        
-        details_html = f"""
-        <div style='font-family: Arial; line-height: 1.8;'>
-            <h2 style='color: #667eea; border-bottom: 2px solid #667eea; padding-bottom: 10px;'>
-                معلومات المتقدم
-            </h2>
-            
-            <p><strong>👤 الاسم:</strong> {name}</p>
-            <p><strong>📧 البريد الإلكتروني:</strong> {email}</p>
-            <p><strong>💼 الوظيفة المطلوبة:</strong> {job}</p>
-            <p><strong>📊 الحالة:</strong> <span style='color: {"#4CAF50" if status == "مقبول" else "#FF9800" if status == "قيد المراجعة" else "#F44336"};'>{status}</span></p>
-            <p><strong>⭐ التقييم:</strong> {rating}/10</p>
-            
-            <h3 style='color: #667eea; margin-top: 20px;'>📝 الملخص:</h3>
-            <p style='background-color: #f9f9f9; padding: 15px; border-radius: 8px; border-left: 4px solid #667eea;'>
-                {summary}
-            </p>
-        </div>
-        """
-        
-        self.details_text.setHtml(details_html)
-
-    def open_resume(self):
-        """فتح السيرة الذاتية"""
-        if self.current_row is None:
-            QMessageBox.warning(self, "تنبيه", "الرجاء اختيار متقدم من الجدول أولاً.")
-            return
-        
-        additional_info = self.additional_data.get(self.current_row, {})
-        image_data = additional_info.get('resume_data', '')
-        
-        if not image_data:
-            QMessageBox.warning(self, "تنبيه", "لم يتم العثور على ملف السيرة الذاتية.")
-            return
-        
-        try:
-            decoded_data = base64.b64decode(image_data)
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(decoded_data)
-                temp_file_path = temp_file.name
-            
-            # فتح الملف حسب نظام التشغيل
-            if os.name == 'nt':  # Windows
-                os.startfile(temp_file_path)
-            elif sys.platform == 'darwin':  # macOS
-                os.system(f'open "{temp_file_path}"')
-            else:  # Linux
-                os.system(f'xdg-open "{temp_file_path}"')
-                
-            QMessageBox.information(self, "نجح", "تم فتح السيرة الذاتية بنجاح!")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "خطأ", f"فشل فتح الملف: {str(e)}")
-
-    # الأنماط CSS
-    def header_button_style(self):
-        return """
-            QPushButton {
-                background-color: rgba(255, 255, 255, 0.2);
-                color: white;
-                font-size: 13px;
-                font-weight: bold;
-                padding: 10px 20px;
-                border-radius: 8px;
-                border: 2px solid rgba(255, 255, 255, 0.3);
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 255, 255, 0.3);
-                border: 2px solid rgba(255, 255, 255, 0.5);
-            }
-            QPushButton:pressed {
-                background-color: rgba(255, 255, 255, 0.1);
-            }
-        """
-
-    def action_button_style(self, color):
-        return f"""
-            QPushButton {{
-                background-color: {color};
-                color: white;
-                font-size: 13px;
-                font-weight: bold;
-                padding: 10px 15px;
-                border-radius: 8px;
-                border: none;
-            }}
-            QPushButton:hover {{
-                opacity: 0.8;
-            }}
-            QPushButton:pressed {{
-                padding: 11px 14px 9px 16px;
-            }}
-        """
-
-    def modern_combo_style(self):
-        return """
-            QComboBox {
-                padding: 8px 12px;
-                border-radius: 6px;
-                border: 2px solid #e0e0e0;
-                background-color: white;
-                color: #333;
-                font-size: 13px;
-            }
-            QComboBox:hover {
-                border: 2px solid #667eea;
-            }
-            QComboBox::drop-down {
-                border: none;
-                padding-right: 10px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 5px solid #666;
-                margin-right: 5px;
-            }
-            QComboBox QAbstractItemView {
-                border: 2px solid #667eea;
-                background-color: white;
-                selection-background-color: #667eea;
-                selection-color: white;
-                padding: 5px;
-            }
-        """
-
-    def modern_table_style(self):
-        return """
-            QTableWidget {
-                background-color: white;
-                alternate-background-color: #f9f9f9;
-                gridline-color: #e0e0e0;
-                border-radius: 8px;
-                border: 1px solid #e0e0e0;
-            }
-            QTableWidget::item {
-                padding: 10px;
-                border: none;
-            }
-            QTableWidget::item:selected {
-                background-color: #667eea;
-                color: white;
-            }
-            QTableWidget::item:hover {
-                background-color: #f0f0ff;
-            }
-            QHeaderView::section {
-                background-color: #667eea;
-                color: white;
-                font-weight: bold;
-                padding: 12px;
-                border: none;
-                font-size: 14px;
-            }
-            QHeaderView::section:hover {
-                background-color: #5568d3;
-            }
-        """
-
-
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    
-    # تطبيق نمط عام
-    app.setStyle('Fusion')
-    
-    palette = QPalette()
-    palette.setColor(QPalette.Window, QColor("#f5f5f5"))
-    palette.setColor(QPalette.WindowText, QColor("#333333"))
-    app.setPalette(palette)
-    
-    window = EnhancedAdminPage()
-    window.show()
-    
+import tempfile
+import os
+import sys
+import signal
+
+from PyQt5.QtWidgets import (
+    QApplication, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView,
+    QAbstractItemView, QWidget, QSplitter, QTextEdit, QComboBox, QHeaderView,
+    QDialog, QMessageBox, QLineEdit, QFrame, QCheckBox
+)
+from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
+from PyQt5.QtGui import QColor, QPalette, QFont
+
+from firebase_connection import reference
+from queries import change_stamp, change_feed_entry, delete_applicant
+from local_cache import applicant_record, get_cache
+from applicants_model import (
+    ApplicantTableModel, ApplicantFilterProxy, StatusDelegate, KeyRole,
+    NAME_COLUMN, EMAIL_COLUMN, JOB_COLUMN, STATUS_COLUMN, RATING_COLUMN, STATUS_LABELS
+)
+from facets import RATING_BAND_LABELS, RATING_BAND_ORDER
+from resume_store import load_resume_bytes
+from search_index import SearchIndex
+from realtime import company_applicants_stream
+from stats_store import record_removed, record_status_changed
+from session_handler import load_session
+
+
+# ارتفاع ثابت للصفوف حتى لا يقيس العرض كل صف
+ROW_HEIGHT = 36
+
+# إذا تغير أكثر من هذه النسبة من السجلات يُعاد بناء فهرس البحث بدل تحديثه سجلاً بسجل
+INDEX_REBUILD_RATIO = 0.25
+
+# قوائم الفلترة: (الوجه في facets.py، العنوان)
+FACET_FILTERS = [
+    ("job", "💼 الوظيفة:"),
+    ("status", "🎯 الحالة:"),
+    ("rating", "⭐ التقييم:"),
+    ("month", "📅 شهر التقديم:"),
+]
+
+# البحث بعد توقف الكتابة بدل كل حرف
+SEARCH_DEBOUNCE_MS = 150
+
+# خيارات الترتيب: (العمود، الاتجاه)
+SORT_OPTIONS = [
+    # الاسم
+    [(NAME_COLUMN, Qt.AscendingOrder), (EMAIL_COLUMN, Qt.AscendingOrder)],
+    # الوظيفة ثم الأعلى تقييماً داخلها
+    [(JOB_COLUMN, Qt.AscendingOrder), (RATING_COLUMN, Qt.DescendingOrder), (NAME_COLUMN, Qt.AscendingOrder)],
+    # التقييم
+    [(RATING_COLUMN, Qt.DescendingOrder), (NAME_COLUMN, Qt.AscendingOrder)],
+    # الحالة ثم الأعلى تقييماً داخلها
+    [(STATUS_COLUMN, Qt.AscendingOrder), (RATING_COLUMN, Qt.DescendingOrder), (NAME_COLUMN, Qt.AscendingOrder)],
+]
+
+
+class EnhancedAdminPage(QWidget):
+    def __init__(self):
+        super().__init__()
+        session = load_session()
+        self.company_name = session.get("company_name", "")
+        self.setWindowTitle('🎯 Recruitmentify - نظام الإدارة الذكية')
+        self.setGeometry(50, 50, 1400, 800)
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #f5f5f5;
+                color: #333333;
+                font-family: 'Segoe UI', Tahoma, Arial, sans-serif;
+                font-size: 14px;
+            }
+        """)
+        self.current_key = None
+        self.setProperty("dark_theme", False)  # ابدأ بالوضع الفاتح
+
+        self.change_stream = None
+        self.cache = get_cache()
+        self.search_index = SearchIndex()
+
+        self.init_ui()
+        
+        # عرض النسخة المحلية فوراً قبل أي اتصال بالشبكة
+        if self.company_name:
+            self.populate_table(self.cache.applicants(self.company_name))
+        
+        # تحديثات فورية بدل التحديث الدوري كل دقيقة
+        if not self.company_name:
+            self.load_data()
+        else:
+            try:
+                self.start_change_stream()
+            except Exception as e:
+                print(f"⚠️ Realtime updates unavailable: {e}")
+                self.change_stream = None
+                self.load_data()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setSpacing(15)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+
+        # الترويسة المحسنة
+        header = self.create_modern_header()
+        main_layout.addWidget(header)
+
+        # شريط البحث والفلتر
+        search_filter_bar = self.create_search_filter_bar()
+        main_layout.addWidget(search_filter_bar)
+
+        # منطقة المحتوى الرئيسية
+        splitter = QSplitter(Qt.Horizontal)
+        
+        # الجزء الأيسر - الجدول
+        left_widget = self.create_table_section()
+        
+        # الجزء الأيمن - التفاصيل
+        right_widget = self.create_details_section()
+        
+        splitter.addWidget(left_widget)
+        splitter.addWidget(right_widget)
+        splitter.setSizes([800, 600])
+
+        main_layout.addWidget(splitter)
+
+        # زر الشات بوت العائم يُضاف بعد ظهور النافذة
+        QTimer.singleShot(0, self.add_floating_chatbot)
+
+    def create_modern_header(self):
+        """ترويسة حديثة وجميلة"""
+        header = QFrame()
+        header.setStyleSheet("""
+            QFrame {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+                    stop:0 #667eea, stop:1 #764ba2);
+                border-radius: 12px;
+                padding: 20px;
+            }
+        """)
+        
+        layout = QHBoxLayout()
+        
+        # القسم الأيسر - العنوان والترحيب
+        left_section = QVBoxLayout()
+        
+        title = QLabel("🎯 نظام الإدارة الذكية للتوظيف")
+        title.setStyleSheet("color: white; font-size: 24px; font-weight: bold;")
+        
+        welcome = QLabel(f"مرحباً {self.company_name}")
+        welcome.setStyleSheet("color: #e0e0e0; font-size: 16px;")
+        
+        left_section.addWidget(title)
+        left_section.addWidget(welcome)
+        
+        layout.addLayout(left_section)
+        layout.addStretch()
+        
+        # القسم الأيمن - أزرار التنقل السريع
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setSpacing(10)
+        
+        # زر لوحة التحكم
+        dashboard_btn = QPushButton("📊 لوحة التحكم")
+        dashboard_btn.setStyleSheet(self.header_button_style())
+        dashboard_btn.clicked.connect(self.open_dashboard)
+        
+        # زر الوظائف
+        jobs_btn = QPushButton("💼 إدارة الوظائف")
+        jobs_btn.setStyleSheet(self.header_button_style())
+        jobs_btn.clicked.connect(self.open_jobs_window)
+        
+        # زر التقارير
+        reports_btn = QPushButton("📈 التقارير")
+        reports_btn.setStyleSheet(self.header_button_style())
+        reports_btn.clicked.connect(self.show_reports)
+        
+        # زر الثيم
+        self.theme_btn = QPushButton("🌙 الوضع الداكن")
+        self.theme_btn.setStyleSheet(self.header_button_style())
+        self.theme_btn.clicked.connect(self.toggle_theme)
+        
+        buttons_layout.addWidget(dashboard_btn)
+        buttons_layout.addWidget(jobs_btn)
+        buttons_layout.addWidget(reports_btn)
+        buttons_layout.addWidget(self.theme_btn)
+        
+        layout.addLayout(buttons_layout)
+        
+        header.setLayout(layout)
+        header.setMinimumHeight(100)
+        
+        return header
+
+    def create_search_filter_bar(self):
+        """شريط البحث والفلترة"""
+        bar = QFrame()
+        bar.setStyleSheet("""
+            QFrame {
+                background-color: white;
+                border-radius: 10px;
+                padding: 15px;
+            }
+        """)
+        
+        layout = QHBoxLayout()
+        
+        # البحث
+        search_label = QLabel("🔍 البحث:")
+        search_label.setStyleSheet("font-weight: bold; color: #555;")
+        
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("ابحث بالاسم، البريد، أو الوظيفة...")
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                padding: 10px;
+                border: 2px solid #e0e0e0;
+                border-radius: 8px;
+                font-size: 14px;
+                background-color: #f9f9f9;
+            }
+            QLineEdit:focus {
+                border: 2px solid #667eea;
+                background-color: white;
+            }
+        """)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_table)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        
+        # البحث داخل ملخصات الـ AI بترتيب الصلة بدل الاسم والبريد والوظيفة
+        self.summary_search_check = QCheckBox("📝 داخل الملخصات")
+        self.summary_search_check.setToolTip(
+            'بحث مرتب داخل ملخصات التقييم: "عبارة كاملة" أو بادئة*'
+        )
+        self.summary_search_check.setEnabled(self.cache.summary_search)
+        self.summary_search_check.toggled.connect(self.on_summary_search_toggled)
+        
+        # تنبيه عندما تكون نتائج البحث في الملخصات أكثر من الحد المعروض
+        self.search_notice = QLabel()
+        self.search_notice.setStyleSheet("color: #F44336; font-weight: bold;")
+        self.search_notice.hide()
+        
+        # الفلاتر حسب الوجه، وبجانب كل خيار عدد المتقدمين المطابقين
+        facet_layout = QHBoxLayout()
+        self.facet_dropdowns = {}
+        for facet, title in FACET_FILTERS:
+            facet_label = QLabel(title)
+            facet_label.setStyleSheet("font-weight: bold; color: #555;")
+            
+            dropdown = QComboBox()
+            dropdown.addItem("الكل")
+            dropdown.setStyleSheet(self.modern_combo_style())
+            dropdown.currentIndexChanged.connect(lambda _: self.filter_table())
+            self.facet_dropdowns[facet] = dropdown
+            
+            facet_layout.addWidget(facet_label)
+            facet_layout.addWidget(dropdown, 1)
+        
+        # الترتيب
+        sort_label = QLabel("📊 الترتيب:")
+        sort_label.setStyleSheet("font-weight: bold; color: #555;")
+        
+        self.sort_dropdown = QComboBox()
+        self.sort_dropdown.addItems(["الاسم", "الوظيفة", "التقييم", "الحالة"])
+        self.sort_dropdown.setStyleSheet(self.modern_combo_style())
+        self.sort_dropdown.currentIndexChanged.connect(self.sort_table)
+        
+        # زر التحديث
+        refresh_btn = QPushButton("🔄 تحديث")
+        refresh_btn.setStyleSheet(self.action_button_style("#4CAF50"))
+        refresh_btn.clicked.connect(self.load_data)
+        
+        layout.addWidget(search_label)
+        layout.addWidget(self.search_input, 3)
+        layout.addWidget(self.summary_search_check)
+        layout.addWidget(self.search_notice)
+        layout.addWidget(sort_label)
+        layout.addWidget(self.sort_dropdown, 1)
+        layout.addWidget(refresh_btn)
+        
+        bar_layout = QVBoxLayout()
+        bar_layout.addLayout(layout)
+        bar_layout.addLayout(facet_layout)
+        bar.setLayout(bar_layout)
+        
+        return bar
+
+    def create_table_section(self):
+        """قسم الجدول"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(15)
+        
+        # عنوان القسم
+        section_header = QFrame()
+        section_header.setStyleSheet("""
+            QFrame {
+                background-color: white;
+                border-radius: 8px;
+                padding: 10px;
+            }
+        """)
+        
+        header_layout = QHBoxLayout()
+        
+        title = QLabel("📋 قائمة المتقدمين")
+        title.setStyleSheet("font-size: 18px; font-weight: bold; color: #333;")
+        
+        self.count_label = QLabel("(0 متقدم)")
+        self.count_label.setStyleSheet("font-size: 14px; color: #666;")
+        
+        header_layout.addWidget(title)
+        header_layout.addWidget(self.count_label)
+        header_layout.addStretch()
+        
+        # أزرار الإجراءات
+        export_btn = QPushButton("📥 تصدير")
+        export_btn.setStyleSheet(self.action_button_style("#2196F3"))
+        export_btn.clicked.connect(self.export_data)
+        
+        delete_btn = QPushButton("🗑️ حذف المحدد")
+        delete_btn.setStyleSheet(self.action_button_style("#F44336"))
+        delete_btn.clicked.connect(self.delete_selected)
+        
+        header_layout.addWidget(export_btn)
+        header_layout.addWidget(delete_btn)
+        
+        section_header.setLayout(header_layout)
+        
+        # الجدول (model/view: لا يُنشأ أي widget لكل صف)
+        self.model = ApplicantTableModel(self)
+        self.model.statusChangeRequested.connect(self.update_status)
+        self.proxy = ApplicantFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setItemDelegateForColumn(
+            STATUS_COLUMN, StatusDelegate(self.modern_combo_style(), self.table)
+        )
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # الضغط على عنوان عمود يرتب به، و Shift + ضغط يضيفه كترتيب ثانوي
+        self.table.horizontalHeader().setSortIndicatorShown(True)
+        self.table.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
+        self.table.verticalHeader().hide()
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked
+        )
+        self.table.setStyleSheet(self.modern_table_style())
+        self.table.clicked.connect(self.show_resume_details)
+        
+        # رسالة لا توجد بيانات
+        self.no_resume_label = QLabel("📭 لا توجد طلبات حالياً")
+        self.no_resume_label.setStyleSheet("""
+            QLabel {
+                color: #999;
+                font-size: 16px;
+                font-style: italic;
+                padding: 40px;
+            }
+        """)
+        self.no_resume_label.setAlignment(Qt.AlignCenter)
+        self.no_resume_label.hide()
+        
+        layout.addWidget(section_header)
+        layout.addWidget(self.table)
+        layout.addWidget(self.no_resume_label)
+        
+        return widget
+
+    def create_details_section(self):
+        """قسم التفاصيل"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(15)
+        
+        # ترويسة القسم
+        header_frame = QFrame()
+        header_frame.setStyleSheet("""
+            QFrame {
+                background-color: white;
+                border-radius: 8px;
+                padding: 15px;
+            }
+        """)
+        
+        header_layout = QHBoxLayout()
+        
+        self.details_label = QLabel("👤 تفاصيل المتقدم")
+        self.details_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #333;")
+        
+        header_layout.addWidget(self.details_label)
+        header_layout.addStretch()
+        
+        header_frame.setLayout(header_layout)
+        
+        # منطقة التفاصيل
+        self.details_text = QTextEdit()
+        self.details_text.setReadOnly(True)
+        self.details_text.setStyleSheet("""
+            QTextEdit {
+                background-color: white;
+                color: #333;
+                padding: 15px;
+                border-radius: 8px;
+                border: 1px solid #e0e0e0;
+                font-size: 14px;
+                line-height: 1.6;
+            }
+        """)
+        self.details_text.setPlaceholderText("اختر متقدماً لعرض التفاصيل...")
+        
+        # أزرار الإجراءات
+        actions_layout = QHBoxLayout()
+        
+        self.open_resume_btn = QPushButton("📄 فتح السيرة الذاتية")
+        self.open_resume_btn.setStyleSheet(self.action_button_style("#667eea"))
+        self.open_resume_btn.clicked.connect(self.open_resume)
+        
+        self.send_email_btn = QPushButton("📧 إرسال بريد")
+        self.send_email_btn.setStyleSheet(self.action_button_style("#9C27B0"))
+        self.send_email_btn.clicked.connect(self.send_email_to_applicant)
+        
+        actions_layout.addWidget(self.open_resume_btn)
+        actions_layout.addWidget(self.send_email_btn)
+        
+        layout.addWidget(header_frame)
+        layout.addWidget(self.details_text)
+        layout.addLayout(actions_layout)
+        
+        return widget
+
+    def add_floating_chatbot(self):
+        """إضافة زر الشات بوت العائم"""
+        try:
+            from chatbot import FloatingChatBot
+        except ImportError as e:
+            print(f"⚠️ Chatbot unavailable: {e}")
+            return
+        
+        self.chatbot_btn = FloatingChatBot(self)
+        self.chatbot_btn.show()
+        self.chatbot_btn.move(self.width() - 80, self.height() - 80)
+
+    def resizeEvent(self, event):
+        """إعادة وضع زر الشات بوت عند تغيير حجم النافذة"""
+        super().resizeEvent(event)
+        if hasattr(self, 'chatbot_btn'):
+            self.chatbot_btn.move(self.width() - 80, self.height() - 80)
+
+    # وظائف الأزرار
+    def open_dashboard(self):
+        """فتح لوحة التحكم"""
+        from dashboard import EnhancedDashboard
+        
+        self.dashboard_window = EnhancedDashboard()
+        self.dashboard_window.show()
+
+    def open_jobs_window(self):
+        """فتح نافذة الوظائف"""
+        from jops_panel import JobManager
+        
+        self.jobs_window = JobManager()
+        self.jobs_window.show()
+
+    def show_reports(self):
+        """عرض التقارير"""
+        QMessageBox.information(self, "التقارير", 
+            "سيتم فتح صفحة التقارير المتقدمة قريباً!\n\n"
+            "الميزات القادمة:\n"
+            "• تقارير PDF شاملة\n"
+            "• تصدير Excel\n"
+            "• رسوم بيانية تحليلية\n"
+            "• إحصائيات مفصلة"
+        )
+
+    def export_data(self):
+        """تصدير البيانات"""
+        QMessageBox.information(self, "تصدير", 
+            "سيتم تصدير البيانات بصيغة Excel/CSV قريباً!"
+        )
+
+    def delete_selected(self):
+        """حذف العنصر المحدد"""
+        info = self.current_record()
+        if info is None:
+            QMessageBox.warning(self, "تنبيه", "الرجاء اختيار متقدم أولاً.")
+            return
+
+        reply = QMessageBox.question(self, 'تأكيد الحذف',
+            'هل أنت متأكد من حذف هذا الطلب؟',
+            QMessageBox.Yes | QMessageBox.No)
+
+        if reply == QMessageBox.Yes:
+            try:
+                delete_applicant(self.current_key, info.get('company', self.company_name))
+                record_removed(info)
+                QMessageBox.information(self, "نجح", "تم الحذف بنجاح!")
+                # الحذف يصل عبر التحديثات الفورية
+                if self.change_stream is None:
+                    self.load_data()
+            except Exception as e:
+                QMessageBox.critical(self, "خطأ", f"فشل الحذف: {str(e)}")
+
+    def send_email_to_applicant(self):
+        """إرسال بريد إلكتروني للمتقدم"""
+        info = self.current_record()
+        if info is None:
+            QMessageBox.warning(self, "تنبيه", "الرجاء اختيار متقدم أولاً.")
+            return
+
+        email = info.get('email', '')
+        QMessageBox.information(self, "إرسال بريد", 
+            f"سيتم فتح برنامج البريد الإلكتروني للتواصل مع:\n{email}\n\n"
+            "(هذه الميزة قيد التطوير)"
+        )
+
+    def toggle_theme(self):
+        """تبديل الثيم"""
+        is_dark = self.property("dark_theme")
+        
+        if not is_dark:
+            # تطبيق الثيم الداكن
+            self.setStyleSheet("""
+                QWidget {
+                    background-color: #1e1e1e;
+                    color: #e0e0e0;
+                }
+            """)
+            self.theme_btn.setText("☀️ الوضع الفاتح")
+        else:
+            # تطبيق الثيم الفاتح
+            self.setStyleSheet("""
+                QWidget {
+                    background-color: #f5f5f5;
+                    color: #333333;
+                }
+            """)
+            self.theme_btn.setText("🌙 الوضع الداكن")
+        
+        self.setProperty("dark_theme", not is_dark)
+
+    def filter_table(self):
+        """فلترة الجدول من فهرس البحث في الذاكرة (تحديث واحد للـ proxy)"""
+        self.search_timer.stop()
+        search_text = self.search_input.text().strip()
+        
+        selections = {}
+        for facet, dropdown in self.facet_dropdowns.items():
+            if dropdown.currentIndex() > 0:
+                selections[facet] = {dropdown.currentData()}
+        
+        if self.summary_search_check.isChecked() and search_text:
+            # نتائج مرتبة حسب BM25 من فهرس الملخصات المحلي
+            matches, truncated = self.cache.search_summaries(self.company_name, search_text)
+            ranked = [key for key, _ in matches]
+            if truncated:
+                self.search_notice.setText(f"⚠️ أفضل {len(ranked)} نتيجة فقط")
+                self.search_notice.setToolTip("نتائج أخرى لم تُعرض: أضف كلمات أو عبارة لتضييق البحث")
+            self.search_notice.setVisible(truncated)
+            visible_keys, counts = self.search_index.search("", selections, within=ranked)
+            self.proxy.set_visible_keys(visible_keys)
+            self.proxy.set_ranking({key: rank for rank, key in enumerate(ranked)})
+        else:
+            self.search_notice.hide()
+            visible_keys, counts = self.search_index.search(search_text, selections)
+            self.proxy.set_ranking(None)
+            self.proxy.set_visible_keys(visible_keys)
+        
+        self.update_facet_dropdowns(counts)
+
+    def facet_label(self, facet, value):
+        """النص المعروض لقيمة وجه"""
+        if value is None:
+            return "غير محدد"
+        if facet == "status":
+            return STATUS_LABELS.get(value, value)
+        if facet == "rating":
+            return RATING_BAND_LABELS.get(value, value)
+        return str(value)
+
+    def facet_values(self, facet, counts):
+        """ترتيب خيارات الوجه في القائمة"""
+        if facet == "status":
+            order = list(STATUS_LABELS)
+        elif facet == "rating":
+            order = RATING_BAND_ORDER
+        else:
+            # الأشهر الأحدث أولاً، والوظائف أبجدياً (غير المحدد في الآخر)
+            order = sorted((v for v in counts if v is not None), reverse=(facet == "month"))
+        values = [v for v in order if v in counts]
+        values += [v for v in counts if v not in values]
+        return values
+
+    def update_facet_dropdowns(self, counts):
+        """
+        تحديث خيارات قوائم الفلترة وأعدادها من نتيجة البحث (بدون المرور على الصفوف)
+        
+        Args:
+            counts: {وجه: {قيمة: عدد}} من SearchIndex.search
+        """
+        dropped = False
+        for facet, dropdown in self.facet_dropdowns.items():
+            facet_counts = counts.get(facet, {})
+            values = self.facet_values(facet, facet_counts)
+            selected = dropdown.currentData() if dropdown.currentIndex() > 0 else None
+            
+            dropdown.blockSignals(True)
+            current = [dropdown.itemData(i) for i in range(1, dropdown.count())]
+            if current != values:
+                # القيم تغيرت (وظيفة أو شهر جديد): إعادة بناء القائمة مع الحفاظ على الاختيار
+                had_selection = dropdown.currentIndex() > 0
+                keep = had_selection and selected in values
+                while dropdown.count() > 1:
+                    dropdown.removeItem(1)
+                for value in values:
+                    dropdown.addItem("", value)
+                dropdown.setCurrentIndex(values.index(selected) + 1 if keep else 0)
+                dropped = dropped or (had_selection and not keep)
+            
+            dropdown.setItemText(0, f"الكل ({sum(facet_counts.values())})")
+            for i, value in enumerate(values, start=1):
+                dropdown.setItemText(i, f"{self.facet_label(facet, value)} ({facet_counts[value]})")
+            dropdown.blockSignals(False)
+        
+        if dropped:
+            # القيمة المختارة لم تعد موجودة (حُذف آخر متقدم بها): إعادة الفلترة بدونها
+            self.filter_table()
+
+    def on_summary_search_toggled(self, checked):
+        """التبديل بين البحث في البيانات الأساسية والبحث داخل الملخصات"""
+        if checked:
+            self.search_input.setPlaceholderText('ابحث داخل الملخصات: مهارة، "عبارة كاملة"، أو بادئة*')
+        else:
+            self.search_input.setPlaceholderText("ابحث بالاسم، البريد، أو الوظيفة...")
+        self.filter_table()
+
+    def sort_table(self, index):
+        """ترتيب الجدول داخل الـ proxy بدون إعادة بناء الصفوف"""
+        self.apply_sort(SORT_OPTIONS[index])
+
+    def apply_sort(self, columns):
+        """
+        ترتيب العرض حسب عدة أعمدة (الصفوف والمفاتيح في الـ model لا تتغير)
+        
+        Args:
+            columns: [(العمود، الاتجاه)] الأول هو الترتيب الأساسي
+        """
+        self.proxy.set_sort_columns(columns)
+        column, order = columns[0]
+        header = self.table.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(column, order)
+        header.blockSignals(False)
+
+    def on_header_clicked(self, column):
+        """ترتيب حسب العمود المضغوط (Shift لإضافته أو عكس اتجاهه كترتيب ثانوي)"""
+        columns = self.proxy.sort_columns()
+        orders = dict(columns)
+        
+        if QApplication.keyboardModifiers() & Qt.ShiftModifier:
+            if column in orders:
+                flipped = Qt.AscendingOrder if orders[column] == Qt.DescendingOrder else Qt.DescendingOrder
+                columns = [(c, flipped if c == column else o) for c, o in columns]
+            else:
+                columns.append((column, Qt.AscendingOrder))
+        elif columns and columns[0][0] == column:
+            flipped = Qt.AscendingOrder if columns[0][1] == Qt.DescendingOrder else Qt.DescendingOrder
+            columns = [(column, flipped)] + columns[1:]
+        else:
+            default = Qt.DescendingOrder if column == RATING_COLUMN else Qt.AscendingOrder
+            columns = [(column, default)]
+        
+        self.apply_sort(columns)
+
+    def load_data(self):
+        """تحميل البيانات من Firebase"""
+        try:
+            current_company = self.company_name
+            if not current_company:
+                self.no_resume_label.setText("❌ لم يتم العثور على الشركة في الجلسة")
+                self.no_resume_label.show()
+                return
+
+            # مزامنة تزايدية ثم القراءة من القاعدة المحلية
+            self.cache.sync_users(current_company)
+            filtered_data = self.cache.applicants(current_company)
+
+            self.populate_table(filtered_data)
+            if not filtered_data:
+                self.no_resume_label.setText("📭 لا توجد بيانات في قاعدة البيانات")
+                self.no_resume_label.show()
+
+        except Exception as e:
+            error_msg = f"❌ خطأ في الاتصال بقاعدة البيانات:\n{str(e)}"
+            self.no_resume_label.setText(error_msg)
+            self.no_resume_label.show()
+            QMessageBox.critical(self, "خطأ", error_msg)
+
+    def populate_table(self, data):
+        """
+        ملء الجدول بالبيانات
+        
+        أول تحميل يملأ الـ model مرة واحدة؛ بعده تُطابق النسخة الجديدة مع
+        الحالية بمفتاح Firebase ولا يُطبق إلا المضاف والمعدل والمحذوف، فيبقى
+        التحديد وموضع التمرير ولوحة التفاصيل كما هي
+        """
+        data = data or {}
+        
+        if not self.model.rowCount():
+            self.model.set_records(data)
+            self.search_index.build(data)
+            self.filter_table()
+            self.sort_table(self.sort_dropdown.currentIndex())
+            self.update_count()
+            return
+        
+        inserted, updated, removed = self.model.apply_snapshot(data)
+        changed = len(inserted) + len(updated) + len(removed)
+        if not changed:
+            return
+        
+        if changed > len(data) * INDEX_REBUILD_RATIO:
+            self.search_index.build(data)
+        else:
+            for key in removed:
+                self.search_index.remove(key)
+            for key in inserted + updated:
+                self.search_index.upsert(key, data[key])
+        
+        self.filter_table()
+        self.update_count()
+        
+        if self.current_key in removed:
+            self.clear_details()
+        elif self.current_key in updated:
+            self.render_details(data[self.current_key])
+
+    def update_count(self):
+        """تحديث عدد المتقدمين ورسالة الجدول الفارغ"""
+        count = self.model.rowCount()
+        self.count_label.setText(f"({count} متقدم)")
+        self.no_resume_label.setVisible(count == 0)
+
+    def current_record(self):
+        """سجل المتقدم المحدد أو None"""
+        if self.current_key is None:
+            return None
+        return self.model.record(self.current_key)
+
+    def clear_details(self):
+        self.current_key = None
+        self.details_text.clear()
+
+    # التحديثات الفورية
+    def start_change_stream(self):
+        """الاشتراك في تغييرات متقدمي الشركة"""
+        self.change_stream = company_applicants_stream(self.company_name, parent=self)
+        self.change_stream.snapshot.connect(self.on_applicants_snapshot)
+        self.change_stream.inserted.connect(self.on_applicant_changed)
+        self.change_stream.updated.connect(self.on_applicant_changed)
+        self.change_stream.removed.connect(self.on_applicant_removed)
+        self.change_stream.start()
+
+    def on_applicants_snapshot(self, data):
+        """أول تحميل أو إعادة اتصال"""
+        # نفس شكل سجلات القاعدة المحلية حتى لا يبدو كل صف معدلاً عند المطابقة
+        data = {
+            key: applicant_record(record)
+            for key, record in (data or {}).items() if isinstance(record, dict)
+        }
+        self.cache.replace_company_users(self.company_name, data)
+        self.cache.mark_users_synced(self.company_name)
+        self.populate_table(data)
+
+    def on_applicant_changed(self, key, resume):
+        """إضافة أو تحديث صف واحد في مكانه"""
+        resume = applicant_record(resume)
+        self.cache.upsert_user(key, resume)
+        self.model.upsert(key, resume)
+        self.search_index.upsert(key, resume)
+        self.update_count()
+        self.filter_table()
+
+        if key == self.current_key:
+            self.render_details(resume)
+
+    def on_applicant_removed(self, key):
+        """حذف صف واحد"""
+        self.cache.delete_user(key)
+        self.model.remove(key)
+        self.search_index.remove(key)
+        self.update_count()
+        self.filter_table()
+
+        if key == self.current_key:
+            self.clear_details()
+
+    def closeEvent(self, event):
+        """إيقاف الاستماع عند إغلاق النافذة"""
+        if self.change_stream is not None:
+            self.change_stream.stop()
+        super().closeEvent(event)
+
+    def update_status(self, firebase_key, status):
+        """
+        تحديث الحالة في Firebase
+
+        Args:
+            firebase_key: مفتاح المتقدم
+            status: الحالة بالإنجليزية (EDITABLE_STATUSES)
+        """
+        info = self.model.record(firebase_key) or {}
+        old_status = info.get('status')
+        
+        try:
+            company = info.get('company', self.company_name)
+            fields = dict(change_stamp(company), status=status)
+            # الحالة ومدخل سجل تغييرات الشركة في كتابة واحدة
+            updates = {f"users/{firebase_key}/{name}": value for name, value in fields.items()}
+            updates.update(change_feed_entry(company, firebase_key, fields["updated_at"]))
+            reference().update(updates)
+            record = dict(info, status=status, updated_at=fields["updated_at"])
+            self.model.upsert(firebase_key, record)
+            self.search_index.upsert(firebase_key, record)
+            record_status_changed(info, old_status, status)
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"فشل تحديث الحالة: {str(e)}")
+
+    def show_resume_details(self, index):
+        """عرض تفاصيل السيرة الذاتية"""
+        self.current_key = index.data(KeyRole)
+        self.render_details(self.current_record() or {})
+
+    def render_details(self, info):
+        """رسم لوحة التفاصيل من سجل المتقدم"""
+        name = info.get('full_name', '')
+        email = info.get('email', '')
+        job = info.get('job', '')
+        status = STATUS_LABELS.get(info.get('status'), 'قيد المراجعة')
+        rating = info.get('raiting', '0')
+        summary = info.get('summary') or 'لا يوجد ملخص'
+        
+        # نقاط القوة والضعف من التحليل المنظم (السجلات القديمة بدونها)
+        sections = ""
+        for field, label in (("strengths", "💪 نقاط القوة"),
+                             ("gaps", "⚠️ نقاط الضعف"),
+                             ("matched_keywords", "🎯 الكلمات المطابقة")):
+            values = info.get(field) or []
+            if values:
+                items = "".join(f"<li>{value}</li>" for value in values)
+                sections += f"<h3 style='color: #667eea; margin-top: 20px;'>{label}:</h3><ul>{items}</ul>"
+        
+        details_html = f"""
+        <div style='font-family: Arial; line-height: 1.8;'>
+            <h2 style='color: #667eea; border-bottom: 2px solid #667eea; padding-bottom: 10px;'>
+                معلومات المتقدم
+            </h2>
+            
+            <p><strong>👤 الاسم:</strong> {name}</p>
+            <p><strong>📧 البريد الإلكتروني:</strong> {email}</p>
+            <p><strong>💼 الوظيفة المطلوبة:</strong> {job}</p>
+            <p><strong>📊 الحالة:</strong> <span style='color: {"#4CAF50" if status == "مقبول" else "#FF9800" if status == "قيد المراجعة" else "#F44336"};'>{status}</span></p>
+            <p><strong>⭐ التقييم:</strong> {rating}/10</p>
+            
+            <h3 style='color: #667eea; margin-top: 20px;'>📝 الملخص:</h3>
+            <p style='background-color: #f9f9f9; padding: 15px; border-radius: 8px; border-left: 4px solid #667eea;'>
+                {summary}
+            </p>
+            {sections}
+        </div>
+        """
+        
+        self.details_text.setHtml(details_html)
+
+    def open_resume(self):
+        """فتح السيرة الذاتية"""
+        additional_info = self.current_record()
+        if additional_info is None:
+            QMessageBox.warning(self, "تنبيه", "الرجاء اختيار متقدم من الجدول أولاً.")
+            return
+        
+        if not additional_info.get('resume_ref') and not additional_info.get('resume_data'):
+            QMessageBox.warning(self, "تنبيه", "لم يتم العثور على ملف السيرة الذاتية.")
+            return
+        
+        try:
+            # جلب الملف من المخزن عند الطلب فقط
+            decoded_data = load_resume_bytes(additional_info)
+            
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+                temp_file.write(decoded_data)
+                temp_file_path = temp_file.name
+            
+            # فتح الملف حسب نظام التشغيل
+            if os.name == 'nt':  # Windows
+                os.startfile(temp_file_path)
+            elif sys.platform == 'darwin':  # macOS
+                os.system(f'open "{temp_file_path}"')
+            else:  # Linux
+                os.system(f'xdg-open "{temp_file_path}"')
+                
+            QMessageBox.information(self, "نجح", "تم فتح السيرة الذاتية بنجاح!")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"فشل فتح الملف: {str(e)}")
+
+    # الأنماط CSS
+    def header_button_style(self):
+        return """
+            QPushButton {
+                background-color: rgba(255, 255, 255, 0.2);
+                color: white;
+                font-size: 13px;
+                font-weight: bold;
+                padding: 10px 20px;
+                border-radius: 8px;
+                border: 2px solid rgba(255, 255, 255, 0.3);
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 255, 255, 0.3);
+                border: 2px solid rgba(255, 255, 255, 0.5);
+            }
+            QPushButton:pressed {
+                background-color: rgba(255, 255, 255, 0.1);
+            }
+        """
+
+    def action_button_style(self, color):
+        return f"""
+            QPushButton {{
+                background-color: {color};
+                color: white;
+                font-size: 13px;
+                font-weight: bold;
+                padding: 10px 15px;
+                border-radius: 8px;
+                border: none;
+            }}
+            QPushButton:hover {{
+                opacity: 0.8;
+            }}
+            QPushButton:pressed {{
+                padding: 11px 14px 9px 16px;
+            }}
+        """
+
+    def modern_combo_style(self):
+        return """
+            QComboBox {
+                padding: 8px 12px;
+                border-radius: 6px;
+                border: 2px solid #e0e0e0;
+                background-color: white;
+                color: #333;
+                font-size: 13px;
+            }
+            QComboBox:hover {
+                border: 2px solid #667eea;
+            }
+            QComboBox::drop-down {
+                border: none;
+                padding-right: 10px;
+            }
+            QComboBox::down-arrow {
+                image: none;
+                border-left: 5px solid transparent;
+                border-right: 5px solid transparent;
+                border-top: 5px solid #666;
+                margin-right: 5px;
+            }
+            QComboBox QAbstractItemView {
+                border: 2px solid #667eea;
+                background-color: white;
+                selection-background-color: #667eea;
+                selection-color: white;
+                padding: 5px;
+            }
+        """
+
+    def modern_table_style(self):
+        return """
+            QTableView {
+                background-color: white;
+                alternate-background-color: #f9f9f9;
+                gridline-color: #e0e0e0;
+                border-radius: 8px;
+                border: 1px solid #e0e0e0;
+            }
+            QTableView::item {
+                padding: 10px;
+                border: none;
+            }
+            QTableView::item:selected {
+                background-color: #667eea;
+                color: white;
+            }
+            QTableView::item:hover {
+                background-color: #f0f0ff;
+            }
+            QHeaderView::section {
+                background-color: #667eea;
+                color: white;
+                font-weight: bold;
+                padding: 12px;
+                border: none;
+                font-size: 14px;
+            }
+            QHeaderView::section:hover {
+                background-color: #5568d3;
+            }
+        """
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    
+    # تطبيق نمط عام
+    app.setStyle('Fusion')
+    
+    palette = QPalette()
+    palette.setColor(QPalette.Window, QColor("#f5f5f5"))
+    palette.setColor(QPalette.WindowText, QColor("#333333"))
+    app.setPalette(palette)
+    
+    window = EnhancedAdminPage()
+    window.show()
+    
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""
+AI Client Module
+عميل Gemini طويل العمر: إعداد النموذج مرة واحدة، مهلة لكل طلب، إعادة
+المحاولة مع تأخير عشوائي للأخطاء المؤقتة، وقاطع دائرة يرفض الطلبات فوراً
+أثناء تعطل المزود
+
+يحتفظ العميل بإحصائيات متحركة لزمن الاستجابة ونسبة الأخطاء، ويرسل لقطة
+منها دورياً إلى metrics/ai حتى تعرضها لوحة التحكم
+
+مثال:
+    python ai_client.py    # عرض الإحصائيات المجمّعة من كل الأجهزة
+"""
+
+import collections
+import os
+import random
+import socket
+import threading
+import time
+
+from firebase_connection import reference
+from utils import encode_key
+
+
+METRICS_PATH = "metrics/ai"
+
+# المهلة الكلية لكل طلب (تشمل إعادة المحاولة)
+DEFAULT_TIMEOUT_SECONDS = float(os.environ.get("AI_TIMEOUT_SECONDS", "90"))
+DEFAULT_MAX_RETRIES = int(os.environ.get("AI_MAX_RETRIES", "3"))
+
+# تأخير إعادة المحاولة: أسّي مع عشوائية حتى لا تعيد كل العمليات في نفس اللحظة
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 20.0
+
+# قاطع الدائرة: عدد الأخطاء المؤقتة المتتالية قبل الفتح، ومدة الانتظار قبل التجربة
+BREAKER_THRESHOLD = int(os.environ.get("AI_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.environ.get("AI_BREAKER_RESET_SECONDS", "30"))
+
+# نافذة الإحصائيات المتحركة
+METRICS_WINDOW_SECONDS = 15 * 60
+METRICS_MAX_SAMPLES = 5000
+PUBLISH_INTERVAL_SECONDS = 60
+
+# حدود أعمدة توزيع زمن الاستجابة بالثواني (العمود الأخير لما فوقها)
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 20, 30, 60]
+
+# أسماء أخطاء google.api_core والشبكة التي تستحق إعادة المحاولة
+TRANSIENT_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+    "InternalServerError", "BadGateway", "GatewayTimeout", "DeadlineExceeded",
+    "Aborted", "RetryError", "ConnectionError", "TimeoutError",
+    "ReadTimeout", "ConnectTimeout",
+}
+
+
+class CircuitOpenError(Exception):
+    """المزود متعطل: الطلب رُفض بدون إرساله"""
+
+
+class AIDeadlineExceeded(TimeoutError):
+    """انتهت مهلة الطلب قبل نجاحه"""
+
+
+def is_transient(error):
+    """هل الخطأ مؤقت (ضغط، تعطل، شبكة) ويستحق إعادة المحاولة"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """
+    قاطع دائرة بثلاث حالات: closed (طبيعي)، open (رفض فوري)،
+    half_open (طلب تجربة واحد بعد انتهاء مدة الانتظار)
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                wait = self.reset_seconds - (time.monotonic() - self._opened_at)
+                if wait > 0:
+                    raise CircuitOpenError(f"AI provider unavailable, retry in {wait:.0f}s")
+                self.state = "half_open"
+                self._probing = False
+
+            if self.state == "half_open":
+                if self._probing:
+                    raise CircuitOpenError("AI provider unavailable, waiting for a probe request")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print("✅ AI provider recovered, circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_neutral(self):
+        """
+        رد لا يدل على صحة المزود ولا تعطله (مثل طلب غير صالح): لا يغلق
+        الدائرة ولا يصفّر عدد الأخطاء، فقط يسمح بطلب تجربة جديد
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    print(f"🚨 AI circuit opened after {self.failures} failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def _bucket_index(seconds):
+    for index, limit in enumerate(LATENCY_BUCKETS):
+        if seconds <= limit:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def bucket_labels():
+    """عناوين أعمدة التوزيع (مثل ≤2s و >60s)"""
+    labels = [f"≤{limit:g}s" for limit in LATENCY_BUCKETS]
+    return labels + [f">{LATENCY_BUCKETS[-1]:g}s"]
+
+
+def bucket_percentile(buckets, fraction):
+    """
+    نسبة مئوية تقريبية من أعمدة التوزيع
+
+    Returns:
+        str: عنوان العمود الذي تقع فيه (مثل ≤5s)، أو None بدون بيانات
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    target = fraction * total
+    running = 0
+    for index, count in enumerate(buckets):
+        running += count
+        if running >= target:
+            return bucket_labels()[index]
+    return bucket_labels()[-1]
+
+
+class LatencyStats:
+    """زمن الاستجابة والأخطاء في نافذة متحركة"""
+
+    def __init__(self, window_seconds=METRICS_WINDOW_SECONDS, max_samples=METRICS_MAX_SAMPLES):
+        self.window_seconds = window_seconds
+        self.samples = collections.deque(maxlen=max_samples)
+        self.retries = collections.deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, error=None):
+        with self._lock:
+            self.samples.append((time.time(), operation, seconds, error))
+
+    def record_retry(self):
+        with self._lock:
+            self.retries.append(time.time())
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: count, errors, error_rate, retries, buckets, error_types, by_operation
+        """
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            samples = [s for s in self.samples if s[0] >= cutoff]
+            retries = sum(1 for t in self.retries if t >= cutoff)
+
+        buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        error_types = {}
+        by_operation = {}
+        for _, operation, seconds, error in samples:
+            op = by_operation.setdefault(operation, {"count": 0, "errors": 0, "seconds": 0.0})
+            op["count"] += 1
+            op["seconds"] += seconds
+            if error:
+                op["errors"] += 1
+                error_types[error] = error_types.get(error, 0) + 1
+            else:
+                buckets[_bucket_index(seconds)] += 1
+
+        errors = sum(error_types.values())
+        return {
+            "count": len(samples),
+            "errors": errors,
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "retries": retries,
+            "buckets": buckets,
+            "error_types": error_types,
+            "by_operation": by_operation,
+        }
+
+
+class AIClient:
+    """عميل واحد لكل نموذج يُعاد استخدامه في كل الطلبات"""
+
+    def __init__(self, model_name, api_key_provider, timeout=DEFAULT_TIMEOUT_SECONDS,
+                 max_retries=DEFAULT_MAX_RETRIES, publish=True):
+        """
+        Args:
+            model_name: اسم نموذج Gemini
+            api_key_provider: دالة تعيد مفتاح API (تُستدعى مرة واحدة)
+            timeout: المهلة الكلية لكل طلب بالثواني
+            max_retries: أقصى عدد لإعادة المحاولة
+            publish: إرسال الإحصائيات إلى metrics/ai (False للمزودات الوهمية)
+        """
+        self.model_name = model_name
+        self.api_key_provider = api_key_provider
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.publish = publish
+        self.breaker = CircuitBreaker()
+        self.stats = LatencyStats()
+        # لقطة لكل نموذج في كل عملية حتى لا تكتب العملاء فوق بعضها
+        self.instance = encode_key(f"{socket.gethostname()}-{os.getpid()}-{model_name}")
+        self._genai = None
+        self._model = None
+        self._lock = threading.Lock()
+        self._last_publish = 0.0
+
+    def model(self):
+        """النموذج بعد إعداده (أول استدعاء فقط يستورد المكتبة ويضبط المفتاح)"""
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+
+                api_key = self.api_key_provider()
+                if not api_key:
+                    raise ValueError("No API key available")
+                genai.configure(api_key=api_key)
+                self._genai = genai
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def call(self, operation, func, timeout=None):
+        """
+        تنفيذ طلب مع المهلة وإعادة المحاولة وقاطع الدائرة
+
+        Args:
+            operation: اسم العملية في الإحصائيات (upload, analysis, ...)
+            func: دالة تأخذ الوقت المتبقي بالثواني وتنفذ الطلب
+            timeout: المهلة الكلية (الافتراضي self.timeout)
+
+        Returns:
+            نتيجة func
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        attempt = 0
+
+        while True:
+            self.breaker.before_call()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AIDeadlineExceeded(f"{operation} did not finish within {timeout or self.timeout:.0f}s")
+
+            started = time.perf_counter()
+            try:
+                result = func(remaining)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                self.stats.record(operation, elapsed, error=type(e).__name__)
+
+                if not is_transient(e):
+                    # خطأ في الطلب نفسه: ليس تعطلاً ولا دليلاً على التعافي
+                    self.breaker.record_neutral()
+                    self._maybe_publish()
+                    raise
+
+                self.breaker.record_failure()
+                attempt += 1
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+                delay *= random.uniform(0.5, 1.5)
+
+                if attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                    self._maybe_publish()
+                    raise
+
+                print(f"🔁 {operation} failed ({type(e).__name__}), retry {attempt} in {delay:.1f}s")
+                self.stats.record_retry()
+                time.sleep(delay)
+                continue
+
+            self.stats.record(operation, time.perf_counter() - started)
+            self.breaker.record_success()
+            self._maybe_publish()
+            return result
+
+    def generate(self, parts, generation_config=None, operation="analysis", timeout=None):
+        """generate_content مع مهلة لكل محاولة"""
+        model = self.model()
+        return self.call(
+            operation,
+            lambda remaining: model.generate_content(
+                parts,
+                generation_config=generation_config,
+                request_options={"timeout": remaining},
+            ),
+            timeout,
+        )
+
+    def upload(self, path, display_name="resume.pdf", timeout=None):
+        """رفع ملف (المكتبة لا تدعم مهلة للرفع، فالمهلة تحد إعادة المحاولة فقط)"""
+        self.model()
+        return self.call(
+            "upload",
+            lambda remaining: self._genai.upload_file(path=path, display_name=display_name),
+            timeout,
+        )
+
+    def snapshot(self):
+        """إحصائيات هذا الجهاز مع حالة قاطع الدائرة"""
+        return dict(self.stats.snapshot(), circuit=self.breaker.state)
+
+    def _maybe_publish(self):
+        if not self.publish:
+            return
+        now = time.monotonic()
+        if now - self._last_publish < PUBLISH_INTERVAL_SECONDS:
+            return
+        self._last_publish = now
+        try:
+            publish_snapshot(self.instance, dict(self.snapshot(), model=self.model_name))
+        except Exception as e:
+            print(f"⚠️ Failed to publish AI metrics: {e}")
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_ai_client(model_name, api_key_provider, publish=True):
+    """
+    العميل المشترك لنموذج (يُنشأ مرة واحدة لكل عملية)
+
+    Args:
+        model_name: اسم النموذج
+        api_key_provider: دالة تعيد مفتاح API
+        publish: إرسال الإحصائيات إلى لوحة التحكم
+    """
+    with _clients_lock:
+        if model_name not in _clients:
+            _clients[model_name] = AIClient(model_name, api_key_provider, publish=publish)
+        return _clients[model_name]
+
+
+def publish_snapshot(instance, snapshot):
+    """حفظ لقطة إحصائيات جهاز في metrics/ai/{instance}"""
+    data = {k: v for k, v in snapshot.items() if k != "by_operation"}
+    data["updated_at"] = int(time.time() * 1000)
+    reference(f"{METRICS_PATH}/{instance}").set(data)
+
+
+def load_metrics(max_age_seconds=METRICS_WINDOW_SECONDS):
+    """
+    دمج لقطات كل الأجهزة التي أرسلت خلال النافذة
+
+    Returns:
+        dict: count, errors, error_rate, retries, buckets, error_types,
+              p50, p95, open_circuits, instances
+    """
+    cutoff = (time.time() - max_age_seconds) * 1000
+    merged = {
+        "count": 0, "errors": 0, "retries": 0,
+        "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+        "error_types": {}, "open_circuits": 0, "instances": 0,
+    }
+
+    for snapshot in (reference(METRICS_PATH).get() or {}).values():
+        if not isinstance(snapshot, dict) or snapshot.get("updated_at", 0) < cutoff:
+            continue
+        merged["instances"] += 1
+        for counter in ("count", "errors", "retries"):
+            merged[counter] += snapshot.get(counter, 0)
+        for index, count in enumerate(snapshot.get("buckets") or []):
+            if index < len(merged["buckets"]) and count:
+                merged["buckets"][index] += count
+        for name, count in (snapshot.get("error_types") or {}).items():
+            merged["error_types"][name] = merged["error_types"].get(name, 0) + count
+        if snapshot.get("circuit") == "open":
+            merged["open_circuits"] += 1
+
+    merged["error_rate"] = merged["errors"] / merged["count"] if merged["count"] else 0.0
+    merged["p50"] = bucket_percentile(merged["buckets"], 0.5)
+    merged["p95"] = bucket_percentile(merged["buckets"], 0.95)
+    return merged
+
+
+if __name__ == "__main__":
+    metrics = load_metrics()
+    print(f"🤖 AI calls (last {METRICS_WINDOW_SECONDS // 60} min, {metrics['instances']} instances)")
+    print(f"   calls: {metrics['count']}  errors: {metrics['errors']} ({metrics['error_rate']:.1%})"
+          f"  retries: {metrics['retries']}  open circuits: {metrics['open_circuits']}")
+    print(f"   p50: {metrics['p50'] or '-'}  p95: {metrics['p95'] or '-'}")
+    for label, count in zip(bucket_labels(), metrics["buckets"]):
+        print(f"   {label:>6} {'█' * count} {count}")
+    for name, count in metrics["error_types"].items():
+        print(f"   ❌ {name}: {count}")
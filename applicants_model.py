@@ -0,0 +1,385 @@
+"""
+Applicants Model Module
+نموذج/عرض (Model/View) لجدول المتقدمين: لا تُرسم إلا الصفوف الظاهرة
+"""
+
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, pyqtSignal
+)
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+
+
+# (الحقل، عنوان العمود)
+COLUMNS = [
+    ("full_name", "الاسم الكامل"),
+    ("email", "البريد الإلكتروني"),
+    ("job", "الوظيفة"),
+    ("status", "الحالة"),
+    ("raiting", "التقييم"),
+]
+
+NAME_COLUMN = 0
+EMAIL_COLUMN = 1
+JOB_COLUMN = 2
+STATUS_COLUMN = 3
+RATING_COLUMN = 4
+
+STATUS_LABELS = {
+    'Approved': 'مقبول',
+    'Pending': 'قيد المراجعة',
+    'Rejected': 'مرفوض',
+    'Scoring': 'قيد التقييم'
+}
+
+# الحالات التي يختارها المدير (Scoring يضعها طابور التقييم فقط)
+EDITABLE_STATUSES = ['Approved', 'Pending', 'Rejected']
+
+# تحويل الحالة من العربية للإنجليزية
+STATUS_FROM_ARABIC = {label: status for status, label in STATUS_LABELS.items()}
+
+# ترتيب الحالات عند الترتيب حسب عمود الحالة
+STATUS_SORT_ORDER = {status: i for i, status in enumerate(STATUS_LABELS)}
+
+STATUS_COLORS = {
+    'Approved': "#4CAF50",
+    'Pending': "#FF9800",
+    'Rejected': "#F44336",
+    'Scoring': "#2196F3"
+}
+
+KeyRole = Qt.UserRole + 1
+RecordRole = Qt.UserRole + 2
+SortRole = Qt.UserRole + 3
+
+
+def rating_value(record):
+    try:
+        return float(record.get('raiting', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def sort_keys(record):
+    """
+    مفاتيح الترتيب لكل أعمدة السجل بأنواعها الفعلية
+
+    تُحسب مرة عند إضافة السجل أو تحديثه، فالمقارنة أثناء الترتيب لا تحول
+    نصوصاً ولا أرقاماً
+
+    Returns:
+        tuple: مفتاح لكل عمود في COLUMNS بنفس الترتيب
+    """
+    return (
+        str(record.get('full_name') or '').casefold(),
+        str(record.get('email') or '').casefold(),
+        str(record.get('job') or '').casefold(),
+        STATUS_SORT_ORDER.get(record.get('status'), len(STATUS_SORT_ORDER)),
+        rating_value(record),
+    )
+
+
+def rating_color(record):
+    value = rating_value(record)
+    if value >= 8:
+        return "#4CAF50"  # أخضر
+    elif value >= 6:
+        return "#FF9800"  # برتقالي
+    return "#F44336"  # أحمر
+
+
+class ApplicantTableModel(QAbstractTableModel):
+    """سجلات المتقدمين مفهرسة بمفتاح Firebase"""
+
+    # key, status (بالإنجليزية)
+    statusChangeRequested = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._records = {}
+        self._rows = {}
+        self._sort_keys = {}
+
+    # ===== واجهة Qt =====
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        key = self._keys[index.row()]
+        record = self._records[key]
+        field = COLUMNS[index.column()][0]
+
+        if role == Qt.DisplayRole:
+            if field == 'status':
+                return STATUS_LABELS.get(record.get('status'), 'قيد المراجعة')
+            return str(record.get(field, '' if field != 'raiting' else '0'))
+
+        if role == Qt.EditRole:
+            return record.get(field)
+
+        if role == Qt.ForegroundRole:
+            if field == 'raiting':
+                return QColor(rating_color(record))
+            if field == 'status':
+                return QColor(STATUS_COLORS.get(record.get('status'), "#FF9800"))
+            return None
+
+        if role == SortRole:
+            return self._sort_keys[key][index.column()]
+
+        if role == KeyRole:
+            return key
+
+        if role == RecordRole:
+            return record
+
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == STATUS_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or index.column() != STATUS_COLUMN:
+            return False
+
+        key = self._keys[index.row()]
+        if self._records[key].get('status') == value:
+            return False
+
+        # الكتابة في Firebase تتم عبر الإشارة بمفتاح السجل وليس برقم الصف
+        self.statusChangeRequested.emit(key, value)
+        return True
+
+    # ===== واجهة البيانات =====
+
+    def set_records(self, data):
+        """استبدال كل السجلات"""
+        self.beginResetModel()
+        self._keys = list(data.keys())
+        self._records = dict(data)
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._sort_keys = {key: sort_keys(record) for key, record in self._records.items()}
+        self.endResetModel()
+
+    def apply_snapshot(self, data):
+        """
+        مطابقة السجلات مع نسخة جديدة كاملة بمفتاح Firebase
+
+        لا يُعاد ضبط الـ model: تُحذف الصفوف المحذوفة وتُضاف الجديدة في آخره
+        ويُحدَّث المتغير فقط، فيبقى التحديد وموضع التمرير. نسخة بدون تغيير
+        لا تُرسل أي إشارة
+
+        Args:
+            data: {firebase_key: بيانات المتقدم}
+
+        Returns:
+            tuple: (inserted, updated, removed) قوائم مفاتيح
+        """
+        removed = [key for key in self._keys if key not in data]
+        inserted = [key for key in data if key not in self._records]
+        updated = [
+            key for key, record in data.items()
+            if key in self._records and self._records[key] != record
+        ]
+
+        if removed:
+            rows = sorted(self._rows[key] for key in removed)
+            # الحذف كمجموعات صفوف متتالية من الآخر حتى لا تتغير أرقام ما قبلها
+            end = len(rows) - 1
+            while end >= 0:
+                start = end
+                while start > 0 and rows[start - 1] == rows[start] - 1:
+                    start -= 1
+                first, last = rows[start], rows[end]
+                self.beginRemoveRows(QModelIndex(), first, last)
+                for key in self._keys[first:last + 1]:
+                    del self._records[key]
+                    del self._rows[key]
+                    del self._sort_keys[key]
+                del self._keys[first:last + 1]
+                self.endRemoveRows()
+                end = start - 1
+
+            for row in range(rows[0], len(self._keys)):
+                self._rows[self._keys[row]] = row
+
+        for key in updated:
+            self.upsert(key, data[key])
+
+        if inserted:
+            first = len(self._keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(inserted) - 1)
+            for row, key in enumerate(inserted, start=first):
+                self._keys.append(key)
+                self._records[key] = data[key]
+                self._rows[key] = row
+                self._sort_keys[key] = sort_keys(data[key])
+            self.endInsertRows()
+
+        return inserted, updated, removed
+
+    def upsert(self, key, record):
+        """إضافة سجل أو تحديثه في مكانه"""
+        row = self._rows.get(key)
+
+        if row is None:
+            row = len(self._keys)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._keys.append(key)
+            self._records[key] = record
+            self._rows[key] = row
+            self._sort_keys[key] = sort_keys(record)
+            self.endInsertRows()
+        else:
+            self._records[key] = record
+            self._sort_keys[key] = sort_keys(record)
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, len(COLUMNS) - 1)
+            )
+
+    def remove(self, key):
+        """حذف سجل"""
+        row = self._rows.get(key)
+        if row is None:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._records[key]
+        del self._rows[key]
+        del self._sort_keys[key]
+        for k in self._keys[row:]:
+            self._rows[k] -= 1
+        self.endRemoveRows()
+
+    def record(self, key):
+        return self._records.get(key)
+
+    def key_at(self, row):
+        return self._keys[row]
+
+    def sort_keys_at(self, row):
+        return self._sort_keys[self._keys[row]]
+
+    def keys(self):
+        return list(self._keys)
+
+    def row_of(self, key):
+        return self._rows.get(key)
+
+
+class ApplicantFilterProxy(QSortFilterProxyModel):
+    """فلترة حسب مجموعة مفاتيح جاهزة وترتيب متعدد الأعمدة بمفاتيح محسوبة مسبقاً"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._visible_keys = None
+        self._ranking = None
+        self._sort_columns = [(NAME_COLUMN, Qt.AscendingOrder)]
+        self.setSortRole(SortRole)
+        self.setDynamicSortFilter(True)
+
+    def sort_columns(self):
+        return list(self._sort_columns)
+
+    def set_sort_columns(self, columns):
+        """
+        الترتيب حسب عدة أعمدة: الثاني يفصل بين المتساوين في الأول وهكذا
+
+        يعيد ترتيب العرض فقط؛ صفوف الـ model ومفاتيحها لا تتغير
+
+        Args:
+            columns: [(العمود، Qt.AscendingOrder أو Qt.DescendingOrder)]
+        """
+        self._sort_columns = list(columns)
+        primary = self._sort_columns[0][0] if self._sort_columns else NAME_COLUMN
+        # الاتجاه يُطبق داخل lessThan لكل عمود، فالـ proxy يرتب تصاعدياً دائماً
+        if self.sortColumn() == primary and self.sortOrder() == Qt.AscendingOrder:
+            self.invalidate()
+        else:
+            self.sort(primary, Qt.AscendingOrder)
+
+    def set_visible_keys(self, keys):
+        """
+        Args:
+            keys: مجموعة المفاتيح الظاهرة، أو None لإظهار الكل
+        """
+        self._visible_keys = keys
+        self.invalidateFilter()
+
+    def set_ranking(self, ranking):
+        """
+        ترتيب حسب الصلة بدل العمود (مثل نتائج البحث داخل الملخصات)
+
+        Args:
+            ranking: {key: الترتيب} (0 الأفضل)، أو None للرجوع لترتيب العمود
+        """
+        if ranking is None and self._ranking is None:
+            return
+        self._ranking = ranking
+        self.invalidate()
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        if self._ranking is None:
+            left_keys = model.sort_keys_at(left.row())
+            right_keys = model.sort_keys_at(right.row())
+            for column, order in self._sort_columns:
+                a, b = left_keys[column], right_keys[column]
+                if a != b:
+                    return a > b if order == Qt.DescendingOrder else a < b
+            # التساوي في كل الأعمدة: مفتاح Firebase (ترتيب التقديم) حتى يبقى الترتيب ثابتاً
+            return model.key_at(left.row()) < model.key_at(right.row())
+        last = len(self._ranking)
+        left_rank = self._ranking.get(model.key_at(left.row()), last)
+        right_rank = self._ranking.get(model.key_at(right.row()), last)
+        return left_rank < right_rank
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._visible_keys is None:
+            return True
+        # بدون إنشاء QModelIndex واستدعاء data() لكل صف
+        return self.sourceModel().key_at(source_row) in self._visible_keys
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """محرر الحالة: قائمة منسدلة واحدة تُنشأ عند التحرير فقط"""
+
+    def __init__(self, combo_style="", parent=None):
+        super().__init__(parent)
+        self.combo_style = combo_style
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems([STATUS_LABELS[status] for status in EDITABLE_STATUSES])
+        editor.setStyleSheet(self.combo_style)
+        # حفظ الاختيار مباشرة بدون انتظار فقدان التركيز
+        editor.activated.connect(lambda _: self._commit(editor))
+        return editor
+
+    def _commit(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor)
+
+    def setEditorData(self, editor, index):
+        status = index.data(Qt.EditRole)
+        editor.setCurrentText(STATUS_LABELS.get(status, 'قيد المراجعة'))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, STATUS_FROM_ARABIC.get(editor.currentText(), 'Pending'))
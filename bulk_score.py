@@ -0,0 +1,338 @@
+"""
+Bulk Score Module
+تقييم مجلد كامل من السير الذاتية بدون واجهة، مع تزامن محدود وحفظ التقدم
+
+مثال:
+    python bulk_score.py ./cvs --company "My Company" --job "Backend Developer" --workers 4 --rate 30
+"""
+
+import argparse
+import csv
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from functions import (
+    validate_pdf_file,
+    score_resume,
+    push_customer_data_to_firebase,
+)
+from queries import get_company_jobs
+from resume_store import file_sha256
+from scoring_backends import BACKENDS, get_scoring_backend, select_scoring_backend
+
+
+CHECKPOINT_FILE = ".bulk_score_checkpoint.jsonl"
+
+STAGES = ["validate", "extract", "prescreen", "cache", "upload", "analysis", "save"]
+
+
+class RateLimiter:
+    """حد أقصى لعدد طلبات الـ AI في الدقيقة (مشترك بين كل العمال)"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def checkpoint_key(sha256, company, job):
+    """
+    مفتاح الملف في الـ checkpoint: نفس الملف لشركة أو وظيفة أخرى يُقيَّم من جديد
+    (وإعادة تسمية الملف لا تجعله يُقيَّم مرتين)
+    """
+    return f"{sha256}|{company}|{job}"
+
+
+class Checkpoint:
+    """سجل JSON lines بالملفات المنتهية حتى يُستأنف التشغيل المتوقف"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = {}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # سطر ناقص من تشغيل متوقف
+                    if entry.get("status") == "done":
+                        self.done[self._key(entry)] = entry
+
+    @staticmethod
+    def _key(entry):
+        return checkpoint_key(entry.get("sha256"), entry.get("company"), entry.get("job"))
+
+    def is_done(self, sha256, company, job):
+        return sha256 is not None and checkpoint_key(sha256, company, job) in self.done
+
+    def record(self, entry):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if entry.get("status") == "done":
+                self.done[self._key(entry)] = entry
+
+
+class StageTimer:
+    """تجميع زمن كل مرحلة لكل الملفات"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {stage: [] for stage in STAGES}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def measure(self, stage, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def clock(self):
+        """
+        مؤقت لملف واحد: كل استدعاء يُنهي المرحلة السابقة ويبدأ التالية
+        (يُمرر كـ on_stage إلى score_resume، واستدعاؤه بدون اسم ينهي الأخيرة)
+        """
+        current = {}
+
+        def on_stage(stage=None):
+            now = time.perf_counter()
+            if current:
+                self.add(current["stage"], now - current["started"])
+            current.clear()
+            if stage:
+                current.update(stage=stage, started=now)
+
+        return on_stage
+
+
+def load_manifest(path):
+    """
+    قراءة ملف CSV اختياري بأعمدة: file, full_name, email
+
+    Returns:
+        dict: {file: {full_name, email}}
+    """
+    if not path:
+        return {}
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return {
+            row["file"]: {"full_name": row.get("full_name", ""), "email": row.get("email", "")}
+            for row in csv.DictReader(f) if row.get("file")
+        }
+
+
+def resolve_keywords(company, job):
+    """الكلمات المفتاحية للوظيفة من قاعدة البيانات"""
+    for job_data in get_company_jobs(company).values():
+        if job_data.get("name") == job:
+            return job_data.get("value")
+    raise ValueError(f"Job not found for {company}: {job}")
+
+
+def score_file(path, applicant, company, job, keywords, limiter, timer):
+    """
+    تقييم ملف واحد وحفظه
+
+    Returns:
+        dict: نتيجة الملف للـ checkpoint
+    """
+    valid, message = timer.measure("validate", validate_pdf_file, path)
+    if not valid:
+        raise ValueError(message)
+
+    clock = timer.clock()
+    try:
+        result = score_resume(path, keywords, company, on_stage=clock, before_ai=limiter.acquire)
+    finally:
+        clock()
+
+    key = timer.measure(
+        "save", push_customer_data_to_firebase,
+        applicant["full_name"], applicant["email"], "Pending",
+        result["rating"], result["summary"], path, company, job,
+        result["fields"]
+    )
+
+    return {
+        "sha256": result["pdf_sha256"],
+        "key": key,
+        "rating": result["rating"],
+        "source": result["source"],
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_report(results, timer, elapsed):
+    done = sum(1 for r in results if r["status"] == "done")
+    failed = sum(1 for r in results if r["status"] == "failed")
+    prescreened = sum(1 for r in results if r.get("source") == "prescreen")
+
+    print("\n" + "=" * 50)
+    print("📊 Bulk scoring report")
+    print("=" * 50)
+    print(f"✅ Scored: {done}")
+    print(f"❌ Failed: {failed}")
+    print(f"🔎 Below prescreen threshold (no AI call): {prescreened}")
+    print(f"⏱️ Elapsed: {elapsed:.1f}s")
+    print(f"⚡ Throughput: {done / (elapsed / 60) if elapsed else 0:.1f} CVs/minute")
+
+    print("\n   stage        count    mean     p50     p95     max")
+    for stage in STAGES:
+        samples = timer.samples[stage]
+        if not samples:
+            continue
+        print(
+            f"   {stage:<10} {len(samples):>7} "
+            f"{statistics.mean(samples):>7.2f} {percentile(samples, 0.5):>7.2f} "
+            f"{percentile(samples, 0.95):>7.2f} {max(samples):>7.2f}"
+        )
+
+    backend = get_scoring_backend()
+    ai = backend.snapshot()
+    if ai and ai["count"]:
+        print(
+            f"\n🤖 {backend.name} calls: {ai['count']}, errors: {ai['errors']} ({ai['error_rate']:.1%}), "
+            f"retries: {ai['retries']}, circuit: {ai['circuit']}"
+        )
+
+    for r in results:
+        if r["status"] == "failed":
+            print(f"   ❌ {r['file']}: {r['error']}")
+    print("=" * 50 + "\n")
+
+
+def bulk_score(directory, company, job, keywords=None, workers=4, rate=30,
+               manifest=None, checkpoint_path=None):
+    """
+    تقييم كل ملفات PDF في مجلد
+
+    Args:
+        directory: المجلد
+        company: اسم الشركة
+        job: اسم الوظيفة
+        keywords: الكلمات المفتاحية (الافتراضي من الوظيفة في قاعدة البيانات)
+        workers: عدد الملفات التي تُعالج في نفس الوقت
+        rate: أقصى عدد طلبات AI في الدقيقة (0 بدون حد)
+        manifest: ملف CSV بأسماء وبريد المتقدمين
+        checkpoint_path: ملف حفظ التقدم
+
+    Returns:
+        list: نتيجة كل ملف تمت معالجته في هذا التشغيل
+    """
+    keywords = keywords or resolve_keywords(company, job)
+    applicants = load_manifest(manifest)
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(directory, CHECKPOINT_FILE))
+
+    files = sorted(f for f in os.listdir(directory) if f.lower().endswith(".pdf"))
+    hashes = {}
+    for file_name in files:
+        try:
+            hashes[file_name] = file_sha256(os.path.join(directory, file_name))
+        except OSError:
+            hashes[file_name] = None  # يفشل في score_file برسالة واضحة
+    pending = [f for f in files if not checkpoint.is_done(hashes[f], company, job)]
+
+    print(f"📁 {len(files)} PDF files, {len(files) - len(pending)} already done, {len(pending)} to score")
+    print(f"👷 Workers: {workers}  🚦 Rate: {rate or '∞'}/min  🤖 Backend: {get_scoring_backend().name}")
+
+    limiter = RateLimiter(rate)
+    timer = StageTimer()
+    results = []
+    started = time.perf_counter()
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {}
+    for file_name in pending:
+        applicant = applicants.get(file_name) or {
+            "full_name": os.path.splitext(file_name)[0],
+            "email": "",
+        }
+        futures[executor.submit(
+            score_file, os.path.join(directory, file_name), applicant,
+            company, job, keywords, limiter, timer
+        )] = file_name
+
+    recorded = set()
+
+    def record(future):
+        file_name = futures[future]
+        identity = {"file": file_name, "sha256": hashes[file_name], "company": company, "job": job}
+        try:
+            entry = dict(future.result(), status="done", **identity)
+            print(f"✅ {file_name}: {entry['rating']}/100")
+        except Exception as e:
+            entry = dict(identity, status="failed", error=str(e))
+            print(f"❌ {file_name}: {e}")
+        checkpoint.record(entry)
+        results.append(entry)
+        recorded.add(future)
+
+    try:
+        for future in as_completed(futures):
+            record(future)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted: finishing running files, progress is saved")
+        executor.shutdown(wait=True, cancel_futures=True)
+        # الملفات التي انتهت بعد المقاطعة حُفظت في Firebase: تسجيلها حتى لا تُكرر عند الاستئناف
+        for future in futures:
+            if future not in recorded and future.done() and not future.cancelled():
+                record(future)
+    else:
+        executor.shutdown(wait=True)
+
+    print_report(results, timer, time.perf_counter() - started)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a folder of CVs and save them to Firebase")
+    parser.add_argument("directory")
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--job", required=True)
+    parser.add_argument("--keywords", default=None, help="override the job keywords")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=30, help="max AI requests per minute (0 = unlimited)")
+    parser.add_argument("--manifest", default=None, help="CSV with columns file, full_name, email")
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="scoring backend (default: SCORING_BACKEND or gemini)")
+    args = parser.parse_args()
+
+    select_scoring_backend(args.backend)
+    bulk_score(
+        args.directory, args.company, args.job,
+        keywords=args.keywords,
+        workers=args.workers,
+        rate=args.rate,
+        manifest=args.manifest,
+        checkpoint_path=args.checkpoint,
+    )
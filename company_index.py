@@ -0,0 +1,174 @@
+"""
+Company Index Module
+فهرس الشركات حسب البريد الإلكتروني: companies_by_email/{encoded_email} -> company_id
+"""
+
+from firebase_connection import cref, reference
+from queries import generate_push_key
+from utils import encode_key
+
+
+INDEX_PATH = "companies_by_email"
+
+
+def encode_email(email):
+    """
+    تحويل البريد الإلكتروني إلى مفتاح Firebase صالح
+
+    Args:
+        email: البريد الإلكتروني
+
+    Returns:
+        str: المفتاح
+    """
+    return encode_key(email.strip().lower())
+
+
+def _index_ref(email):
+    return reference(f"{INDEX_PATH}/{encode_email(email)}")
+
+
+def get_company_id(email):
+    """
+    الحصول على معرف الشركة من البريد الإلكتروني بقراءة مفتاح واحد
+
+    Args:
+        email: البريد الإلكتروني
+
+    Returns:
+        str أو None
+    """
+    if not email:
+        return None
+
+    company_id = _index_ref(email).get()
+    if company_id:
+        return company_id
+
+    # الفهرس غير مكتمل (بيانات قديمة): استعلام مفهرس ثم إصلاح الفهرس.
+    # equal_to حساس لحالة الأحرف: البريد كما كُتب ثم بأحرف صغيرة
+    typed = email.strip()
+    matches = None
+    for candidate in dict.fromkeys([typed, typed.lower()]):
+        matches = cref.order_by_child("email").equal_to(candidate).limit_to_first(1).get()
+        if matches:
+            break
+    if not matches:
+        return None
+
+    company_id = next(iter(matches))
+    _index_ref(email).set(company_id)
+    print(f"🔧 Company index repaired for: {email}")
+    return company_id
+
+
+def get_company_by_email(email):
+    """
+    الحصول على بيانات الشركة من البريد الإلكتروني
+
+    Returns:
+        (company_id, company_data) أو (None, None)
+    """
+    company_id = get_company_id(email)
+    if not company_id:
+        return None, None
+
+    company = cref.child(company_id).get()
+    if not company:
+        return None, None
+
+    return company_id, company
+
+
+def authenticate_company(email, password):
+    """
+    التحقق من بيانات دخول الشركة
+
+    Returns:
+        (company_id, company_data) أو (None, None)
+    """
+    company_id, company = get_company_by_email(email)
+
+    if company and company.get("password") == password:
+        return company_id, company
+
+    return None, None
+
+
+def register_company(company_name, email, password):
+    """
+    تسجيل شركة جديدة وكتابة الفهرس في نفس العملية
+
+    Args:
+        company_name: اسم الشركة
+        email: البريد الإلكتروني
+        password: كلمة المرور
+
+    Returns:
+        str: معرف الشركة الجديدة
+
+    Raises:
+        ValueError: إذا كان البريد مسجلاً مسبقاً
+    """
+    existing = get_company_id(email)
+    if existing and cref.child(existing).get() is not None:
+        raise ValueError("Email already registered")
+
+    # المعرف يُولد محلياً فلا تُكتب عقدة شركة فارغة قبل حجز البريد
+    company_id = generate_push_key()
+
+    # حجز البريد بشكل ذري لمنع تسجيلين متزامنين بنفس البريد
+    # (حجز لشركة لم تُكتب، مثل تسجيل توقف في المنتصف، يُستبدل)
+    claimed = _index_ref(email).transaction(
+        lambda current: current if current and current != existing else company_id
+    )
+
+    if claimed != company_id:
+        raise ValueError("Email already registered")
+
+    # كتابة الشركة والفهرس معاً (multi-path update)
+    reference().update({
+        f"companies/{company_id}": {
+            "company_name": company_name,
+            "email": email,
+            "password": password,
+        },
+        f"{INDEX_PATH}/{encode_email(email)}": company_id,
+    })
+
+    return company_id
+
+
+def backfill_company_index():
+    """
+    بناء الفهرس للشركات الموجودة مسبقاً
+
+    Returns:
+        int: عدد المفاتيح المكتوبة
+    """
+    companies = cref.get() or {}
+    updates = {}
+
+    for company_id, company in companies.items():
+        email = (company or {}).get("email")
+        if not email:
+            print(f"⚠️ Company without email: {company_id}")
+            continue
+
+        path = f"{INDEX_PATH}/{encode_email(email)}"
+        if path in updates:
+            print(f"⚠️ Duplicate email {email}: keeping {updates[path]}, skipping {company_id}")
+            continue
+
+        updates[path] = company_id
+
+    if updates:
+        reference().update(updates)
+
+    print(f"✅ Company index backfilled: {len(updates)} entries")
+    return len(updates)
+
+
+# بناء الفهرس للبيانات الموجودة
+if __name__ == "__main__":
+    backfill_company_index()
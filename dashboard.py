@@ -2,14 +2,21 @@ import sys
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
     QLineEdit, QPushButton, QFrame, QGridLayout, QMessageBox,
-    QScrollArea, QTabWidget, QTextEdit, QComboBox
+    QScrollArea, QTabWidget, QTextEdit, QComboBox, QSpinBox
 )
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QColor, QPalette, QFont, QIcon
 from PyQt5.QtChart import QChart, QChartView, QPieSeries, QBarSet, QBarSeries, QBarCategoryAxis, QValueAxis
-import firebase_admin
-from firebase_admin import credentials, db
-from firebase_connection import cref
+from firebase_connection import reference
+from queries import get_recent_applicants
+from realtime import ChangeStream
+from stats_store import STATS_PATH, get_company_stats, summarize_jobs
+from utils import encode_key
+from company_index import get_company_id
+from local_cache import get_cache
+from prescreen import PRESCREEN_ACTIONS, get_company_settings, save_company_settings
+from scoring_queue import enqueue_deferred
+from ai_client import METRICS_WINDOW_SECONDS, bucket_labels, load_metrics
 from session_handler import load_session
 from datetime import datetime, timedelta
 
@@ -86,13 +93,23 @@ class EnhancedDashboard(QWidget):
             }
         """)
         
+        self.change_stream = None
+        
+        self.cache = get_cache()
+        
         self.init_ui()
+        
+        # عرض الإحصائيات من النسخة المحلية فوراً
+        self.render_resume_stats(self.cache.company_stats(self.company_name))
         self.load_data()
         
-        # تحديث تلقائي كل 30 ثانية
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.refresh_data)
-        self.timer.start(30000)
+        # تحديثات فورية بدل التحديث الدوري كل 30 ثانية
+        try:
+            self.start_change_stream()
+        except Exception as e:
+            print(f"⚠️ Realtime updates unavailable: {e}")
+            self.change_stream = None
+            self.load_resume_stats()
         
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -140,6 +157,10 @@ class EnhancedDashboard(QWidget):
         reports_tab = self.create_reports_tab()
         tabs.addTab(reports_tab, "📄 التقارير")
         
+        # تبويب صحة خدمة الذكاء الاصطناعي
+        ai_tab = self.create_ai_health_tab()
+        tabs.addTab(ai_tab, "🤖 خدمة التحليل")
+        
         main_layout.addWidget(tabs)
         self.setLayout(main_layout)
         
@@ -216,12 +237,12 @@ class EnhancedDashboard(QWidget):
         extra_stats = QGridLayout()
         
         # معدل القبول
-        acceptance_frame = self.create_stat_frame("معدل القبول", "0%", "#9C27B0")
-        extra_stats.addWidget(acceptance_frame, 0, 0)
+        self.acceptance_frame = self.create_stat_frame("معدل القبول", "0%", "#9C27B0")
+        extra_stats.addWidget(self.acceptance_frame, 0, 0)
         
         # متوسط التقييم
-        rating_frame = self.create_stat_frame("متوسط التقييم", "0.0", "#00BCD4")
-        extra_stats.addWidget(rating_frame, 0, 1)
+        self.rating_frame = self.create_stat_frame("متوسط التقييم", "0.0", "#00BCD4")
+        extra_stats.addWidget(self.rating_frame, 0, 1)
         
         # الطلبات هذا الشهر
         monthly_frame = self.create_stat_frame("طلبات هذا الشهر", "0", "#8BC34A")
@@ -261,6 +282,7 @@ class EnhancedDashboard(QWidget):
         layout.addWidget(title_label)
         layout.addWidget(value_label)
         
+        frame.value_label = value_label
         frame.setLayout(layout)
         return frame
     
@@ -372,6 +394,91 @@ class EnhancedDashboard(QWidget):
         
         return chart_view
     
+    def create_ai_health_tab(self):
+        """تبويب زمن استجابة ونسبة أخطاء خدمة الذكاء الاصطناعي"""
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        cards = QHBoxLayout()
+        self.ai_calls_card = self.create_stat_frame("الطلبات", "0", "#667eea")
+        self.ai_errors_card = self.create_stat_frame("نسبة الأخطاء", "0%", "#F44336")
+        self.ai_p50_card = self.create_stat_frame("الوسيط", "-", "#4CAF50")
+        self.ai_p95_card = self.create_stat_frame("p95", "-", "#FF9800")
+        for card in (self.ai_calls_card, self.ai_errors_card, self.ai_p50_card, self.ai_p95_card):
+            cards.addWidget(card)
+        
+        self.ai_status_label = QLabel("")
+        self.ai_status_label.setStyleSheet("color: #666;")
+        self.ai_status_label.setWordWrap(True)
+        
+        self.ai_latency_set = QBarSet("الطلبات الناجحة")
+        self.ai_latency_set.setColor(QColor("#667eea"))
+        self.ai_latency_set.append([0] * len(bucket_labels()))
+        
+        series = QBarSeries()
+        series.append(self.ai_latency_set)
+        
+        chart = QChart()
+        chart.addSeries(series)
+        chart.setTitle(f"توزيع زمن الاستجابة (آخر {METRICS_WINDOW_SECONDS // 60} دقيقة)")
+        
+        axis_x = QBarCategoryAxis()
+        axis_x.append(bucket_labels())
+        chart.addAxis(axis_x, Qt.AlignBottom)
+        series.attachAxis(axis_x)
+        
+        self.ai_latency_axis = QValueAxis()
+        self.ai_latency_axis.setLabelFormat("%d")
+        chart.addAxis(self.ai_latency_axis, Qt.AlignLeft)
+        series.attachAxis(self.ai_latency_axis)
+        
+        chart_view = QChartView(chart)
+        chart_view.setRenderHint(chart_view.Antialiasing)
+        chart_view.setMinimumHeight(300)
+        
+        refresh_btn = QPushButton("🔄 تحديث")
+        refresh_btn.setStyleSheet(self.button_style("#667eea", "#764ba2"))
+        refresh_btn.clicked.connect(self.load_ai_metrics)
+        
+        layout.addLayout(cards)
+        layout.addWidget(self.ai_status_label)
+        layout.addWidget(chart_view)
+        layout.addWidget(refresh_btn)
+        widget.setLayout(layout)
+        
+        # اللقطات تُرسل كل دقيقة من الأجهزة التي تحلل السير الذاتية
+        self.ai_metrics_timer = QTimer(self)
+        self.ai_metrics_timer.timeout.connect(self.load_ai_metrics)
+        self.ai_metrics_timer.start(60 * 1000)
+        QTimer.singleShot(0, self.load_ai_metrics)
+        
+        return widget
+    
+    def load_ai_metrics(self):
+        """تحميل إحصائيات خدمة الذكاء الاصطناعي المجمّعة"""
+        try:
+            metrics = load_metrics()
+        except Exception as e:
+            print(f"خطأ في تحميل إحصائيات الخدمة: {str(e)}")
+            return
+        
+        self.ai_calls_card.value_label.setText(str(metrics["count"]))
+        self.ai_errors_card.value_label.setText(f"{metrics['error_rate']:.1%}")
+        self.ai_p50_card.value_label.setText(metrics["p50"] or "-")
+        self.ai_p95_card.value_label.setText(metrics["p95"] or "-")
+        
+        for index, count in enumerate(metrics["buckets"]):
+            self.ai_latency_set.replace(index, count)
+        self.ai_latency_axis.setRange(0, max(metrics["buckets"] + [1]))
+        
+        status = f"الأجهزة: {metrics['instances']} - إعادة المحاولة: {metrics['retries']}"
+        if metrics["open_circuits"]:
+            status += f" - 🚨 الخدمة متوقفة مؤقتاً على {metrics['open_circuits']} جهاز"
+        errors = "، ".join(f"{name}: {count}" for name, count in metrics["error_types"].items())
+        if errors:
+            status += f"\nالأخطاء: {errors}"
+        self.ai_status_label.setText(status)
+    
     def create_settings_tab(self):
         """تبويب الإعدادات"""
         widget = QWidget()
@@ -385,6 +492,10 @@ class EnhancedDashboard(QWidget):
         password_section = self.create_password_section()
         layout.addWidget(password_section)
         
+        # قسم الفرز الأولي
+        prescreen_section = self.create_prescreen_section()
+        layout.addWidget(prescreen_section)
+        
         # قسم الإشعارات
         notifications_section = self.create_notifications_section()
         layout.addWidget(notifications_section)
@@ -477,6 +588,99 @@ class EnhancedDashboard(QWidget):
         frame.setLayout(layout)
         return frame
     
+    def create_prescreen_section(self):
+        """قسم إعدادات الفرز الأولي قبل تحليل الـ AI"""
+        frame = QFrame()
+        frame.setStyleSheet("""
+            QFrame {
+                background-color: white;
+                border-radius: 8px;
+                padding: 20px;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        
+        title = QLabel("الفرز الأولي")
+        title.setStyleSheet("font-size: 18px; font-weight: bold; color: #333; margin-bottom: 10px;")
+        
+        info = QLabel("السير الذاتية التي تطابق كلماتها المفتاحية أقل من الحد لا تُرسل للذكاء الاصطناعي (0 يعطل الفرز)")
+        info.setWordWrap(True)
+        info.setStyleSheet("color: #666;")
+        
+        grid = QGridLayout()
+        
+        grid.addWidget(QLabel("الحد الأدنى للتطابق:"), 0, 0)
+        self.prescreen_threshold = QSpinBox()
+        self.prescreen_threshold.setRange(0, 100)
+        self.prescreen_threshold.setSuffix(" / 100")
+        self.prescreen_threshold.setStyleSheet(self.input_style())
+        grid.addWidget(self.prescreen_threshold, 0, 1)
+        
+        grid.addWidget(QLabel("السير الأقل من الحد:"), 1, 0)
+        self.prescreen_action = QComboBox()
+        self.prescreen_action.addItem("حفظ بدون تحليل", "skip")
+        self.prescreen_action.addItem("تأجيل التحليل", "defer")
+        self.prescreen_action.setStyleSheet(self.combo_style())
+        grid.addWidget(self.prescreen_action, 1, 1)
+        
+        save_btn = QPushButton("حفظ إعدادات الفرز")
+        save_btn.setStyleSheet(self.button_style("#667eea", "#764ba2"))
+        save_btn.clicked.connect(self.save_prescreen_settings)
+        
+        # السير المؤجلة تُحلل عند الطلب بواسطة عمال التقييم
+        deferred_btn = QPushButton("تحليل السير المؤجلة الآن")
+        deferred_btn.setStyleSheet(self.button_style("#2196F3", "#1976D2"))
+        deferred_btn.clicked.connect(self.enqueue_deferred_applicants)
+        
+        layout.addWidget(title)
+        layout.addWidget(info)
+        layout.addLayout(grid)
+        layout.addWidget(save_btn)
+        layout.addWidget(deferred_btn)
+        
+        frame.setLayout(layout)
+        
+        QTimer.singleShot(0, self.load_prescreen_settings)
+        return frame
+    
+    def load_prescreen_settings(self):
+        """تحميل إعدادات الفرز الأولي للشركة"""
+        try:
+            settings = get_company_settings(self.company_name, use_cache=False)
+        except Exception as e:
+            print(f"خطأ في تحميل إعدادات الفرز: {str(e)}")
+            return
+        
+        self.prescreen_threshold.setValue(int(settings["prescreen_threshold"]))
+        index = self.prescreen_action.findData(settings["prescreen_action"])
+        self.prescreen_action.setCurrentIndex(max(0, index))
+    
+    def save_prescreen_settings(self):
+        """حفظ إعدادات الفرز الأولي"""
+        action = self.prescreen_action.currentData()
+        if action not in PRESCREEN_ACTIONS:
+            return
+        
+        try:
+            save_company_settings(self.company_name, self.prescreen_threshold.value(), action)
+            QMessageBox.information(self, "نجح", "تم حفظ إعدادات الفرز الأولي!")
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"فشل حفظ الإعدادات: {str(e)}")
+    
+    def enqueue_deferred_applicants(self):
+        """إرسال المتقدمين المؤجلين لطابور التقييم"""
+        try:
+            queued = enqueue_deferred(self.company_name)
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"فشل إرسال السير المؤجلة: {str(e)}")
+            return
+        
+        if queued:
+            QMessageBox.information(self, "نجح", f"تم إرسال {queued} متقدم مؤجل للتحليل")
+        else:
+            QMessageBox.information(self, "تنبيه", "لا توجد سير مؤجلة")
+    
     def create_notifications_section(self):
         """قسم إعدادات الإشعارات"""
         frame = QFrame()
@@ -554,77 +758,83 @@ class EnhancedDashboard(QWidget):
     def load_data(self):
         """تحميل البيانات من Firebase"""
         try:
-            cref_db = db.reference('companies')
-            all_companies = cref_db.get()
+            self.company_id = self.cache.company_id(self.company_email)
             
-            if all_companies:
-                for cid, data in all_companies.items():
-                    if data.get('email') == self.company_email:
-                        self.company_id = cid
-                        break
-            
-            self.load_resume_stats()
+            if not self.company_id:
+                self.company_id = get_company_id(self.company_email)
+                if self.company_id:
+                    self.cache.upsert_company(self.company_id, {
+                        'company_name': self.company_name,
+                        'email': self.company_email
+                    })
             
         except Exception as e:
             QMessageBox.critical(self, "خطأ", f"فشل تحميل البيانات: {str(e)}")
     
+    def start_change_stream(self):
+        """الاشتراك في عدادات الشركة المجمّعة (عقدة صغيرة بحجم عدد الوظائف)"""
+        self.change_stream = ChangeStream(
+            f"{STATS_PATH}/{encode_key(self.company_name)}", parent=self
+        )
+        self.change_stream.snapshot.connect(self.on_stats_changed)
+        self.change_stream.inserted.connect(self.on_stats_changed)
+        self.change_stream.updated.connect(self.on_stats_changed)
+        self.change_stream.removed.connect(self.on_stats_changed)
+        self.change_stream.start()
+    
+    def on_stats_changed(self, *args):
+        self.render_resume_stats(summarize_jobs(self.change_stream.rows))
+        self.load_recent_applications()
+    
+    def closeEvent(self, event):
+        """إيقاف الاستماع عند إغلاق النافذة"""
+        if self.change_stream is not None:
+            self.change_stream.stop()
+        super().closeEvent(event)
+    
     def load_resume_stats(self):
-        """تحميل إحصائيات السير الذاتية"""
+        """تحميل إحصائيات السير الذاتية من العدادات المجمّعة"""
         try:
-            uref = db.reference('users')
-            all_users = uref.get()
-            
-            approved = pending = rejected = 0
-            total_rating = 0
-            rating_count = 0
-            recent_apps = []
-            
-            if all_users:
-                for user_id, user in all_users.items():
-                    if user.get("company") == self.company_name:
-                        status = user.get("status", "").lower()
-                        
-                        if status == "approved":
-                            approved += 1
-                        elif status == "pending":
-                            pending += 1
-                        elif status == "rejected":
-                            rejected += 1
-                        
-                        # حساب متوسط التقييم
-                        rating = user.get("raiting", 0)
-                        if rating:
-                            try:
-                                total_rating += float(rating)
-                                rating_count += 1
-                            except:
-                                pass
-                        
-                        # إضافة للطلبات الحديثة
-                        recent_apps.append({
-                            'name': user.get('full_name', 'غير معروف'),
-                            'job': user.get('job', 'غير محدد'),
-                            'status': status
-                        })
-            
-            total = approved + pending + rejected
-            
-            # تحديث البطاقات
-            self.total_card.update_value(total)
-            self.approved_card.update_value(approved)
-            self.pending_card.update_value(pending)
-            self.rejected_card.update_value(rejected)
-            
-            # تحديث قائمة الطلبات الحديثة
-            recent_text = ""
-            for app in recent_apps[:5]:  # أحدث 5 طلبات
-                status_emoji = "✅" if app['status'] == "approved" else "⏳" if app['status'] == "pending" else "❌"
-                recent_text += f"{status_emoji} {app['name']} - {app['job']}\n"
-            
-            self.recent_list.setText(recent_text if recent_text else "لا توجد طلبات حديثة")
-            
+            stats = get_company_stats(self.company_name)
         except Exception as e:
             print(f"خطأ في تحميل الإحصائيات: {str(e)}")
+            return
+        
+        self.render_resume_stats(stats)
+        self.load_recent_applications()
+    
+    def render_resume_stats(self, stats):
+        """عرض الإحصائيات في البطاقات"""
+        total = stats.get('total', 0)
+        approved = stats.get('approved', 0)
+        
+        # تحديث البطاقات
+        self.total_card.update_value(total)
+        self.approved_card.update_value(approved)
+        self.pending_card.update_value(stats.get('pending', 0))
+        self.rejected_card.update_value(stats.get('rejected', 0))
+        
+        acceptance = (approved / total * 100) if total else 0
+        self.acceptance_frame.value_label.setText(f"{acceptance:.0f}%")
+        self.rating_frame.value_label.setText(f"{stats.get('avg_rating', 0):.1f}")
+    
+    def load_recent_applications(self):
+        """تحميل أحدث 5 طلبات فقط"""
+        try:
+            recent_apps = get_recent_applicants(self.company_name, 5)
+        except Exception as e:
+            print(f"خطأ في تحميل الطلبات الحديثة: {str(e)}")
+            return
+        
+        # مفاتيح push مرتبة زمنياً، الأحدث أولاً
+        recent_text = ""
+        for key in sorted(recent_apps, reverse=True):
+            app = recent_apps[key]
+            status = app.get('status', '').lower()
+            status_emoji = {"approved": "✅", "pending": "⏳", "scoring": "🤖"}.get(status, "❌")
+            recent_text += f"{status_emoji} {app.get('full_name', 'غير معروف')} - {app.get('job', 'غير محدد')}\n"
+        
+        self.recent_list.setText(recent_text if recent_text else "لا توجد طلبات حديثة")
     
     def refresh_data(self):
         """تحديث البيانات"""
@@ -650,7 +860,7 @@ class EnhancedDashboard(QWidget):
             return
         
         try:
-            cref_db = db.reference(f'companies/{self.company_id}')
+            cref_db = reference(f'companies/{self.company_id}')
             company_data = cref_db.get()
             
             if company_data.get('password') != old_pass:
@@ -706,4 +916,23 @@ class EnhancedDashboard(QWidget):
             }
         """
     
-    def combo_
\ No newline at end of file
+    def combo_style(self):
+        return """
+            QComboBox {
+                padding: 8px 12px;
+                border: 2px solid #e0e0e0;
+                border-radius: 6px;
+                background-color: white;
+                font-size: 14px;
+            }
+            QComboBox:hover {
+                border: 2px solid #667eea;
+            }
+        """
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    window = EnhancedDashboard()
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,184 @@
+"""
+Facets Module
+فلترة متعددة الأوجه لجدول المتقدمين: الوظيفة، الحالة، فئة التقييم، شهر التقديم
+
+لكل قيمة في كل وجه bitmap (int، بت لكل صف في SearchIndex) وعدد محفوظ
+يُحدَّث مع كل إضافة أو حذف. الاختيار يتقاطع بعمليات & على الـ bitmaps،
+وعدد كل خيار = عدد البتات بعد تطبيق باقي الاختيارات (بدون المرور على الصفوف)
+"""
+
+import time
+from functools import lru_cache
+
+from queries import push_key_time
+
+
+# فئات التقييم: (أقل تقييم، القيمة)
+RATING_BANDS = [
+    (80, "80-100"),
+    (60, "60-79"),
+    (40, "40-59"),
+    (1, "1-39"),
+]
+
+UNRATED = "unrated"
+
+RATING_BAND_LABELS = {
+    "80-100": "80 - 100",
+    "60-79": "60 - 79",
+    "40-59": "40 - 59",
+    "1-39": "أقل من 40",
+    UNRATED: "بدون تقييم",
+}
+
+RATING_BAND_ORDER = [band for _, band in RATING_BANDS] + [UNRATED]
+
+
+def rating_band(key, record):
+    try:
+        rating = float(record.get("raiting") or 0)
+    except (TypeError, ValueError):
+        rating = 0
+    for minimum, band in RATING_BANDS:
+        if rating >= minimum:
+            return band
+    return UNRATED
+
+
+@lru_cache(maxsize=4096)
+def _month_of_hour(hour):
+    return time.strftime("%Y-%m", time.localtime(hour * 3600))
+
+
+def submission_month(key, record):
+    """شهر التقديم من وقت مفتاح push (السجلات القديمة لا تحفظ تاريخ التقديم)"""
+    timestamp = push_key_time(key) or record.get("updated_at")
+    if not timestamp:
+        return None
+    # الساعة وليس اليوم: بدايات الأشهر حسب التوقيت المحلي
+    return _month_of_hour(int(timestamp // 3600000))
+
+
+def job_value(key, record):
+    return record.get("job") or None
+
+
+def status_value(key, record):
+    return record.get("status") or None
+
+
+# (اسم الوجه، دالة القيمة (key, record))
+FACETS = [
+    ("job", job_value),
+    ("status", status_value),
+    ("rating", rating_band),
+    ("month", submission_month),
+]
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+class FacetIndex:
+    """bitmaps وأعداد كل قيم الأوجه لصفوف SearchIndex"""
+
+    def __init__(self, facets=FACETS):
+        self.facets = facets
+        self.clear()
+
+    def clear(self):
+        self._bits = {name: {} for name, _ in self.facets}      # وجه -> قيمة -> bitmap
+        self._counts = {name: {} for name, _ in self.facets}    # وجه -> قيمة -> عدد
+        self._values = {}                                       # صف -> (قيمة كل وجه)
+        self._pending = None
+
+    # ===== التحديث =====
+
+    def begin_build(self):
+        """بناء دفعة واحدة: الصفوف تُجمع ثم تتحول إلى bitmaps في finish_build"""
+        self.clear()
+        self._pending = {name: {} for name, _ in self.facets}
+
+    def finish_build(self, bitmap_from_ids):
+        for name, _ in self.facets:
+            for value, rows in self._pending[name].items():
+                self._bits[name][value] = bitmap_from_ids(rows)
+        self._pending = None
+
+    def add(self, row, key, record):
+        values = tuple(func(key, record) for _, func in self.facets)
+        self._values[row] = values
+
+        for (name, _), value in zip(self.facets, values):
+            counts = self._counts[name]
+            counts[value] = counts.get(value, 0) + 1
+            if self._pending is not None:
+                self._pending[name].setdefault(value, []).append(row)
+            else:
+                self._bits[name][value] = self._bits[name].get(value, 0) | (1 << row)
+
+    def remove(self, row):
+        values = self._values.pop(row, None)
+        if values is None:
+            return
+
+        mask = ~(1 << row)
+        for (name, _), value in zip(self.facets, values):
+            self._bits[name][value] &= mask
+            self._counts[name][value] -= 1
+            if not self._counts[name][value]:
+                del self._counts[name][value]
+                del self._bits[name][value]
+
+    # ===== الاستعلام =====
+
+    def _selection_bits(self, selections, exclude=None):
+        """تقاطع اختيارات كل الأوجه (عدا exclude)، أو None بدون اختيار"""
+        result = None
+        for name, selected in (selections or {}).items():
+            if name == exclude or not selected:
+                continue
+            bits = 0
+            for value in selected:
+                bits |= self._bits[name].get(value, 0)
+            result = bits if result is None else result & bits
+        return result
+
+    def filter_bits(self, selections, base=None, exclude=None):
+        """
+        الصفوف المطابقة لكل الاختيارات
+
+        Args:
+            selections: {وجه: مجموعة قيم} (القيم داخل الوجه الواحد OR)
+            base: bitmap مقيدة مسبقاً (مثل نتيجة البحث النصي) أو None
+            exclude: وجه لا يُطبق اختياره
+
+        Returns:
+            bitmap، أو None إذا لم يوجد أي شرط
+        """
+        bits = self._selection_bits(selections, exclude)
+        if base is not None:
+            bits = base if bits is None else bits & base
+        return bits
+
+    def counts(self, selections, base=None):
+        """
+        عدد كل قيمة في كل وجه مع تطبيق النص وباقي الأوجه
+
+        عدد خيارات الوجه لا يتأثر باختياره هو، فتظهر البدائل المتاحة
+
+        Returns:
+            dict: {وجه: {قيمة: عدد}}
+        """
+        result = {}
+        for name, _ in self.facets:
+            bits = self.filter_bits(selections, base, exclude=name)
+            if bits is None:
+                result[name] = dict(self._counts[name])
+                continue
+            result[name] = {
+                value: popcount(value_bits & bits)
+                for value, value_bits in self._bits[name].items()
+            }
+        return result
@@ -1,82 +1,159 @@
 """
 Firebase Connection Module
 يوفر اتصال آمن ومستقر مع Firebase Realtime Database
+
+التهيئة تتم عند أول استخدام فقط، لذلك استيراد الموديول لا يتصل بالشبكة
 """
 
-import firebase_admin
-from firebase_admin import credentials, db
 from utils import resource_path
+import threading
 import sys
 import os
 
-def initialize_firebase():
-    """تهيئة Firebase بشكل آمن"""
-    try:
-        # التحقق من وجود تطبيق Firebase مفعّل مسبقاً
-        if firebase_admin._apps:
-            print("✅ Firebase already initialized")
+
+CREDENTIALS_FILE = "recruitmentify.json"
+DATABASE_URL = 'https://recruitmentify-803e7-default-rtdb.firebaseio.com/'
+
+
+class FirebaseConnection:
+    """اتصال Firebase يُهيأ مرة واحدة عند أول طلب"""
+
+    def __init__(self, credentials_file=CREDENTIALS_FILE, database_url=DATABASE_URL):
+        self.credentials_file = credentials_file
+        self.database_url = database_url
+        self._initialized = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self):
+        """هل تمت التهيئة بنجاح (بدون محاولة التهيئة)"""
+        return bool(self._initialized)
+
+    def initialize(self):
+        """تهيئة Firebase بشكل آمن"""
+        with self._lock:
+            if self._initialized is not None:
+                return self._initialized
+            self._initialized = self._initialize()
+
+            if not self._initialized:
+                print("\n⚠️ WARNING: Firebase not initialized properly!")
+                print("The application may not work correctly.")
+                print("Please check the error messages above.\n")
+
+            return self._initialized
+
+    def _initialize(self):
+        # firebase_admin بطيئة في الاستيراد فلا تُستورد إلا عند التهيئة
+        import firebase_admin
+        from firebase_admin import credentials
+
+        try:
+            # التحقق من وجود تطبيق Firebase مفعّل مسبقاً
+            if firebase_admin._apps:
+                print("✅ Firebase already initialized")
+                return True
+            
+            # الحصول على مسار ملف الاعتماد
+            cred_path = resource_path(self.credentials_file)
+            
+            if not os.path.exists(cred_path):
+                print(f"❌ Firebase credentials file not found at: {cred_path}")
+                return False
+            
+            # تحميل بيانات الاعتماد
+            cred = credentials.Certificate(cred_path)
+            
+            # تهيئة Firebase
+            firebase_admin.initialize_app(cred, {
+                'databaseURL': self.database_url
+            })
+            
+            print("✅ Firebase initialized successfully")
+            print(f"📁 Credentials loaded from: {cred_path}")
             return True
-        
-        # الحصول على مسار ملف الاعتماد
-        cred_path = resource_path("recruitmentify.json")
-        
-        if not os.path.exists(cred_path):
-            print(f"❌ Firebase credentials file not found at: {cred_path}")
+            
+        except Exception as e:
+            print(f"❌ Firebase initialization failed: {str(e)}")
+            print("\n🔍 Troubleshooting tips:")
+            print("1. Check if recruitmentify.json exists")
+            print("2. Verify database URL is correct")
+            print("3. Ensure internet connection is active")
+            print("4. Check Firebase project permissions")
             return False
-        
-        # تحميل بيانات الاعتماد
-        cred = credentials.Certificate(cred_path)
-        
-        # تهيئة Firebase
-        firebase_admin.initialize_app(cred, {
-            'databaseURL': 'https://recruitmentify-803e7-default-rtdb.firebaseio.com/'
-        })
-        
-        print("✅ Firebase initialized successfully")
-        print(f"📁 Credentials loaded from: {cred_path}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Firebase initialization failed: {str(e)}")
-        print("\n🔍 Troubleshooting tips:")
-        print("1. Check if recruitmentify.json exists")
-        print("2. Verify database URL is correct")
-        print("3. Ensure internet connection is active")
-        print("4. Check Firebase project permissions")
-        return False
 
-# تهيئة Firebase عند استيراد الموديول
-firebase_initialized = initialize_firebase()
+    def reference(self, path=None):
+        """
+        مرجع قاعدة البيانات بعد التأكد من التهيئة
 
-if not firebase_initialized:
-    print("\n⚠️ WARNING: Firebase not initialized properly!")
-    print("The application may not work correctly.")
-    print("Please check the error messages above.\n")
+        Args:
+            path: المسار (None للجذر)
 
-# الحصول على مراجع قاعدة البيانات
-try:
-    ref = db.reference('users')
-    cref = db.reference('companies')
-    jref = db.reference('jops')
-    
-    print("✅ Database references created successfully")
-    print("   - users")
-    print("   - companies")
-    print("   - jops")
-    
-except Exception as e:
-    print(f"❌ Failed to create database references: {str(e)}")
-    # إنشاء مراجع وهمية لتجنب الأخطاء
-    ref = None
-    cref = None
-    jref = None
+        Returns:
+            db.Reference
+        """
+        self.initialize()
+        from firebase_admin import db
+        return db.reference(path) if path else db.reference()
+
+    def count(self, path):
+        """
+        عدد العناصر تحت مسار بقراءة shallow (المفاتيح فقط بدون البيانات)
+
+        Args:
+            path: المسار
+
+        Returns:
+            int
+        """
+        keys = self.reference(path).get(shallow=True)
+        return len(keys) if isinstance(keys, dict) else 0
+
+
+# الاتصال المشترك
+connection = FirebaseConnection()
+
+
+def initialize_firebase():
+    """تهيئة Firebase بشكل آمن"""
+    return connection.initialize()
+
+
+def reference(path=None):
+    """مرجع قاعدة البيانات مع التهيئة عند أول استخدام"""
+    return connection.reference(path)
+
+
+class LazyReference:
+    """مرجع لا يُنشأ (ولا تتم التهيئة) إلا عند أول استخدام"""
+
+    def __init__(self, path):
+        self.path = path
+        self._ref = None
+
+    def _resolve(self):
+        if self._ref is None:
+            self._ref = connection.reference(self.path)
+        return self._ref
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __repr__(self):
+        return f"<LazyReference {self.path}>"
+
+
+# مراجع قاعدة البيانات
+ref = LazyReference('users')
+cref = LazyReference('companies')
+jref = LazyReference('jops')
 
 
 def test_connection():
     """اختبار الاتصال بقاعدة البيانات"""
     try:
-        if ref is None:
-            print("❌ Database reference is None")
+        if not connection.initialize():
+            print("❌ Firebase not initialized")
             return False
         
         # محاولة قراءة بسيطة
@@ -89,10 +166,22 @@ def test_connection():
         return False
 
 
+def count_users():
+    """عدد المتقدمين من العدادات المجمّعة (بدون قراءة سجلات المتقدمين)"""
+    stats = reference("stats").get() or {}
+    return sum(
+        job_stats.get("total", 0)
+        for jobs in stats.values() if isinstance(jobs, dict)
+        for job_stats in jobs.values() if isinstance(job_stats, dict)
+    )
+
+
 def get_database_info():
-    """الحصول على معلومات قاعدة البيانات"""
+    """
+    الحصول على معلومات قاعدة البيانات (للتشخيص عند الطلب فقط)
+    """
     try:
-        if not firebase_initialized:
+        if not connection.initialize():
             return {
                 'status': 'Not Initialized',
                 'users': 0,
@@ -100,15 +189,11 @@ def get_database_info():
                 'jobs': 0
             }
         
-        users_count = len(ref.get() or {})
-        companies_count = len(cref.get() or {})
-        jobs_count = len(jref.get() or {})
-        
         return {
             'status': 'Connected',
-            'users': users_count,
-            'companies': companies_count,
-            'jobs': jobs_count
+            'users': count_users(),
+            'companies': connection.count('companies'),
+            'jobs': connection.count('jops')
         }
         
     except Exception as e:
@@ -119,16 +204,6 @@ def get_database_info():
         }
 
 
-# عرض معلومات الاتصال عند الاستيراد
-if __name__ != "__main__":
-    info = get_database_info()
-    if info['status'] == 'Connected':
-        print(f"\n📊 Database Statistics:")
-        print(f"   Users: {info['users']}")
-        print(f"   Companies: {info['companies']}")
-        print(f"   Jobs: {info['jobs']}\n")
-
-
 # للاختبار المباشر
 if __name__ == "__main__":
     print("\n" + "="*50)
@@ -143,4 +218,4 @@ if __name__ == "__main__":
     else:
         print("\n❌ Connection test failed!")
     
-    print("\n" + "="*50)
\ No newline at end of file
+    print("\n" + "="*50)
@@ -4,11 +4,63 @@ Functions Module - Enhanced
 """
 
 import os
+import re
 import sys
-import base64
-from firebase_connection import ref
-from dotenv import load_dotenv
-import google.generativeai as genai
+import json
+from firebase_connection import ref, reference
+from queries import change_stamp, change_feed_entry, generate_push_key
+from resume_store import store_resume_file, file_sha256
+from score_cache import get_score_cache, keywords_fingerprint
+from pdf_text import get_resume_text
+from prescreen import prescreen, record_fields, skipped_summary
+from stats_store import get_company_stats, record_added
+from ai_client import get_ai_client
+from scoring_backends import get_scoring_backend
+
+
+# نموذج Gemini المستخدم في التحليل (جزء من مفتاح كاش النتائج)
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
+
+# مخطط رد التحليل: JSON مقيد بالمخطط بدل النص الحر
+ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "rating": {"type": "INTEGER"},
+        "summary": {"type": "STRING"},
+        "strengths": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "gaps": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "matched_keywords": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["rating", "summary", "strengths", "gaps", "matched_keywords"],
+}
+
+# تقييم عدة وظائف: نفس الحقول لكل وظيفة مع اسمها
+MULTI_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "jobs": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": dict(ANALYSIS_SCHEMA["properties"], job={"type": "STRING"}),
+                "required": ["job"] + ANALYSIS_SCHEMA["required"],
+            },
+        },
+    },
+    "required": ["jobs"],
+}
+
+# الحقول التي تُحفظ كقوائم في سجل المتقدم
+ANALYSIS_LIST_FIELDS = ["strengths", "gaps", "matched_keywords"]
+
+
+class AnalysisFormatError(ValueError):
+    """رد الـ AI لا يطابق المخطط"""
+
+
+def generation_config(schema):
+    """إعدادات طلب رد JSON مطابق للمخطط"""
+    return {"response_mime_type": "application/json", "response_schema": schema}
 
 
 def get_gemini_api_key():
@@ -44,6 +96,7 @@ def get_gemini_api_key():
     
     # 3. محاولة استخدام dotenv
     try:
+        from dotenv import load_dotenv
         load_dotenv()
         api_key = os.environ.get("GEMINI_API_KEY")
         if api_key:
@@ -58,116 +111,391 @@ def get_gemini_api_key():
     return fallback_key
 
 
-def pdf_push_to_ai(pdfpath, ai_value):
+def ai_client():
+    """عميل الـ AI المشترك (النموذج يُعد مرة واحدة لكل العمليات)"""
+    return get_ai_client(GEMINI_MODEL, get_gemini_api_key)
+
+
+def build_analysis_prompt(ai_value):
+    """
+    بناء الـ prompt الخاص بتحليل السيرة الذاتية
+
+    Args:
+        ai_value: الكلمات المفتاحية للوظيفة
+
+    Returns:
+        نص الـ prompt
+    """
+    return f"""
+        Analyze this CV/Resume for a position with these keywords: {ai_value}
+        
+        Return JSON with:
+        - rating: an accurate integer rating from 1 to 100 based on the keywords
+        - summary: a comprehensive summary of the candidate's skills and experience
+        - strengths: key strengths relevant to the position
+        - gaps: areas for improvement or missing requirements
+        - matched_keywords: the job keywords the CV clearly demonstrates
+        
+        Important:
+        - Give precise ratings (avoid round numbers like 85, 95)
+        - Use specific ratings like 73, 82, 88, etc.
+        - Be fair and objective in your assessment
+        
+        Keep it professional and concise.
+        """
+
+
+def build_multi_job_prompt(jobs):
+    """
+    بناء prompt لتقييم نفس السيرة الذاتية على عدة وظائف في طلب واحد
+
+    Args:
+        jobs: [(اسم الوظيفة، الكلمات المفتاحية)]
+
+    Returns:
+        نص الـ prompt
+    """
+    job_lines = "\n".join(
+        f"        - Job: {name} | Keywords: {keywords}" for name, keywords in jobs
+    )
+    return f"""
+        Analyze this CV/Resume once and rate it separately for EACH of these jobs:
+{job_lines}
+        
+        Return JSON with a "jobs" list holding one entry per job, in the same order:
+        - job: the job name exactly as given
+        - rating: an accurate integer rating from 1 to 100 based on that job's keywords only
+        - summary: the candidate's skills and experience relevant to that job
+        - strengths: key strengths for that job
+        - gaps: areas for improvement or missing requirements for that job
+        - matched_keywords: that job's keywords the CV clearly demonstrates
+        
+        Important:
+        - Give precise ratings (avoid round numbers like 85, 95)
+        - Rate every job independently
+        - Be fair and objective in your assessment
+        
+        Keep it professional and concise.
+        """
+
+
+def upload_pdf_to_ai(pdfpath):
     """
-    إرسال ملف PDF للذكاء الاصطناعي لتحليله
+    رفع ملف PDF إلى Gemini (المرحلة الأولى من التحليل)
     
     Args:
         pdfpath: مسار ملف PDF
-        ai_value: الكلمات المفتاحية للوظيفة
         
     Returns:
-        نص يحتوي على التقييم والملخص
+        الملف المرفوع
     """
     try:
         # التحقق من وجود الملف
         if not os.path.exists(pdfpath):
             raise FileNotFoundError(f"PDF file not found: {pdfpath}")
         
-        # الحصول على API key
-        api_key = get_gemini_api_key()
-        if not api_key:
-            raise ValueError("No API key available")
-        
-        # تكوين Gemini API
-        genai.configure(api_key=api_key)
-        
         print(f"📄 Processing PDF: {os.path.basename(pdfpath)}")
-        print(f"🎯 Keywords: {ai_value}")
-        
-        # تحميل الملف
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        sample_file = genai.upload_file(path=pdfpath, display_name="resume.pdf")
-        
         print("⏳ Uploading to AI...")
         
-        # إنشاء الـ prompt المحسّن
-        prompt = f"""
-        Analyze this CV/Resume and provide:
-        
-        1. A comprehensive summary of the candidate's skills and experience
-        2. Key strengths relevant to the position
-        3. Areas for improvement
-        4. An accurate rating from 1 to 100 based on these keywords: {ai_value}
+        # مكتبة Gemini تُستورد عند أول طلب فقط حتى لا تؤخر فتح النافذة
+        return ai_client().upload(pdfpath)
         
-        Important:
-        - Give precise ratings (avoid round numbers like 85, 95)
-        - Use specific ratings like 73, 82, 88, etc.
-        - Be fair and objective in your assessment
-        
-        CRITICAL: Output MUST be in this EXACT format:
-        Rating: <number>
-        Summary: <detailed summary>
+    except FileNotFoundError as e:
+        print(f"❌ File error: {e}")
+        raise
+    except Exception as e:
+        print(f"❌ AI upload error: {e}")
+        print(f"   Type: {type(e).__name__}")
+        raise
+
+
+def delete_uploaded_pdf(sample_file):
+    """حذف الملف المؤقت من Gemini"""
+    try:
+        sample_file.delete()
+    except:
+        pass
+
+
+def analyze_uploaded_pdf(sample_file, ai_value, prompt=None, schema=ANALYSIS_SCHEMA):
+    """
+    تحليل ملف مرفوع مسبقاً (المرحلة الثانية من التحليل)
+    
+    Args:
+        sample_file: الملف المرفوع من upload_pdf_to_ai
+        ai_value: الكلمات المفتاحية للوظيفة
+        prompt: prompt مخصص (مثل تقييم عدة وظائف)
+        schema: مخطط JSON المطلوب
         
-        Keep it professional and concise.
-        """
+    Returns:
+        نص JSON يحتوي على التقييم والملخص
+    """
+    try:
+        print(f"🎯 Keywords: {ai_value}")
         
         # إرسال للـ AI
-        response = model.generate_content([sample_file, prompt])
+        response = ai_client().generate(
+            [sample_file, prompt or build_analysis_prompt(ai_value)],
+            generation_config=generation_config(schema),
+        )
         
         print("✅ AI analysis completed")
         
-        # حذف الملف المؤقت من Gemini
-        try:
-            sample_file.delete()
-        except:
-            pass
-        
         return response.text
         
-    except FileNotFoundError as e:
-        print(f"❌ File error: {e}")
-        raise
     except Exception as e:
         print(f"❌ AI processing error: {e}")
         print(f"   Type: {type(e).__name__}")
         raise
+    finally:
+        delete_uploaded_pdf(sample_file)
 
 
-def encode_file_to_base64(file_path):
+def lookup_cached_analysis(pdf_sha256, ai_value):
     """
-    تحويل ملف إلى Base64
+    البحث في الكاش ببصمة الملف مباشرة (بدون الحاجة لملف PDF)
+    
+    Returns:
+        نص التحليل أو None
+    """
+    try:
+        aiout = get_score_cache().get(pdf_sha256, ai_value, get_scoring_backend().model)
+    except Exception as e:
+        print(f"⚠️ Score cache unavailable: {e}")
+        return None
+    
+    if aiout is not None:
+        print(f"♻️ Cached AI analysis reused: {pdf_sha256[:12]}")
+    
+    return aiout
+
+
+def cache_analysis(pdf_sha256, ai_value, aiout):
+    """حفظ نتيجة التحليل في الكاش"""
+    try:
+        get_score_cache().put(pdf_sha256, ai_value, get_scoring_backend().model, aiout)
+    except Exception as e:
+        print(f"⚠️ Failed to cache AI analysis: {e}")
+
+
+def analyze_resume_text(resume_text, ai_value, prompt=None, schema=ANALYSIS_SCHEMA):
+    """
+    تحليل نص السيرة الذاتية المستخرج محلياً (طلب واحد بدون رفع الملف)
     
     Args:
-        file_path: مسار الملف
+        resume_text: نص السيرة الذاتية
+        ai_value: الكلمات المفتاحية للوظيفة
+        prompt: prompt مخصص (مثل تقييم عدة وظائف)
+        schema: مخطط JSON المطلوب
         
     Returns:
-        نص Base64 أو None
+        نص JSON يحتوي على التقييم والملخص
     """
     try:
-        if not os.path.exists(file_path):
-            print(f"❌ File not found: {file_path}")
-            return None
-        
-        # قراءة الملف
-        with open(file_path, "rb") as file:
-            file_data = file.read()
+        print(f"🎯 Keywords: {ai_value}")
+        print(f"📝 Sending extracted text: {len(resume_text)} chars")
         
-        # تحويل إلى Base64
-        encoded_string = base64.b64encode(file_data).decode("utf-8")
+        response = ai_client().generate(
+            [
+                prompt or build_analysis_prompt(ai_value),
+                f"CV/Resume text:\n{resume_text}",
+            ],
+            generation_config=generation_config(schema),
+        )
         
-        # حساب حجم البيانات
-        size_kb = len(encoded_string) / 1024
-        print(f"✅ File encoded: {size_kb:.2f} KB")
+        print("✅ AI analysis completed")
         
-        return encoded_string
+        return response.text
         
     except Exception as e:
-        print(f"❌ Encoding error: {e}")
-        return None
+        print(f"❌ AI processing error: {e}")
+        print(f"   Type: {type(e).__name__}")
+        raise
+
+
+def repair_analysis(raw_output, schema=ANALYSIS_SCHEMA):
+    """
+    طلب إصلاح واحد رخيص لرد لا يطابق المخطط (بدون إعادة إرسال السيرة الذاتية)
+    
+    Args:
+        raw_output: الرد غير الصالح
+        schema: مخطط JSON المطلوب
+        
+    Returns:
+        نص JSON بعد الإصلاح
+    """
+    print("🔧 Repairing malformed AI response...")
+    
+    response = ai_client().generate(
+        [
+            "The following response was supposed to be JSON matching the given schema "
+            "but is malformed or incomplete. Return only the corrected JSON. Keep the "
+            "original ratings and wording and do not invent new content.",
+            f"Response:\n{raw_output}",
+        ],
+        generation_config=generation_config(schema),
+        operation="repair",
+    )
+    return response.text
+
+
+def parse_with_repair(aiout, parse, schema=ANALYSIS_SCHEMA):
+    """
+    تحليل رد الـ AI مع محاولة إصلاح واحدة بدل إعادة التحليل كاملاً
+    
+    Args:
+        aiout: رد الـ AI
+        parse: دالة التحليل (ترفع AnalysisFormatError)
+        schema: مخطط JSON المطلوب
+        
+    Returns:
+        نتيجة parse
+    """
+    try:
+        return parse(aiout)
+    except AnalysisFormatError as e:
+        print(f"⚠️ Invalid AI response ({e}), trying one repair")
+    
+    # فشل الإصلاح يرفع الخطأ بدل حفظ تقييم 0
+    return parse(get_scoring_backend().repair(aiout, schema))
 
 
-def push_customer_data_to_firebase(full_name, email, status, rating, summary, file_path, company, job):
+def analysis_fields(analysis):
+    """الحقول الإضافية من التحليل التي تُحفظ في سجل المتقدم"""
+    return {field: analysis.get(field) or [] for field in ANALYSIS_LIST_FIELDS}
+
+
+def score_resume(pdfpath, ai_value, company, on_stage=None, before_ai=None, parser=None):
+    """
+    تقييم سيرة ذاتية على وظيفة واحدة (انظر score_resume_for_jobs)
+    
+    Returns:
+        dict: rating, summary, pdf_sha256, source, fields (حقول إضافية للسجل)
+    """
+    result = score_resume_for_jobs(
+        pdfpath, [("", ai_value)], company,
+        on_stage=on_stage, before_ai=before_ai, parser=parser
+    )
+    return dict(result["jobs"][""], pdf_sha256=result["pdf_sha256"])
+
+
+def score_resume_for_jobs(pdfpath, jobs, company, on_stage=None, before_ai=None, parser=None,
+                          force=False):
+    """
+    تقييم سيرة ذاتية على وظيفة أو أكثر: استخراج النص ← فرز أولي ← كاش ← AI
+    
+    الوظائف التي لم تُقيّم من الكاش أو الفرز الأولي تُرسل معاً في رفع
+    واحد وطلب تحليل واحد، وتُحفظ نتيجة كل وظيفة في الكاش منفصلة
+    
+    Args:
+        pdfpath: مسار ملف PDF
+        jobs: [(اسم الوظيفة، الكلمات المفتاحية)]
+        company: اسم الشركة (لإعدادات الفرز الأولي)
+        on_stage: دالة تُستدعى باسم كل مرحلة قبل بدئها
+                  (extract, prescreen, cache, upload, analysis)
+        before_ai: دالة تُستدعى قبل طلب الـ AI مباشرة (مثل حد المعدل)
+        parser: تحويل رد الـ AI لوظيفة واحدة إلى dict (TextProcessor.parseAnalysis)
+        force: تجاهل حد الفرز الأولي (تقييم السجلات المؤجلة)
+        
+    Returns:
+        dict: pdf_sha256, jobs: {اسم الوظيفة: rating, summary, source, fields}
+    """
+    on_stage = on_stage or (lambda stage: None)
+    parser = parser or TextProcessor.parseAnalysis
+    
+    if not os.path.exists(pdfpath):
+        raise FileNotFoundError(f"PDF file not found: {pdfpath}")
+    
+    pdf_sha256 = file_sha256(pdfpath)
+    results = {}
+    
+    on_stage("extract")
+    resume_text = get_resume_text(pdfpath, pdf_sha256)
+    
+    screened = {}
+    if resume_text:
+        on_stage("prescreen")
+        for name, keywords in jobs:
+            screened[name] = prescreen(resume_text, keywords, company, force=force)
+    
+    def fields_for(name, keywords):
+        fields = {"keywords_sha": keywords_fingerprint(keywords)}
+        if name in screened:
+            fields.update(record_fields(screened[name]))
+        return fields
+    
+    on_stage("cache")
+    pending = []
+    for name, keywords in jobs:
+        analysis = None
+        aiout = lookup_cached_analysis(pdf_sha256, keywords)
+        if aiout is not None:
+            try:
+                analysis = parser(aiout)
+            except AnalysisFormatError as e:
+                print(f"⚠️ Ignoring invalid cached analysis: {e}")
+        
+        if analysis is not None:
+            source = "cache"
+        elif name in screened and screened[name]["decision"] in ("skipped", "deferred"):
+            # أقل من حد الشركة: لا يُرسل للـ AI
+            analysis = {
+                "rating": screened[name]["score"],
+                "summary": skipped_summary(screened[name]),
+            }
+            source = "prescreen"
+        else:
+            pending.append((name, keywords))
+            continue
+        results[name] = {
+            "rating": analysis["rating"],
+            "summary": analysis["summary"],
+            "source": source,
+            "fields": dict(fields_for(name, keywords), **analysis_fields(analysis)),
+        }
+    
+    if not pending:
+        return {"pdf_sha256": pdf_sha256, "jobs": results}
+    
+    # كل الوظائف المتبقية في طلب واحد للمزود المختار (SCORING_BACKEND)
+    backend = get_scoring_backend()
+    if resume_text:
+        on_stage("analysis")
+        if before_ai:
+            before_ai()
+        aiout = backend.analyze_text(resume_text, pending)
+        source = "text"
+    else:
+        # ملف ممسوح ضوئياً: رفع الملف كاملاً
+        on_stage("upload")
+        if before_ai:
+            before_ai()
+        aiout = backend.analyze_file(pdfpath, pending, on_stage=on_stage)
+        source = "upload"
+    
+    if len(pending) == 1:
+        parsed = {pending[0][0]: parse_with_repair(aiout, parser)}
+    else:
+        names = [name for name, _ in pending]
+        parsed = parse_with_repair(
+            aiout, lambda out: TextProcessor.parseMultiAnalysis(out, names), MULTI_ANALYSIS_SCHEMA
+        )
+    
+    # كل وظيفة تُحفظ في الكاش منفصلة بعد التحقق من صحتها
+    for name, job_keywords in pending:
+        analysis = parsed[name]
+        cache_analysis(pdf_sha256, job_keywords, json.dumps(analysis, ensure_ascii=False))
+        results[name] = {
+            "rating": analysis["rating"],
+            "summary": analysis["summary"],
+            "source": source,
+            "fields": dict(fields_for(name, job_keywords), **analysis_fields(analysis)),
+        }
+    
+    return {"pdf_sha256": pdf_sha256, "jobs": results}
+
+
+def push_customer_data_to_firebase(full_name, email, status, rating, summary, file_path, company, job, extra=None):
     """
     حفظ بيانات المتقدم في Firebase
     
@@ -180,6 +508,7 @@ def push_customer_data_to_firebase(full_name, email, status, rating, summary, fi
         file_path: مسار ملف السيرة الذاتية
         company: اسم الشركة
         job: اسم الوظيفة
+        extra: حقول إضافية للسجل (مثل نتيجة الفرز الأولي)
     """
     try:
         print("\n" + "="*50)
@@ -196,6 +525,8 @@ def push_customer_data_to_firebase(full_name, email, status, rating, summary, fi
             "company": company,
             "job": job
         }
+        user_data.update(extra or {})
+        user_data.update(change_stamp(company))
         
         print(f"👤 Name: {full_name}")
         print(f"📧 Email: {email}")
@@ -209,28 +540,34 @@ def push_customer_data_to_firebase(full_name, email, status, rating, summary, fi
         
         print(f"📄 Processing file: {os.path.basename(file_path)}")
         
-        # تحويل الملف إلى Base64
-        encoded_file = encode_file_to_base64(file_path)
-        
-        if not encoded_file:
-            raise Exception("Failed to encode file")
+        # حفظ الملف في مخزن السير الذاتية والإبقاء على مرجع فقط في السجل
+        if ref is None:
+            raise Exception("Firebase reference is None")
         
-        # إضافة البيانات المشفرة
-        user_data["resume_data"] = encoded_file
+        user_data.update(store_resume_file(file_path))
         
-        print("🔐 File encoded successfully")
+        print("🔐 Resume stored separately from applicant record")
         
         # حفظ في قاعدة البيانات
-        if ref is None:
-            raise Exception("Firebase reference is None")
         
-        new_user_ref = ref.push(user_data)
+        # السجل ومدخل سجل تغييرات الشركة في كتابة واحدة
+        key = generate_push_key()
+        reference().update({
+            f"users/{key}": user_data,
+            **change_feed_entry(company, key, user_data["updated_at"]),
+        })
         
-        print(f"✅ Data saved successfully!")
-        print(f"🔑 Firebase Key: {new_user_ref.key}")
+        # تحديث العدادات المجمّعة (تُصحَّح بـ rebuild_stats عند الفشل)
+        try:
+            record_added(user_data)
+        except Exception as e:
+            print(f"⚠️ Failed to update stats: {e}")
+        
+        print("✅ Data saved successfully!")
+        print(f"🔑 Firebase Key: {key}")
         print("="*50 + "\n")
         
-        return new_user_ref.key
+        return key
         
     except ValueError as e:
         print(f"❌ Validation error: {e}")
@@ -241,6 +578,129 @@ def push_customer_data_to_firebase(full_name, email, status, rating, summary, fi
         raise
 
 
+class TextProcessor:
+    @staticmethod
+    def stripText(aiout):
+        rating_match = re.search(r'Rating\s*:\s*(\d+)', aiout)
+        summary_match = re.search(r'Summary\s*:\s*(.*)', aiout, re.DOTALL)
+        
+        if rating_match:
+            rating = int(rating_match.group(1).strip())
+        else:
+            rating = 0
+            print("⚠️ Rating not found, using default 0")
+        
+        if summary_match:
+            summary = summary_match.group(1).strip()
+        else:
+            summary = "No summary available"
+            print("⚠️ Summary not found")
+        
+        return [rating, summary]
+    
+    @staticmethod
+    def _loadJson(aiout):
+        text = (aiout or "").strip()
+        # أحياناً يأتي الرد داخل ```json
+        fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+        if fenced:
+            text = fenced.group(1)
+        return json.loads(text)
+    
+    @staticmethod
+    def validateAnalysis(data):
+        """
+        التحقق من تحليل وظيفة واحدة وتوحيد أنواعه
+        
+        Returns:
+            dict: rating (int), summary (str), strengths, gaps, matched_keywords (list)
+        """
+        if not isinstance(data, dict):
+            raise AnalysisFormatError("Analysis is not a JSON object")
+        
+        try:
+            rating = int(round(float(data.get("rating"))))
+        except (TypeError, ValueError):
+            raise AnalysisFormatError(f"Invalid rating: {data.get('rating')!r}")
+        if not 0 <= rating <= 100:
+            raise AnalysisFormatError(f"Rating out of range: {rating}")
+        
+        summary = data.get("summary")
+        if not isinstance(summary, str) or not summary.strip():
+            raise AnalysisFormatError("Missing summary")
+        
+        analysis = {"rating": rating, "summary": summary.strip()}
+        for field in ANALYSIS_LIST_FIELDS:
+            values = data.get(field) or []
+            if isinstance(values, str):
+                values = [values]
+            if not isinstance(values, list):
+                raise AnalysisFormatError(f"{field} is not a list")
+            analysis[field] = [str(value).strip() for value in values if str(value).strip()]
+        
+        return analysis
+    
+    @staticmethod
+    def parseAnalysis(aiout):
+        """
+        تحليل رد الـ AI لوظيفة واحدة
+        
+        الرد JSON حسب ANALYSIS_SCHEMA، والنتائج القديمة في الكاش بصيغة
+        Rating:/Summary: تُقرأ بـ stripText
+        
+        Raises:
+            AnalysisFormatError: إذا لم يكن الرد صالحاً
+        """
+        try:
+            data = TextProcessor._loadJson(aiout)
+        except ValueError:
+            if not re.search(r'Rating\s*:\s*\d+', aiout or ""):
+                raise AnalysisFormatError("Response is not valid JSON")
+            rating, summary = TextProcessor.stripText(aiout)
+            return dict({"rating": rating, "summary": summary},
+                        **{field: [] for field in ANALYSIS_LIST_FIELDS})
+        
+        return TextProcessor.validateAnalysis(data)
+    
+    @staticmethod
+    def parseMultiAnalysis(aiout, job_names):
+        """
+        تحليل رد تقييم عدة وظائف (MULTI_ANALYSIS_SCHEMA)
+        
+        الإدخالات تُطابق باسم الوظيفة، وإن لم يُطابق الاسم فبالترتيب
+        
+        Returns:
+            dict: {اسم الوظيفة: تحليل الوظيفة}
+            
+        Raises:
+            AnalysisFormatError: إذا لم يكن الرد صالحاً أو نقصت وظيفة
+        """
+        try:
+            data = TextProcessor._loadJson(aiout)
+        except ValueError:
+            raise AnalysisFormatError("Response is not valid JSON")
+        
+        entries = data.get("jobs") if isinstance(data, dict) else data
+        if not isinstance(entries, list):
+            raise AnalysisFormatError("Missing jobs list")
+        
+        by_name = {
+            str(entry.get("job", "")).strip().lower(): entry
+            for entry in entries if isinstance(entry, dict)
+        }
+        
+        result = {}
+        for index, name in enumerate(job_names):
+            entry = by_name.get(name.strip().lower())
+            if entry is None and len(entries) == len(job_names):
+                entry = entries[index]
+            if entry is None:
+                raise AnalysisFormatError(f"No analysis for job: {name}")
+            result[name] = TextProcessor.validateAnalysis(entry)
+        
+        return result
+
+
 def validate_email(email):
     """
     التحقق من صحة البريد الإلكتروني
@@ -311,50 +771,8 @@ def get_application_stats(company_name):
         if ref is None:
             return None
         
-        all_users = ref.get()
-        
-        if not all_users:
-            return {
-                'total': 0,
-                'pending': 0,
-                'approved': 0,
-                'rejected': 0,
-                'avg_rating': 0
-            }
-        
-        # فلترة حسب الشركة
-        company_users = [
-            user for user in all_users.values()
-            if user.get('company') == company_name
-        ]
-        
-        if not company_users:
-            return {
-                'total': 0,
-                'pending': 0,
-                'approved': 0,
-                'rejected': 0,
-                'avg_rating': 0
-            }
-        
-        # حساب الإحصائيات
-        stats = {
-            'total': len(company_users),
-            'pending': sum(1 for u in company_users if u.get('status') == 'Pending'),
-            'approved': sum(1 for u in company_users if u.get('status') == 'Approved'),
-            'rejected': sum(1 for u in company_users if u.get('status') == 'Rejected'),
-        }
-        
-        # حساب متوسط التقييم
-        ratings = [
-            float(u.get('raiting', 0))
-            for u in company_users
-            if u.get('raiting')
-        ]
-        
-        stats['avg_rating'] = sum(ratings) / len(ratings) if ratings else 0
-        
-        return stats
+        # قراءة واحدة من العدادات المجمّعة بدل فحص كل المتقدمين
+        return get_company_stats(company_name)
         
     except Exception as e:
         print(f"❌ Error getting stats: {e}")
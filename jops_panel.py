@@ -3,10 +3,40 @@ from PyQt5.QtWidgets import (
     QLabel, QListWidget, QMessageBox, QApplication
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
-from firebase_admin import db
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from session_handler import load_session
-from firebase_connection import jref
+from firebase_connection import jref, reference
+from local_cache import get_cache
+
+
+class RerankThread(QThread):
+    """إعادة تقييم متقدمي وظيفة في الخلفية بعد تعديل كلماتها"""
+
+    progress = pyqtSignal(int, int)     # done, total
+    completed = pyqtSignal(dict)        # ملخص التشغيل
+    failed = pyqtSignal(str)
+
+    def __init__(self, company_name, job_key, job, parent=None):
+        super().__init__(parent)
+        self.company_name = company_name
+        self.job_key = job_key
+        self.job = job
+
+    def run(self):
+        from rerank import rerank_job
+
+        try:
+            summary = rerank_job(
+                self.company_name, self.job.get("name"),
+                keywords=self.job.get("value"),
+                job_key=self.job_key,
+                on_progress=self.progress.emit,
+                should_stop=self.isInterruptionRequested,
+            )
+            self.completed.emit(summary)
+        except Exception as e:
+            print(f"Re-rank failed: {e}")
+            self.failed.emit(str(e))
 
 
 class JobManager(QWidget):
@@ -15,6 +45,8 @@ class JobManager(QWidget):
         self.setWindowTitle("Job Manager")
         self.setMinimumWidth(600)
         self.current_theme = "dark"
+        self.rerank_thread = None
+        self.jobs_data = {}
 
         session = load_session()
         self.company_name = session.get("company_name", "")
@@ -38,6 +70,7 @@ class JobManager(QWidget):
         self.layout.addLayout(header_layout)
 
         self.job_list = QListWidget()
+        self.job_list.currentItemChanged.connect(self.on_job_selected)
         self.layout.addWidget(self.job_list)
 
         self.input_layout = QHBoxLayout()
@@ -61,7 +94,18 @@ class JobManager(QWidget):
         self.remove_button.clicked.connect(self.remove_selected_job)
         self.button_layout.addWidget(self.remove_button)
 
+        self.update_button = QPushButton("Update Keywords")
+        self.update_button.clicked.connect(self.update_selected_job)
+        self.button_layout.addWidget(self.update_button)
+
+        self.rerank_button = QPushButton("Re-rank Applicants")
+        self.rerank_button.clicked.connect(self.rerank_selected_job)
+        self.button_layout.addWidget(self.rerank_button)
+
         self.layout.addLayout(self.button_layout)
+
+        self.rerank_label = QLabel("")
+        self.layout.addWidget(self.rerank_label)
         self.setLayout(self.layout)
 
         self.load_jobs()
@@ -138,19 +182,26 @@ class JobManager(QWidget):
         self.apply_theme(self.current_theme)
 
     def load_jobs(self):
-        self.job_list.clear()
-        jref = db.reference('jops')
-        all_jobs = jref.get()
+        cache = get_cache()
 
-        if not all_jobs:
+        # عرض النسخة المحلية فوراً ثم المزامنة
+        self.show_jobs(cache.jobs(self.company_name))
+        try:
+            cache.sync_jobs(self.company_name)
+        except Exception as e:
+            print(f"Job sync failed: {e}")
             return
+        self.show_jobs(cache.jobs(self.company_name))
 
+    def show_jobs(self, company_jobs):
+        self.job_list.clear()
         self.jobs_dict = {}
-        for key, job in all_jobs.items():
-            if job.get("company_name") == self.company_name:
-                display = f"{job.get('name')} - Keywords: {job.get('value')}"
-                self.job_list.addItem(display)
-                self.jobs_dict[display] = key
+        self.jobs_data = company_jobs
+
+        for key, job in company_jobs.items():
+            display = f"{job.get('name')} - Keywords: {job.get('value')}"
+            self.job_list.addItem(display)
+            self.jobs_dict[display] = key
 
     def add_job(self):
         name = self.job_name_input.text().strip()
@@ -159,7 +210,7 @@ class JobManager(QWidget):
             QMessageBox.warning(self, "Missing Info", "Job title and keywords are required.")
             return
 
-        db.reference("jops").push().set({
+        reference("jops").push().set({
             "name": name,
             "value": value,
             "company_name": self.company_name
@@ -175,11 +226,101 @@ class JobManager(QWidget):
         if selected:
             key = self.jobs_dict.get(selected.text())
             if key:
-                db.reference(f"jops/{key}").delete()
+                reference(f"jops/{key}").delete()
                 self.load_jobs()
         else:
             QMessageBox.information(self, "No Selection", "Please select a job to remove.")
 
+    def selected_job_key(self):
+        selected = self.job_list.currentItem()
+        return self.jobs_dict.get(selected.text()) if selected else None
+
+    def on_job_selected(self, current, previous=None):
+        key = self.selected_job_key()
+        if key:
+            job = self.jobs_data.get(key, {})
+            self.job_name_input.setText(job.get("name", ""))
+            self.keywords_input.setText(job.get("value", ""))
+
+    def update_selected_job(self):
+        """تعديل كلمات الوظيفة المحددة ثم إعادة تقييم متقدميها"""
+        key = self.selected_job_key()
+        if not key:
+            QMessageBox.information(self, "No Selection", "Please select a job to update.")
+            return
+
+        value = self.keywords_input.text().strip()
+        if not value:
+            QMessageBox.warning(self, "Missing Info", "Keywords are required.")
+            return
+
+        job = dict(self.jobs_data.get(key, {}))
+        if value == job.get("value"):
+            return
+
+        # الاسم لا يتغير: سجلات المتقدمين مرتبطة باسم الوظيفة
+        reference(f"jops/{key}").update({"value": value})
+        job["value"] = value
+
+        self.load_jobs()
+        self.start_rerank(key, job)
+
+    def rerank_selected_job(self):
+        """إعادة تقييم (أو استكمال) متقدمي الوظيفة المحددة"""
+        key = self.selected_job_key()
+        if not key:
+            QMessageBox.information(self, "No Selection", "Please select a job to re-rank.")
+            return
+        self.start_rerank(key, self.jobs_data.get(key, {}))
+
+    def start_rerank(self, job_key, job):
+        if self.rerank_thread is not None and self.rerank_thread.isRunning():
+            QMessageBox.information(self, "Re-ranking", "A re-rank is already running.")
+            return
+
+        self.rerank_label.setText(f"Re-ranking applicants for {job.get('name')}...")
+        self.rerank_button.setEnabled(False)
+        self.update_button.setEnabled(False)
+
+        self.rerank_thread = RerankThread(self.company_name, job_key, job, self)
+        self.rerank_thread.progress.connect(self.on_rerank_progress)
+        self.rerank_thread.completed.connect(self.on_rerank_completed)
+        self.rerank_thread.failed.connect(self.on_rerank_failed)
+        self.rerank_thread.start()
+
+    def on_rerank_progress(self, done, total):
+        self.rerank_label.setText(f"Re-ranking applicants: {done}/{total}")
+
+    def on_rerank_completed(self, summary):
+        self.rerank_button.setEnabled(True)
+        self.update_button.setEnabled(True)
+        self.rerank_label.setText(
+            f"Re-rank {summary['state']}: {summary['done']}/{summary['total']} "
+            f"({summary['local']} local, {summary['ai_calls']} AI, {summary['failed']} failed)"
+        )
+
+    def on_rerank_failed(self, error):
+        self.rerank_button.setEnabled(True)
+        self.update_button.setEnabled(True)
+        self.rerank_label.setText(f"Re-rank failed: {error} (run it again to resume)")
+
+    def closeEvent(self, event):
+        """
+        إيقاف إعادة التقييم بعد الدفعة الحالية (تُستكمل لاحقاً)
+
+        الدفعة قد تستغرق دقائق، فلا ننتظرها على خيط الواجهة: الإغلاق يُؤجل
+        والنافذة تُغلق نفسها عند انتهاء الخيط
+        """
+        if self.rerank_thread is not None and self.rerank_thread.isRunning():
+            if not self.rerank_thread.isInterruptionRequested():
+                self.rerank_thread.requestInterruption()
+                self.rerank_thread.finished.connect(self.close)
+            self.rerank_label.setText("Stopping re-rank after the current batch...")
+            self.setEnabled(False)
+            event.ignore()
+            return
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     import sys
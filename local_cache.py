@@ -0,0 +1,380 @@
+"""
+Local Cache Module
+نسخة SQLite محلية من users (بدون ملفات) و companies و jops مع مزامنة تزايدية
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from queries import (
+    get_applicants_changed_since,
+    get_applicants_deleted_since,
+    get_company_applicants,
+    get_company_jobs,
+)
+from summary_index import DEFAULT_LIMIT, install_summary_index, search_summaries
+from utils import get_app_directory, ensure_directory_exists
+
+
+# نافذة أمان لفروق الساعة بين الأجهزة التي تكتب updated_at
+SYNC_SAFETY_WINDOW_MS = 5 * 60 * 1000
+
+USER_COLUMNS = [
+    "full_name", "email", "company", "job", "status", "raiting", "summary",
+    "resume_ref", "resume_size", "resume_sha256", "updated_at",
+    "strengths", "gaps", "matched_keywords",
+]
+
+# حقول التحليل التي تُحفظ كقوائم (JSON في SQLite)
+LIST_COLUMNS = ["strengths", "gaps", "matched_keywords"]
+
+JOB_COLUMNS = ["name", "value", "company_name"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    key TEXT PRIMARY KEY,
+    full_name TEXT,
+    email TEXT,
+    company TEXT,
+    job TEXT,
+    status TEXT,
+    raiting REAL,
+    summary TEXT,
+    resume_ref TEXT,
+    resume_size INTEGER,
+    resume_sha256 TEXT,
+    updated_at INTEGER,
+    strengths TEXT,
+    gaps TEXT,
+    matched_keywords TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_company ON users(company);
+CREATE INDEX IF NOT EXISTS idx_users_company_status ON users(company, status);
+CREATE INDEX IF NOT EXISTS idx_users_company_job ON users(company, job);
+CREATE INDEX IF NOT EXISTS idx_users_company_rating ON users(company, raiting);
+
+CREATE TABLE IF NOT EXISTS companies (
+    key TEXT PRIMARY KEY,
+    company_name TEXT,
+    email TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_companies_email ON companies(email);
+
+CREATE TABLE IF NOT EXISTS jops (
+    key TEXT PRIMARY KEY,
+    name TEXT,
+    value TEXT,
+    company_name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jops_company ON jops(company_name);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+# أعمدة الترتيب المسموحة (لا نمرر نص المستخدم إلى SQL مباشرة)
+ORDER_BY = {
+    "name": "full_name COLLATE NOCASE",
+    "job": "job COLLATE NOCASE",
+    "rating": "raiting DESC",
+    "status": "status",
+}
+
+
+def _list_to_db(value):
+    return json.dumps(value, ensure_ascii=False) if value else None
+
+
+def _list_from_db(value):
+    return json.loads(value) if value else []
+
+
+def _user_from_row(row):
+    record = {c: row[c] for c in USER_COLUMNS}
+    for column in LIST_COLUMNS:
+        record[column] = _list_from_db(record[column])
+    return record
+
+
+def applicant_record(record):
+    """
+    سجل متقدم بنفس شكل سجلات القاعدة المحلية
+
+    سجلات Firebase الكاملة تُختصر لأعمدة USER_COLUMNS، والتقييم رقم عشري
+    وحقول القوائم قوائم دائماً، حتى تُقارن بسجلات القاعدة مباشرة
+
+    Args:
+        record: سجل المتقدم من Firebase
+
+    Returns:
+        dict: السجل بأعمدة USER_COLUMNS
+    """
+    normalized = {c: record.get(c) for c in USER_COLUMNS}
+    normalized["raiting"] = _rating(record.get("raiting"))
+    for column in LIST_COLUMNS:
+        normalized[column] = list(record.get(column) or [])
+    return normalized
+
+
+def _rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class LocalCache:
+    """قاعدة SQLite محلية مفهرسة حسب مفتاح Firebase"""
+
+    def __init__(self, path=None):
+        if path is None:
+            cache_dir = os.path.join(get_app_directory(), "cache")
+            ensure_directory_exists(cache_dir)
+            path = os.path.join(cache_dir, "recruitmentify.db")
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            self._add_missing_columns()
+            self.summary_search = install_summary_index(self._conn)
+
+    def _add_missing_columns(self):
+        """إضافة الأعمدة الجديدة لقاعدة أنشأها إصدار سابق"""
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(users)")}
+        for column in LIST_COLUMNS:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE users ADD COLUMN {column} TEXT")
+        self._conn.commit()
+
+    # ===== المتقدمون =====
+
+    def upsert_user(self, key, record, commit=True):
+        values = [record.get(column) for column in USER_COLUMNS]
+        values[USER_COLUMNS.index("raiting")] = _rating(record.get("raiting"))
+        for column in LIST_COLUMNS:
+            values[USER_COLUMNS.index(column)] = _list_to_db(record.get(column))
+
+        # UPSERT بدل INSERT OR REPLACE: يحافظ على rowid ويشغّل trigger التحديث
+        # الذي يحدّث فهرس الملخصات
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO users (key, {', '.join(USER_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' for _ in USER_COLUMNS)}) "
+                f"ON CONFLICT(key) DO UPDATE SET "
+                f"{', '.join(f'{column} = excluded.{column}' for column in USER_COLUMNS)}",
+                [key] + values,
+            )
+            if commit:
+                self._conn.commit()
+
+    def delete_user(self, key, commit=True):
+        with self._lock:
+            self._conn.execute("DELETE FROM users WHERE key = ?", (key,))
+            if commit:
+                self._conn.commit()
+
+    def replace_company_users(self, company, records):
+        """استبدال كل سجلات شركة بلقطة كاملة"""
+        with self._lock:
+            self._conn.execute("DELETE FROM users WHERE company = ?", (company,))
+            for key, record in records.items():
+                if isinstance(record, dict):
+                    self.upsert_user(key, record, commit=False)
+            self._conn.commit()
+
+    def applicants(self, company, status=None, search=None, order_by=None):
+        """
+        سجلات متقدمي شركة من القاعدة المحلية
+
+        Args:
+            company: اسم الشركة
+            status: فلترة حسب الحالة (Approved/Pending/Rejected)
+            search: نص يُبحث عنه في الاسم أو البريد أو الوظيفة
+            order_by: name/job/rating/status
+
+        Returns:
+            dict: {firebase_key: record} بنفس ترتيب الاستعلام
+        """
+        sql = f"SELECT key, {', '.join(USER_COLUMNS)} FROM users WHERE company = ?"
+        params = [company]
+
+        if status:
+            sql += " AND status = ?"
+            params.append(status)
+
+        if search:
+            pattern = f"%{search}%"
+            sql += " AND (full_name LIKE ? OR email LIKE ? OR job LIKE ?)"
+            params += [pattern, pattern, pattern]
+
+        sql += f" ORDER BY {ORDER_BY.get(order_by, 'key')}"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return {row["key"]: _user_from_row(row) for row in rows}
+
+    def search_summaries(self, company, text, limit=DEFAULT_LIMIT):
+        """
+        بحث مرتب (BM25) داخل ملخصات متقدمي شركة
+
+        Returns:
+            (list, bool): [(firebase_key, score)] الأفضل أولاً، وهل قُطعت النتائج
+                          عند limit ([] بدون FTS5)
+        """
+        if not self.summary_search:
+            return [], False
+        with self._lock:
+            return search_summaries(self._conn, company, text, limit)
+
+    def company_stats(self, company):
+        """
+        إحصائيات شركة بنفس شكل stats_store.get_company_stats
+
+        Returns:
+            dict: total, approved, pending, rejected, avg_rating, by_job
+        """
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM users WHERE company = ? GROUP BY status",
+                (company,),
+            ).fetchall())
+            avg = self._conn.execute(
+                "SELECT AVG(raiting) FROM users WHERE company = ? AND raiting > 0",
+                (company,),
+            ).fetchone()[0]
+            by_job = dict(self._conn.execute(
+                "SELECT job, COUNT(*) FROM users WHERE company = ? GROUP BY job",
+                (company,),
+            ).fetchall())
+
+        return {
+            "total": sum(counts.values()),
+            "approved": counts.get("Approved", 0),
+            "pending": counts.get("Pending", 0),
+            "rejected": counts.get("Rejected", 0),
+            "avg_rating": avg or 0,
+            "by_job": by_job,
+        }
+
+    # ===== الوظائف =====
+
+    def replace_company_jobs(self, company, jobs):
+        with self._lock:
+            self._conn.execute("DELETE FROM jops WHERE company_name = ?", (company,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO jops (key, name, value, company_name) VALUES (?, ?, ?, ?)",
+                [
+                    (key, job.get("name"), job.get("value"), job.get("company_name"))
+                    for key, job in jobs.items() if isinstance(job, dict)
+                ],
+            )
+            self._conn.commit()
+
+    def jobs(self, company):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, name, value, company_name FROM jops "
+                "WHERE company_name = ? ORDER BY key",
+                (company,),
+            ).fetchall()
+        return {row["key"]: {c: row[c] for c in JOB_COLUMNS} for row in rows}
+
+    # ===== الشركات =====
+
+    def upsert_company(self, key, company):
+        # كلمة المرور لا تُخزَّن محلياً
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO companies (key, company_name, email) VALUES (?, ?, ?)",
+                (key, company.get("company_name"), company.get("email")),
+            )
+            self._conn.commit()
+
+    def company_id(self, email):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key FROM companies WHERE email = ?", (email,)
+            ).fetchone()
+        return row["key"] if row else None
+
+    # ===== حالة المزامنة =====
+
+    def get_state(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE name = ?", (name,)
+            ).fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, name, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)",
+                (name, value),
+            )
+            self._conn.commit()
+
+    def mark_users_synced(self, company, timestamp_ms=None):
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        self.set_state(f"users:{company}", timestamp_ms)
+
+    # ===== المزامنة مع Firebase =====
+
+    def sync_users(self, company):
+        """
+        مزامنة متقدمي شركة: تحميل كامل أول مرة ثم التغييرات فقط
+
+        Returns:
+            int: عدد السجلات المضافة أو المحدثة أو المحذوفة
+        """
+        started = int(time.time() * 1000)
+        watermark = self.get_state(f"users:{company}")
+
+        if watermark is None:
+            records = get_company_applicants(company)
+            self.replace_company_users(company, records)
+            self.mark_users_synced(company, started)
+            print(f"✅ Local cache seeded: {len(records)} applicants")
+            return len(records)
+
+        since = max(0, watermark - SYNC_SAFETY_WINDOW_MS)
+        changed = get_applicants_changed_since(company, since)
+        deleted = get_applicants_deleted_since(company, since)
+
+        with self._lock:
+            for key, record in changed.items():
+                self.upsert_user(key, record, commit=False)
+            for key in deleted:
+                self.delete_user(key, commit=False)
+            self._conn.commit()
+
+        self.mark_users_synced(company, started)
+        print(f"🔄 Local cache synced: {len(changed)} changed, {len(deleted)} deleted")
+        return len(changed) + len(deleted)
+
+    def sync_jobs(self, company):
+        """مزامنة وظائف شركة (عددها صغير فتُستبدل كاملة)"""
+        jobs = get_company_jobs(company)
+        self.replace_company_jobs(company, jobs)
+        return len(jobs)
+
+
+_cache = None
+
+
+def get_cache():
+    """الحصول على نسخة القاعدة المحلية المشتركة"""
+    global _cache
+    if _cache is None:
+        _cache = LocalCache()
+    return _cache
@@ -6,9 +6,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
-from firebase_admin import db
-fimport EnhancedAdminPage as AdminPage  # استخدام النسخة المحسنة
-from companies.session_handler import save_session
+from session_handler import save_session
+from company_index import authenticate_company, get_company_id, register_company
 
 
 class CompanyLogin(QWidget):
@@ -65,20 +64,14 @@ class CompanyLogin(QWidget):
             return
 
         try:
-            ref = db.reference("companies")
-            companies = ref.get()
-
-            if companies:
-                for key, value in companies.items():
-                    stored_email = value.get("email")
-                    stored_password = value.get("password")
-                    stored_name = value.get("company_name")
-                    if stored_email == email and stored_password == password:
-                        self.error_label.setStyleSheet("color: lightgreen;")
-                        self.error_label.setText("Login successful.")
-                        save_session(stored_name,stored_email,stored_password)
-                        self.open_admin_window()  #Open admin window
-                        return
+            company_id, company = authenticate_company(email, password)
+
+            if company:
+                self.error_label.setStyleSheet("color: lightgreen;")
+                self.error_label.setText("Login successful.")
+                save_session(company.get("company_name"), company.get("email"), company.get("password"))
+                self.open_admin_window()  #Open admin window
+                return
 
             self.error_label.setStyleSheet("color: red;")
             self.error_label.setText("Invalid email or password.")
@@ -87,8 +80,8 @@ class CompanyLogin(QWidget):
             print("Login error:", e)
 
     def open_admin_window(self):
-        from enhanced_admin import EnhancedAdminPage
-self.admin_window = EnhancedAdminPage()
+        from admin import EnhancedAdminPage
+        self.admin_window = EnhancedAdminPage()
         self.admin_window.show()
         self.hide()  # Hide login window instead of closing it
 
@@ -195,22 +188,12 @@ class CompanySignUp(QWidget):
             return
 
         try:
-            ref = db.reference("companies")
-            companies = ref.get()
-
-            if companies:
-                for key, value in companies.items():
-                    stored_email = value.get("email")
-                    if stored_email == email:
-                        self.error_label.setStyleSheet("color: red;")
-                        self.error_label.setText("Email already registered.")
-                        return
-
-            ref.push({
-                "company_name": company_name,
-                "email": email,
-                "password": password
-            })
+            if get_company_id(email):
+                self.error_label.setStyleSheet("color: red;")
+                self.error_label.setText("Email already registered.")
+                return
+
+            register_company(company_name, email, password)
 
             self.error_label.setStyleSheet("color: lightgreen;")
             self.error_label.setText("Sign up successful! You can now log in.")
@@ -219,6 +202,9 @@ class CompanySignUp(QWidget):
             self.email_input.clear()
             self.password_input.clear()
 
+        except ValueError:
+            self.error_label.setStyleSheet("color: red;")
+            self.error_label.setText("Email already registered.")
         except Exception as e:
             self.error_label.setText(f"Error during signup: {str(e)}")
             print("Signup error:", e)
@@ -0,0 +1,166 @@
+"""
+PDF Text Module
+استخراج نص السيرة الذاتية محلياً وحفظه حسب بصمة الملف
+
+يحتاج مكتبة pypdf (أو PyPDF2) اختيارياً؛ بدونها أو مع الملفات الممسوحة
+ضوئياً يعود الاستدعاء بـ None ويُرفع الملف كاملاً كما في السابق
+"""
+
+import os
+import re
+
+from resume_store import file_sha256
+from utils import get_app_directory, ensure_directory_exists
+
+
+# أقل عدد أحرف لاعتبار الملف نصياً (أقل من ذلك غالباً صورة ممسوحة)
+MIN_TEXT_CHARS = 200
+
+# حد النص المرسل للنموذج بالتوكن (تقريباً 4 أحرف لكل توكن)
+MAX_PROMPT_TOKENS = int(os.environ.get("RESUME_TEXT_MAX_TOKENS", "6000"))
+CHARS_PER_TOKEN = 4
+
+# علامة الملف الذي لا يحتوي نصاً حتى لا يُعاد استخراجه
+SCANNED_SUFFIX = ".scanned"
+
+
+def _pdf_reader():
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        try:
+            from PyPDF2 import PdfReader
+        except ImportError:
+            return None
+    return PdfReader
+
+
+_text_directory = None
+
+
+def _text_dir():
+    # المجلد يُنشأ مرة واحدة فقط وليس مع كل قراءة أو كتابة
+    global _text_directory
+    if _text_directory is None:
+        directory = os.path.join(get_app_directory(), "cache", "text")
+        ensure_directory_exists(directory)
+        _text_directory = directory
+    return _text_directory
+
+
+def extract_pdf_text(pdfpath):
+    """
+    استخراج النص من ملف PDF
+
+    Args:
+        pdfpath: مسار الملف
+
+    Returns:
+        str: النص، أو None إذا لم تتوفر مكتبة pypdf أو فشل الاستخراج
+    """
+    PdfReader = _pdf_reader()
+    if PdfReader is None:
+        return None
+
+    try:
+        reader = PdfReader(pdfpath)
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        print(f"⚠️ Text extraction failed: {e}")
+        return None
+
+    return normalize_text("\n".join(pages))
+
+
+def normalize_text(text):
+    """توحيد المسافات وحذف الأسطر الفارغة المتكررة"""
+    text = re.sub(r"[ \t\u00a0]+", " ", text)
+    text = re.sub(r"\s*\n\s*", "\n", text)
+    return text.strip()
+
+
+def trim_to_budget(text, max_tokens=MAX_PROMPT_TOKENS):
+    """
+    قص النص ليناسب حد التوكن (عند نهاية سطر إن أمكن)
+
+    Args:
+        text: النص
+        max_tokens: الحد الأقصى
+
+    Returns:
+        str
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > limit // 2 else limit]
+
+
+def read_cached_text(pdf_sha256, max_tokens=MAX_PROMPT_TOKENS):
+    """
+    النص المستخرج سابقاً بدون الحاجة لملف PDF
+
+    Returns:
+        (found, text): found=False إذا لم يُستخرج الملف على هذا الجهاز،
+        و text=None للملفات الممسوحة ضوئياً
+    """
+    base = os.path.join(_text_dir(), pdf_sha256)
+
+    if os.path.exists(base + SCANNED_SUFFIX):
+        return True, None
+
+    if os.path.exists(base + ".txt"):
+        with open(base + ".txt", "r", encoding="utf-8") as f:
+            return True, trim_to_budget(f.read(), max_tokens)
+
+    return False, None
+
+
+def get_resume_text(pdfpath, pdf_sha256=None, max_tokens=MAX_PROMPT_TOKENS):
+    """
+    نص السيرة الذاتية من الكاش أو باستخراجه مرة واحدة
+
+    Args:
+        pdfpath: مسار ملف PDF
+        pdf_sha256: بصمة الملف (تُحسب إذا لم تُمرر)
+        max_tokens: حد التوكن للنص المعاد
+
+    Returns:
+        str: النص بعد القص، أو None للملفات الممسوحة ضوئياً
+    """
+    pdf_sha256 = pdf_sha256 or file_sha256(pdfpath)
+    found, text = read_cached_text(pdf_sha256, max_tokens)
+    if found:
+        return text
+
+    base = os.path.join(_text_dir(), pdf_sha256)
+    text = extract_pdf_text(pdfpath)
+    if text is None:
+        # المكتبة غير متوفرة: لا نحفظ شيئاً حتى يُعاد المحاولة بعد تثبيتها
+        return None
+
+    if len(text) < MIN_TEXT_CHARS:
+        open(base + SCANNED_SUFFIX, "w").close()
+        print(f"🖼️ No text layer, falling back to upload: {os.path.basename(pdfpath)}")
+        return None
+
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(text)
+
+    print(f"📝 Text extracted: {len(text)} chars")
+    return trim_to_budget(text, max_tokens)
+
+
+# استخراج نص ملف للتجربة
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        text = get_resume_text(path)
+        if text is None:
+            print(f"❌ {path}: no text (scanned or pypdf not installed)")
+        else:
+            print(f"✅ {path}: {len(text)} chars (~{len(text) // CHARS_PER_TOKEN} tokens)")
+            print(text[:500])
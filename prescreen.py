@@ -0,0 +1,202 @@
+"""
+Prescreen Module
+فرز أولي محلي (BM25 على الكلمات المفتاحية للوظيفة) قبل طلب تحليل الـ AI
+
+الشركة تحدد حداً في settings/{company}؛ السير الذاتية الأقل منه لا تُرسل
+للـ AI (skip) أو تُؤجل لتحليل لاحق (defer)، والقرار يُحفظ في سجل المتقدم.
+المؤجلة تُرسل لاحقاً لطابور التقييم (scoring_worker.py --enqueue-deferred)
+"""
+
+import math
+import re
+import time
+
+from firebase_connection import reference
+from utils import encode_key
+
+
+SETTINGS_PATH = "settings"
+
+# القيم الافتراضية: الفرز معطل
+DEFAULT_SETTINGS = {
+    "prescreen_threshold": 0,
+    "prescreen_action": "skip",
+}
+
+PRESCREEN_ACTIONS = ["skip", "defer"]
+
+# مدة الاحتفاظ بإعدادات الشركة في الذاكرة
+SETTINGS_TTL_SECONDS = 300
+
+# ثوابت BM25: التشبع وتطبيع الطول (طول مرجعي لسيرة ذاتية نموذجية)
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVERAGE_RESUME_TOKENS = 600
+
+_settings_cache = {}
+
+
+def tokenize(text):
+    """تقسيم النص إلى كلمات بحروف صغيرة (يدعم العربية)"""
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def parse_keywords(ai_value):
+    """
+    الكلمات المفتاحية للوظيفة كقائمة عبارات
+
+    Returns:
+        list: كل عبارة كقائمة كلمات
+    """
+    phrases = re.split(r"[,;\n،]+", str(ai_value or ""))
+    result = []
+    for phrase in phrases:
+        tokens = tokenize(phrase)
+        if tokens and tokens not in result:
+            result.append(tokens)
+    return result
+
+
+def _phrase_count(tokens, phrase):
+    if len(phrase) == 1:
+        return tokens.count(phrase[0])
+    n = len(phrase)
+    return sum(1 for i in range(len(tokens) - n + 1) if tokens[i:i + n] == phrase)
+
+
+def score_text(resume_text, ai_value):
+    """
+    تقييم أولي من 0 إلى 100 لمدى تغطية السيرة الذاتية للكلمات المفتاحية
+
+    كل عبارة تساهم بوزن BM25 مشبع بحد أقصى 1 (ذكرها مرة في سيرة بطول
+    متوسط يكفي، والسير الطويلة جداً تحتاج تكراراً أكثر)
+
+    Args:
+        resume_text: نص السيرة الذاتية
+        ai_value: الكلمات المفتاحية للوظيفة
+
+    Returns:
+        dict: score, matched, missing
+    """
+    tokens = tokenize(resume_text)
+    keywords = parse_keywords(ai_value)
+
+    if not keywords:
+        return {"score": 0, "matched": [], "missing": []}
+
+    length_norm = 1 - BM25_B + BM25_B * len(tokens) / AVERAGE_RESUME_TOKENS
+    # عبارة من عدة كلمات أندر وأدق من كلمة واحدة
+    weights = [1 + math.log(len(phrase)) for phrase in keywords]
+
+    total = 0.0
+    matched, missing = [], []
+    for phrase, weight in zip(keywords, weights):
+        tf = _phrase_count(tokens, phrase)
+        if tf:
+            matched.append(" ".join(phrase))
+            total += weight * min(1.0, tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm))
+        else:
+            missing.append(" ".join(phrase))
+
+    score = round(100.0 * total / sum(weights), 1)
+    return {"score": score, "matched": matched, "missing": missing}
+
+
+def _settings_ref(company_name):
+    return reference(f"{SETTINGS_PATH}/{encode_key(company_name)}")
+
+
+def get_company_settings(company_name, use_cache=True):
+    """
+    إعدادات الفرز الأولي لشركة
+
+    Returns:
+        dict: prescreen_threshold, prescreen_action
+    """
+    cached = _settings_cache.get(company_name)
+    if use_cache and cached and time.time() - cached[0] < SETTINGS_TTL_SECONDS:
+        return cached[1]
+
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(_settings_ref(company_name).get() or {})
+    _settings_cache[company_name] = (time.time(), settings)
+    return settings
+
+
+def save_company_settings(company_name, threshold, action="skip"):
+    """
+    حفظ إعدادات الفرز الأولي
+
+    Args:
+        company_name: اسم الشركة
+        threshold: الحد من 0 إلى 100 (0 يعطل الفرز)
+        action: skip أو defer
+    """
+    if action not in PRESCREEN_ACTIONS:
+        raise ValueError(f"Unknown prescreen action: {action}")
+
+    settings = {
+        "prescreen_threshold": max(0, min(100, int(threshold))),
+        "prescreen_action": action,
+    }
+    _settings_ref(company_name).update(settings)
+    _settings_cache[company_name] = (time.time(), dict(DEFAULT_SETTINGS, **settings))
+
+
+def prescreen(resume_text, ai_value, company_name, force=False):
+    """
+    الفرز الأولي وقرار إرسال السيرة للـ AI
+
+    Args:
+        resume_text: نص السيرة الذاتية
+        ai_value: الكلمات المفتاحية للوظيفة
+        company_name: اسم الشركة
+        force: الإرسال للـ AI حتى تحت الحد (تقييم السجلات المؤجلة)
+
+    Returns:
+        dict: score, matched, missing, threshold, decision
+              decision: passed أو skipped أو deferred أو released
+              (released = تحت الحد وأُرسل للـ AI بعد التأجيل)
+    """
+    result = score_text(resume_text, ai_value)
+
+    try:
+        settings = get_company_settings(company_name)
+    except Exception as e:
+        print(f"⚠️ Prescreen settings unavailable: {e}")
+        settings = DEFAULT_SETTINGS
+
+    threshold = settings.get("prescreen_threshold") or 0
+    result["threshold"] = threshold
+
+    if threshold and result["score"] < threshold:
+        if force:
+            result["decision"] = "released"
+        elif settings.get("prescreen_action") == "defer":
+            result["decision"] = "deferred"
+        else:
+            result["decision"] = "skipped"
+    else:
+        result["decision"] = "passed"
+
+    print(f"🔎 Prescreen: {result['score']}/100 (threshold {threshold}) -> {result['decision']}")
+    return result
+
+
+def record_fields(result):
+    """حقول الفرز الأولي التي تُحفظ في سجل المتقدم"""
+    return {
+        "prescreen_score": result["score"],
+        "prescreen_decision": result["decision"],
+        "prescreen_matched": ", ".join(result["matched"]),
+    }
+
+
+def skipped_summary(result):
+    """ملخص السجل عندما لا يُرسل للـ AI"""
+    missing = ", ".join(result["missing"]) or "-"
+    return (
+        f"Pre-screened locally ({result['decision']}): score {result['score']}/100 "
+        f"is below the company threshold of {result['threshold']}. "
+        f"Missing keywords: {missing}"
+    )
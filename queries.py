@@ -0,0 +1,328 @@
+"""
+Queries Module
+طبقة استعلامات Firebase: فلترة من جهة الخادم بدل تحميل العقد كاملة
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+from firebase_connection import ref, jref, reference
+from utils import encode_key
+
+
+# الحقول التي نستعلم عليها بـ order_by_child لكل عقدة
+# يجب أن تُنشر كـ .indexOn في قواعد قاعدة البيانات وإلا سيقوم الخادم
+# بإرسال العقدة كاملة والفلترة عند العميل
+INDEXED_FIELDS = {
+    "companies": ["email"],
+    "users": ["company", "company_updated_at"],
+    "jops": ["company_name"],
+    "tombstones/users": ["company_deleted_at"],
+    "scoring_queue": ["available_at"],
+}
+
+TOMBSTONES_PATH = "tombstones/users"
+
+# سجل تغييرات لكل شركة: changes/{company}/{key} = وقت آخر كتابة على المتقدم
+CHANGES_PATH = "changes"
+
+# فاصل الحقل المركّب "الشركة|الوقت" المستخدم في المزامنة التزايدية
+STAMP_SEPARATOR = "|"
+
+RULES_FILE = "database.rules.json"
+
+# نفس أبجدية مفاتيح push في Firebase (مرتبة حسب ASCII)
+PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+
+_push_lock = threading.Lock()
+_last_push = {"time": 0, "random": []}
+
+
+def generate_push_key():
+    """
+    مفتاح بنفس صيغة push() بدون طلب للخادم
+
+    يسمح بكتابة عدة عقد جديدة في تحديث واحد متعدد المسارات، ويبقى
+    الترتيب الزمني للمفاتيح الذي يعتمد عليه get_recent_applicants
+
+    Returns:
+        str: 20 حرفاً (8 للوقت + 12 عشوائية)
+    """
+    with _push_lock:
+        now = int(time.time() * 1000)
+
+        if now == _last_push["time"]:
+            # نفس الملّي ثانية: زيادة الجزء العشوائي حتى يبقى الترتيب
+            digits = _last_push["random"]
+            i = len(digits) - 1
+            while i >= 0 and digits[i] == len(PUSH_CHARS) - 1:
+                digits[i] = 0
+                i -= 1
+            if i >= 0:
+                digits[i] += 1
+        else:
+            _last_push["time"] = now
+            _last_push["random"] = [random.randrange(len(PUSH_CHARS)) for _ in range(12)]
+
+        stamp = []
+        for _ in range(8):
+            stamp.append(PUSH_CHARS[now % 64])
+            now //= 64
+
+        return "".join(reversed(stamp)) + "".join(PUSH_CHARS[d] for d in _last_push["random"])
+
+
+def push_key_time(key):
+    """
+    وقت إنشاء عقدة من مفتاح push (أول 8 أحرف)
+
+    Returns:
+        int: الوقت بالملّي ثانية، أو None إذا لم يكن المفتاح بصيغة push
+    """
+    if not isinstance(key, str) or len(key) != 20:
+        return None
+
+    timestamp = 0
+    for char in key[:8]:
+        value = PUSH_CHARS.find(char)
+        if value < 0:
+            return None
+        timestamp = timestamp * 64 + value
+    return timestamp
+
+
+def get_company_applicants(company_name):
+    """
+    الحصول على المتقدمين لشركة واحدة فقط
+
+    Args:
+        company_name: اسم الشركة
+
+    Returns:
+        dict: {firebase_key: بيانات المتقدم}
+    """
+    if ref is None:
+        raise Exception("Firebase reference is None")
+
+    if not company_name:
+        return {}
+
+    return ref.order_by_child("company").equal_to(company_name).get() or {}
+
+
+def get_recent_applicants(company_name, limit=5):
+    """
+    الحصول على أحدث المتقدمين لشركة
+
+    مفاتيح push مرتبة زمنياً، لذلك limit_to_last يعيد الأحدث
+
+    Args:
+        company_name: اسم الشركة
+        limit: عدد السجلات
+
+    Returns:
+        dict: {firebase_key: بيانات المتقدم}
+    """
+    if ref is None:
+        raise Exception("Firebase reference is None")
+
+    if not company_name:
+        return {}
+
+    return ref.order_by_child("company").equal_to(company_name).limit_to_last(limit).get() or {}
+
+
+def get_company_jobs(company_name):
+    """
+    الحصول على وظائف شركة واحدة فقط
+
+    Args:
+        company_name: اسم الشركة
+
+    Returns:
+        dict: {firebase_key: بيانات الوظيفة}
+    """
+    if jref is None:
+        raise Exception("Firebase reference is None")
+
+    if not company_name:
+        return {}
+
+    return jref.order_by_child("company_name").equal_to(company_name).get() or {}
+
+
+def _composite(company, timestamp_ms):
+    return f"{company}{STAMP_SEPARATOR}{int(timestamp_ms):013d}"
+
+
+def change_stamp(company):
+    """
+    حقول الطابع الزمني التي تُضاف لكل كتابة على سجل متقدم
+
+    الحقل المركّب company_updated_at يسمح باستعلام "ما تغيّر في شركة
+    واحدة منذ وقت معين" بفهرس واحد
+
+    Args:
+        company: اسم الشركة
+
+    Returns:
+        dict: updated_at, company_updated_at
+    """
+    now = int(time.time() * 1000)
+    return {
+        "updated_at": now,
+        "company_updated_at": _composite(company, now),
+    }
+
+
+def change_feed_path(company, key=None):
+    """مسار سجل تغييرات شركة (أو مدخل متقدم واحد فيه)"""
+    path = f"{CHANGES_PATH}/{encode_key(company)}"
+    return f"{path}/{key}" if key else path
+
+
+def change_feed_entry(company, key, timestamp_ms=None):
+    """
+    مدخل سجل تغييرات الشركة لمتقدم، يُضاف لنفس التحديث متعدد المسارات
+    الذي يكتب السجل حتى يصل التغيير لمستمعي هذه الشركة فقط
+
+    Args:
+        company: اسم الشركة
+        key: مفتاح المتقدم
+        timestamp_ms: وقت الكتابة (الافتراضي الآن)
+
+    Returns:
+        dict: {المسار: الوقت}
+    """
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    return {change_feed_path(company, key): timestamp_ms}
+
+
+def get_applicants_changed_since(company_name, since_ms):
+    """
+    المتقدمون الذين تغيّروا في شركة واحدة منذ وقت معين
+
+    Args:
+        company_name: اسم الشركة
+        since_ms: الوقت بالميلي ثانية
+
+    Returns:
+        dict: {firebase_key: بيانات المتقدم}
+    """
+    return (
+        ref.order_by_child("company_updated_at")
+        .start_at(_composite(company_name, since_ms))
+        .end_at(f"{company_name}{STAMP_SEPARATOR}\uf8ff")
+        .get()
+    ) or {}
+
+
+def get_applicants_deleted_since(company_name, since_ms):
+    """
+    مفاتيح المتقدمين المحذوفين في شركة واحدة منذ وقت معين
+
+    Returns:
+        dict: {firebase_key: بيانات الحذف}
+    """
+    return (
+        reference(TOMBSTONES_PATH)
+        .order_by_child("company_deleted_at")
+        .start_at(_composite(company_name, since_ms))
+        .end_at(f"{company_name}{STAMP_SEPARATOR}\uf8ff")
+        .get()
+    ) or {}
+
+
+def delete_applicant(firebase_key, company_name):
+    """
+    حذف متقدم مع ترك علامة حذف للمزامنة التزايدية
+
+    Args:
+        firebase_key: مفتاح المتقدم
+        company_name: اسم الشركة
+    """
+    now = int(time.time() * 1000)
+    reference().update({
+        f"users/{firebase_key}": None,
+        f"{TOMBSTONES_PATH}/{firebase_key}": {
+            "company": company_name,
+            "deleted_at": now,
+            "company_deleted_at": _composite(company_name, now),
+        },
+        # حذف مدخل السجل يصل للمستمعين كتغيير، ويبقي السجل بحجم المتقدمين الحاليين
+        change_feed_path(company_name, firebase_key): None,
+    })
+
+
+def generate_index_rules():
+    """
+    توليد قواعد الفهرسة (.indexOn) لكل الحقول المستعلم عليها
+
+    Returns:
+        dict: قواعد جاهزة للدمج في database.rules.json
+    """
+    rules = {}
+    for path, fields in sorted(INDEXED_FIELDS.items()):
+        node = rules
+        for part in path.split("/"):
+            node = node.setdefault(part, {})
+        node[".indexOn"] = sorted(fields)
+
+    return {"rules": rules}
+
+
+def merge_index_rules(existing, generated):
+    """
+    دمج .indexOn في قواعد موجودة بدون لمس .read و .write أو أي قاعدة أخرى
+
+    Args:
+        existing: محتوى database.rules.json الحالي
+        generated: ناتج generate_index_rules
+
+    Returns:
+        dict: القواعد بعد الدمج
+    """
+    merged = json.loads(json.dumps(existing or {}))
+
+    def merge(target, source):
+        for name, value in source.items():
+            if name == ".indexOn":
+                target[name] = value
+            else:
+                node = target.setdefault(name, {})
+                if not isinstance(node, dict):
+                    raise ValueError(f"Rule node '{name}' is not an object, cannot add .indexOn")
+                merge(node, value)
+
+    merge(merged, generated)
+    return merged
+
+
+def write_index_rules(path=RULES_FILE):
+    """
+    دمج قواعد الفهرسة في ملف القواعد (القواعد الأمنية الموجودة تبقى كما هي)
+
+    Args:
+        path: مسار الملف
+    """
+    existing = {}
+    if os.path.exists(path):
+        # ملف غير صالح يوقف الكتابة بدل استبداله وفقدان القواعد
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+
+    rules = merge_index_rules(existing, generate_index_rules())
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rules, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+    print(f"✅ Index rules written to: {os.path.abspath(path)}")
+
+
+# توليد ملف القواعد مباشرة
+if __name__ == "__main__":
+    write_index_rules()
@@ -0,0 +1,169 @@
+"""
+Realtime Module
+بث التغييرات الفورية من Firebase على مستوى السجل بدل التحديث الدوري
+"""
+
+import copy
+
+from firebase_connection import reference
+from queries import change_feed_path, get_company_applicants
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ChangeStream(QObject):
+    """
+    اشتراك في عقدة Firebase يحوّل أحداث put/patch إلى إشارات
+    إضافة/تحديث/حذف لكل سجل على خيط Qt الرئيسي
+
+    ملاحظة: مكتبة firebase_admin لا تدعم listen() على الاستعلامات، لذلك
+    يصل أول حدث بمحتوى العقدة مرة واحدة عند الاشتراك ثم التغييرات فقط
+    """
+
+    snapshot = pyqtSignal(dict)          # كل السجلات المطابقة (أول تحميل أو إعادة اتصال)
+    inserted = pyqtSignal(str, dict)     # key, record
+    updated = pyqtSignal(str, dict)      # key, record
+    removed = pyqtSignal(str)            # key
+    error = pyqtSignal(str)
+
+    # تُطلق من خيط المستمع وتُنفَّذ على خيط Qt (اتصال Queued تلقائي)
+    _event_received = pyqtSignal(str, str, object)
+
+    def __init__(self, path, match=None, parent=None):
+        """
+        Args:
+            path: مسار العقدة (مثل users)
+            match: دالة تحدد السجلات المطلوبة، مثل سجلات شركة واحدة
+        """
+        super().__init__(parent)
+        self.path = path
+        self.match = match or (lambda record: True)
+        self.rows = {}
+        self._registration = None
+        self._event_received.connect(self._apply_event)
+
+    def start(self):
+        """بدء الاستماع"""
+        if self._registration is not None:
+            return
+        self._registration = reference(self.path).listen(self._on_event)
+        print(f"📡 Listening for changes on: {self.path}")
+
+    def stop(self):
+        """إيقاف الاستماع"""
+        if self._registration is not None:
+            try:
+                self._registration.close()
+            except Exception as e:
+                print(f"⚠️ Error closing listener: {e}")
+            self._registration = None
+
+    def _on_event(self, event):
+        # خيط المستمع - لا نلمس الواجهة هنا
+        self._event_received.emit(event.event_type, event.path or "/", event.data)
+
+    def _apply_event(self, event_type, path, data):
+        try:
+            parts = [p for p in path.split("/") if p]
+
+            if event_type == "patch":
+                # patch = كتابة كل مسار فرعي على حدة
+                for name, value in (data or {}).items():
+                    self._apply_put(parts + [p for p in name.split("/") if p], value)
+            else:
+                self._apply_put(parts, data)
+
+        except Exception as e:
+            print(f"❌ Error applying {event_type} at {path}: {e}")
+            self.error.emit(str(e))
+
+    def _apply_put(self, parts, data):
+        if not parts:
+            self._reset(data or {})
+        elif len(parts) == 1:
+            self._put_record(parts[0], data)
+        else:
+            self._set_field(parts[0], parts[1:], data)
+
+    def _reset(self, data):
+        self.rows = {
+            key: record for key, record in data.items()
+            if isinstance(record, dict) and self.match(record)
+        }
+        self.snapshot.emit(dict(self.rows))
+
+    def _put_record(self, key, record):
+        if isinstance(record, dict) and self.match(record):
+            existed = key in self.rows
+            self.rows[key] = record
+            if existed:
+                self.updated.emit(key, record)
+            else:
+                self.inserted.emit(key, record)
+        elif key in self.rows:
+            del self.rows[key]
+            self.removed.emit(key)
+
+    def _set_field(self, key, field_path, value):
+        if key not in self.rows:
+            return
+        record = copy.deepcopy(self.rows[key])
+        target = record
+        for part in field_path[:-1]:
+            target = target.setdefault(part, {})
+        if value is None:
+            target.pop(field_path[-1], None)
+        else:
+            target[field_path[-1]] = value
+        self._put_record(key, record)
+
+
+class CompanyChangeStream(ChangeStream):
+    """
+    متقدمو شركة واحدة عبر سجل تغييراتها changes/{company}
+
+    الاستماع على مسار الشركة فقط، فلا تصل بيانات الشركات الأخرى ولا
+    تغييراتها. سجل التغييرات يحمل وقت آخر كتابة لكل مفتاح فقط: أول حدث
+    (وبعد كل إعادة اتصال) يُستبدل باستعلام الشركة المفهرس، وكل تغيير بعده
+    يقرأ سجل المتقدم نفسه (غير موجود = محذوف)
+    """
+
+    def __init__(self, company_name, parent=None):
+        super().__init__(
+            change_feed_path(company_name),
+            match=lambda record: record.get("company") == company_name,
+            parent=parent,
+        )
+        self.company_name = company_name
+
+    def _on_event(self, event):
+        # خيط المستمع: القراءة من Firebase هنا ثم تطبيق النتيجة على خيط Qt
+        try:
+            parts = [p for p in (event.path or "/").split("/") if p]
+
+            if not parts:
+                if event.event_type == "put":
+                    self._event_received.emit("put", "/", get_company_applicants(self.company_name))
+                    return
+                keys = {name.split("/")[0] for name in (event.data or {})}
+            else:
+                keys = {parts[0]}
+
+            for key in keys:
+                self._event_received.emit("put", f"/{key}", reference(f"users/{key}").get())
+
+        except Exception as e:
+            print(f"❌ Error reading change at {event.path}: {e}")
+            self.error.emit(str(e))
+
+
+def company_applicants_stream(company_name, parent=None):
+    """
+    اشتراك في متقدمي شركة واحدة
+
+    Args:
+        company_name: اسم الشركة
+
+    Returns:
+        CompanyChangeStream
+    """
+    return CompanyChangeStream(company_name, parent=parent)
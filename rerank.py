@@ -0,0 +1,293 @@
+"""
+Rerank Module
+إعادة تقييم متقدمي وظيفة بعد تعديل كلماتها المفتاحية بدون إعادة التقديم
+
+كل سجل يحفظ بصمة الكلمات التي قُيّم عليها (keywords_sha)، فالمتأثرون هم
+من تختلف بصمتهم عن كلمات الوظيفة الحالية. التقييم يتم من النص المستخرج
+والتقييم المحلي، ولا يُرسل للـ AI إلا من تجاوز حد التصعيد أو من لا يوجد
+له نص. كل دفعة تُكتب بتحديث واحد متعدد المسارات، وبما أن التقدم محفوظ في
+السجلات نفسها فإعادة التشغيل تكمل من حيث توقفت.
+
+مثال:
+    python rerank.py --company "My Company" --job "Backend Developer"
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk_score import RateLimiter
+from firebase_connection import reference
+from functions import (
+    TextProcessor,
+    AnalysisFormatError,
+    analysis_fields,
+    parse_with_repair,
+    lookup_cached_analysis,
+    cache_analysis,
+)
+from pdf_text import read_cached_text, get_resume_text
+from prescreen import score_text
+from queries import change_stamp, change_feed_entry, get_company_applicants, get_company_jobs
+from resume_store import file_sha256, resume_file
+from score_cache import keywords_fingerprint
+from scoring_backends import BACKENDS, get_scoring_backend, select_scoring_backend
+from stats_store import apply_delta, records_delta
+
+
+JOBS_PATH = "jops"
+
+DEFAULT_BATCH_SIZE = 20
+
+# أقل تقييم محلي يستحق تحليل الـ AI (التقييم الدقيق يهم المرشحين الأقوى فقط)
+DEFAULT_ESCALATE_ABOVE = float(os.environ.get("RERANK_ESCALATE_ABOVE", "50"))
+
+
+def find_affected(company, job_name, keywords):
+    """
+    المتقدمون الذين قُيّموا على كلمات مختلفة عن كلمات الوظيفة الحالية
+
+    السجلات القديمة بدون keywords_sha تعتبر متأثرة
+
+    Returns:
+        dict: {firebase_key: بيانات المتقدم}
+    """
+    fingerprint = keywords_fingerprint(keywords)
+    return {
+        key: record for key, record in get_company_applicants(company).items()
+        if isinstance(record, dict)
+        and record.get("job") == job_name
+        and record.get("keywords_sha") != fingerprint
+    }
+
+
+def load_text(record):
+    """
+    نص السيرة الذاتية: من كاش النصوص، أو بتحميل الملف واستخراجه مرة واحدة
+
+    Returns:
+        (pdf_sha256, text): text=None للملفات الممسوحة ضوئياً
+    """
+    pdf_sha256 = record.get("resume_sha256")
+    if pdf_sha256:
+        found, text = read_cached_text(pdf_sha256)
+        if found:
+            return pdf_sha256, text
+
+    with resume_file(record) as path:
+        file_sha = pdf_sha256 or file_sha256(path)
+        return file_sha, get_resume_text(path, file_sha)
+
+
+def local_summary(result):
+    """ملخص السجل عند إعادة تقييمه محلياً بدون الـ AI"""
+    matched = ", ".join(result["matched"]) or "-"
+    missing = ", ".join(result["missing"]) or "-"
+    return (
+        f"Re-ranked locally for the updated job keywords: score {result['score']}/100. "
+        f"Matched keywords: {matched}. Missing keywords: {missing}"
+    )
+
+
+def rerank_record(record, keywords, escalate_above=DEFAULT_ESCALATE_ABOVE,
+                  use_ai=True, limiter=None):
+    """
+    إعادة تقييم متقدم واحد على الكلمات الجديدة
+
+    Args:
+        record: سجل المتقدم
+        keywords: الكلمات المفتاحية الجديدة
+        escalate_above: أقل تقييم محلي يُرسل للـ AI
+        use_ai: السماح بطلبات الـ AI
+        limiter: حد معدل طلبات الـ AI
+
+    Returns:
+        dict: الحقول الجديدة للسجل، أو None إذا لم يمكن التقييم بدون AI
+    """
+    pdf_sha256, text = load_text(record)
+    local = score_text(text, keywords) if text else None
+
+    analysis = None
+    source = "cache"
+    aiout = lookup_cached_analysis(pdf_sha256, keywords)
+    if aiout is not None:
+        try:
+            analysis = TextProcessor.parseAnalysis(aiout)
+        except AnalysisFormatError as e:
+            print(f"⚠️ Ignoring invalid cached analysis: {e}")
+
+    if analysis is None and use_ai and (local is None or local["score"] >= escalate_above):
+        if limiter:
+            limiter.acquire()
+        backend = get_scoring_backend()
+        if text:
+            aiout = backend.analyze_text(text, [("", keywords)])
+        else:
+            with resume_file(record) as path:
+                aiout = backend.analyze_file(path, [("", keywords)])
+        analysis = parse_with_repair(aiout, TextProcessor.parseAnalysis)
+        cache_analysis(pdf_sha256, keywords, json.dumps(analysis, ensure_ascii=False))
+        source = "ai"
+
+    if analysis is not None:
+        rating, summary = analysis["rating"], analysis["summary"]
+        extra = analysis_fields(analysis)
+    elif local is not None:
+        rating, summary = local["score"], local_summary(local)
+        # نقاط القوة والضعف السابقة كانت للكلمات القديمة
+        extra = {"strengths": None, "gaps": None, "matched_keywords": local["matched"]}
+        source = "local"
+    else:
+        # ملف ممسوح ضوئياً والـ AI غير مسموح: يبقى للتشغيل القادم
+        return None
+
+    fields = dict(extra, **{
+        "raiting": rating,
+        "summary": summary,
+        "keywords_sha": keywords_fingerprint(keywords),
+        "rerank_source": source,
+    })
+    if local is not None:
+        fields["prescreen_score"] = local["score"]
+        fields["prescreen_matched"] = ", ".join(local["matched"])
+    return fields
+
+
+def _find_job(company, job_name):
+    for job_key, job in get_company_jobs(company).items():
+        if job.get("name") == job_name:
+            return job_key, job
+    raise ValueError(f"Job not found for {company}: {job_name}")
+
+
+def rerank_job(company, job_name, keywords=None, job_key=None,
+               batch_size=DEFAULT_BATCH_SIZE, escalate_above=DEFAULT_ESCALATE_ABOVE,
+               use_ai=True, workers=2, rate=30, on_progress=None, should_stop=None):
+    """
+    إعادة تقييم كل متقدمي وظيفة على دفعات
+
+    التقدم يُحفظ في jops/{job_key}/rerank، والمتقدمون المنتهون لا يُعاد
+    تقييمهم عند إعادة التشغيل
+
+    Args:
+        company: اسم الشركة
+        job_name: اسم الوظيفة
+        keywords: الكلمات الحالية (الافتراضي من قاعدة البيانات)
+        job_key: مفتاح الوظيفة في jops
+        batch_size: عدد المتقدمين في كل تحديث
+        escalate_above: أقل تقييم محلي يُرسل للـ AI
+        use_ai: السماح بطلبات الـ AI
+        workers: عدد المتقدمين الذين يُقيّمون في نفس الوقت
+        rate: أقصى عدد طلبات AI في الدقيقة (0 بدون حد)
+        on_progress: دالة (done, total) بعد كل دفعة
+        should_stop: دالة تعيد True لإيقاف التشغيل بعد الدفعة الحالية
+
+    Returns:
+        dict: state, total, done, ai_calls, local, unchanged, failed
+    """
+    if keywords is None or job_key is None:
+        job_key, job = _find_job(company, job_name)
+        keywords = job.get("value")
+
+    affected = find_affected(company, job_name, keywords)
+    keys = sorted(affected)
+    progress_path = f"{JOBS_PATH}/{job_key}/rerank"
+
+    summary = {"state": "running", "total": len(keys), "done": 0,
+               "ai_calls": 0, "local": 0, "unchanged": 0, "failed": 0}
+
+    print(f"🔁 Re-ranking {len(keys)} applicants for {job_name}")
+    reference(progress_path).set(dict(
+        summary, keywords_sha=keywords_fingerprint(keywords), started_at=int(time.time() * 1000)
+    ))
+
+    limiter = RateLimiter(rate)
+
+    def rerank_one(key):
+        try:
+            return rerank_record(affected[key], keywords, escalate_above, use_ai, limiter), None
+        except Exception as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(keys), batch_size):
+            if should_stop and should_stop():
+                summary["state"] = "stopped"
+                break
+
+            batch = keys[start:start + batch_size]
+            updates = {}
+            delta = {}
+
+            for key, (fields, error) in zip(batch, executor.map(rerank_one, batch)):
+                if error:
+                    print(f"❌ {key}: {error}")
+                    summary["failed"] += 1
+                    continue
+                if fields is None:
+                    summary["unchanged"] += 1
+                    continue
+
+                summary["ai_calls" if fields["rerank_source"] == "ai" else "local"] += 1
+                fields.update(change_stamp(company))
+                for name, value in fields.items():
+                    updates[f"users/{key}/{name}"] = value
+                updates.update(change_feed_entry(company, key, fields["updated_at"]))
+
+                new_record = dict(affected[key], **fields)
+                for counter, change in records_delta(affected[key], new_record).items():
+                    delta[counter] = delta.get(counter, 0) + change
+
+            summary["done"] += len(batch)
+            for name in ("done", "ai_calls", "local", "unchanged", "failed"):
+                updates[f"{progress_path}/{name}"] = summary[name]
+            updates[f"{progress_path}/updated_at"] = int(time.time() * 1000)
+
+            # السجلات والتقدم في كتابة واحدة
+            reference().update(updates)
+
+            try:
+                apply_delta(company, job_name, delta)
+            except Exception as e:
+                print(f"⚠️ Failed to update stats: {e}")
+
+            print(f"   {summary['done']}/{summary['total']}")
+            if on_progress:
+                on_progress(summary["done"], summary["total"])
+
+    if summary["state"] == "running":
+        summary["state"] = "done"
+    reference(f"{progress_path}/state").set(summary["state"])
+
+    print(
+        f"✅ Re-rank {summary['state']}: {summary['local']} local, "
+        f"{summary['ai_calls']} AI, {summary['unchanged']} unchanged, {summary['failed']} failed"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-rank a job's applicants after its keywords change")
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--job", required=True)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--escalate-above", type=float, default=DEFAULT_ESCALATE_ABOVE,
+                        help="local score from which the AI re-scores the applicant")
+    parser.add_argument("--no-ai", action="store_true", help="local scoring only")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=30, help="max AI requests per minute (0 = unlimited)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="scoring backend (default: SCORING_BACKEND or gemini)")
+    args = parser.parse_args()
+
+    select_scoring_backend(args.backend)
+    rerank_job(
+        args.company, args.job,
+        batch_size=args.batch_size,
+        escalate_above=args.escalate_above,
+        use_ai=not args.no_ai,
+        workers=args.workers,
+        rate=args.rate,
+    )
@@ -0,0 +1,317 @@
+"""
+Resume Store Module
+تخزين ملفات السير الذاتية (PDF) بعيداً عن سجلات المتقدمين مع جلب عند الطلب
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+
+from firebase_connection import reference
+from queries import change_stamp, change_feed_entry
+from utils import get_app_directory, ensure_directory_exists
+
+
+class ResumeStore:
+    """الواجهة العامة لمخازن السير الذاتية"""
+
+    name = None
+
+    def put(self, blob_key, data):
+        raise NotImplementedError
+
+    def get(self, blob_key):
+        raise NotImplementedError
+
+    def exists(self, blob_key):
+        raise NotImplementedError
+
+    def delete(self, blob_key):
+        raise NotImplementedError
+
+
+class FirebaseResumeStore(ResumeStore):
+    """تخزين الملفات في عقدة resumes/{key} منفصلة عن users"""
+
+    name = "firebase"
+
+    def __init__(self, path="resumes"):
+        self.path = path
+
+    def _node(self, blob_key):
+        return reference(f"{self.path}/{blob_key}")
+
+    def put(self, blob_key, data):
+        self._node(blob_key).set({
+            "data": base64.b64encode(data).decode("utf-8"),
+            "size": len(data),
+        })
+
+    def get(self, blob_key):
+        blob = self._node(blob_key).get()
+        if not blob or not blob.get("data"):
+            raise FileNotFoundError(f"Resume blob not found: {blob_key}")
+        return base64.b64decode(blob["data"])
+
+    def exists(self, blob_key):
+        # قراءة الحجم فقط بدل تحميل الملف كاملاً
+        return self._node(blob_key).child("size").get() is not None
+
+    def delete(self, blob_key):
+        self._node(blob_key).delete()
+
+
+class LocalResumeStore(ResumeStore):
+    """تخزين الملفات على نظام الملفات المحلي"""
+
+    name = "local"
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(get_app_directory(), "resumes")
+
+    def _path(self, blob_key):
+        return os.path.join(self.directory, f"{blob_key}.pdf")
+
+    def put(self, blob_key, data):
+        ensure_directory_exists(self.directory)
+        tmp_path = self._path(blob_key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(blob_key))
+
+    def get(self, blob_key):
+        path = self._path(blob_key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Resume blob not found: {path}")
+        with open(path, "rb") as f:
+            return f.read()
+
+    def exists(self, blob_key):
+        return os.path.exists(self._path(blob_key))
+
+    def delete(self, blob_key):
+        path = self._path(blob_key)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+STORES = {
+    FirebaseResumeStore.name: FirebaseResumeStore,
+    LocalResumeStore.name: LocalResumeStore,
+}
+
+_stores = {}
+
+
+def get_resume_store(name=None):
+    """
+    الحصول على مخزن السير الذاتية
+
+    Args:
+        name: اسم المخزن (firebase/local)، الافتراضي من RESUME_STORE
+
+    Returns:
+        ResumeStore
+    """
+    name = name or os.environ.get("RESUME_STORE", FirebaseResumeStore.name)
+
+    if name not in STORES:
+        raise ValueError(f"Unknown resume store: {name}")
+
+    if name not in _stores:
+        if name == LocalResumeStore.name:
+            _stores[name] = LocalResumeStore(os.environ.get("RESUME_STORE_DIR"))
+        else:
+            _stores[name] = STORES[name]()
+
+    return _stores[name]
+
+
+def file_sha256(file_path):
+    """
+    حساب SHA-256 لملف (نفس مفتاح المخزن)
+
+    Args:
+        file_path: مسار الملف
+
+    Returns:
+        str: البصمة
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_resume_bytes(data, store=None):
+    """
+    حفظ محتوى السيرة الذاتية في المخزن
+
+    المفتاح هو SHA-256 للمحتوى، لذلك الملف المكرر يُخزَّن مرة واحدة فقط
+
+    Args:
+        data: محتوى الملف
+        store: المخزن (الافتراضي حسب الإعدادات)
+
+    Returns:
+        dict: الحقول التي تُحفظ في سجل المتقدم
+    """
+    store = store or get_resume_store()
+    digest = hashlib.sha256(data).hexdigest()
+
+    if not store.exists(digest):
+        store.put(digest, data)
+
+    return {
+        "resume_ref": f"{store.name}:{digest}",
+        "resume_size": len(data),
+        "resume_sha256": digest,
+    }
+
+
+def store_resume_file(file_path, store=None):
+    """
+    حفظ ملف سيرة ذاتية في المخزن
+
+    Args:
+        file_path: مسار ملف PDF
+        store: المخزن (الافتراضي حسب الإعدادات)
+
+    Returns:
+        dict: الحقول التي تُحفظ في سجل المتقدم
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    meta = store_resume_bytes(data, store)
+    print(f"✅ Resume stored: {meta['resume_ref']} ({meta['resume_size'] / 1024:.2f} KB)")
+    return meta
+
+
+def load_resume_bytes(record):
+    """
+    جلب محتوى السيرة الذاتية لسجل متقدم عند الطلب
+
+    Args:
+        record: سجل المتقدم (يحتوي resume_ref أو resume_data القديم)
+
+    Returns:
+        bytes أو None
+    """
+    resume_ref = record.get("resume_ref")
+
+    if resume_ref:
+        store_name, blob_key = resume_ref.split(":", 1)
+        data = get_resume_store(store_name).get(blob_key)
+
+        expected = record.get("resume_sha256")
+        if expected and hashlib.sha256(data).hexdigest() != expected:
+            raise ValueError(f"Resume hash mismatch for {resume_ref}")
+
+        return data
+
+    # سجلات قديمة لم يتم ترحيلها بعد
+    if record.get("resume_data"):
+        return base64.b64decode(record["resume_data"])
+
+    return None
+
+
+@contextmanager
+def resume_file(record):
+    """
+    السيرة الذاتية من المخزن في ملف PDF مؤقت يُحذف بعد الاستخدام
+
+    Args:
+        record: سجل يحتوي resume_ref (متقدم أو مهمة تقييم)
+
+    Yields:
+        str: مسار الملف المؤقت
+    """
+    data = load_resume_bytes(record)
+    if data is None:
+        raise ValueError("No resume stored for this record")
+
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def migrate_inline_resumes(batch_size=25, store=None, dry_run=False):
+    """
+    ترحيل resume_data المضمّن في سجلات users إلى المخزن المنفصل
+
+    يعمل على دفعات مرتبة حسب المفتاح، ويمكن إعادة تشغيله بأمان
+    لأن السجلات المرحّلة لا تحتوي resume_data
+
+    Args:
+        batch_size: عدد السجلات في كل دفعة
+        store: المخزن الهدف
+        dry_run: عرض ما سيتم دون كتابة
+
+    Returns:
+        int: عدد السجلات المرحّلة
+    """
+    store = store or get_resume_store()
+    users = reference("users")
+    cursor = None
+    migrated = 0
+
+    while True:
+        query = users.order_by_key()
+        if cursor is not None:
+            query = query.start_at(cursor)
+        batch = query.limit_to_first(batch_size + 1).get() or {}
+
+        keys = [k for k in batch.keys() if k != cursor]
+        if not keys:
+            break
+
+        for key in keys:
+            record = batch[key]
+            if not isinstance(record, dict) or not record.get("resume_data"):
+                continue
+
+            data = base64.b64decode(record["resume_data"])
+            print(f"📦 {key}: {len(data) / 1024:.2f} KB")
+
+            if dry_run:
+                migrated += 1
+                continue
+
+            meta = store_resume_bytes(data, store)
+            company = record.get("company")
+            # None يحذف الحقل القديم في نفس التحديث
+            fields = dict(meta, resume_data=None, **change_stamp(company))
+            updates = {f"users/{key}/{name}": value for name, value in fields.items()}
+            updates.update(change_feed_entry(company, key, fields["updated_at"]))
+            reference().update(updates)
+            migrated += 1
+
+        cursor = keys[-1]
+
+    print(f"✅ Migrated {migrated} resumes to '{store.name}' store")
+    return migrated
+
+
+# أمر الترحيل
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move inline resume_data into the resume store")
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--store", choices=sorted(STORES), default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    migrate_inline_resumes(
+        batch_size=args.batch_size,
+        store=get_resume_store(args.store),
+        dry_run=args.dry_run,
+    )
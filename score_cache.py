@@ -0,0 +1,226 @@
+"""
+Score Cache Module
+تخزين نتائج تحليل الـ AI محلياً حسب (بصمة PDF، الكلمات المفتاحية، النموذج)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from utils import get_app_directory, ensure_directory_exists
+
+
+# مدة صلاحية النتيجة المخزنة
+DEFAULT_TTL_SECONDS = int(os.environ.get("SCORE_CACHE_TTL_DAYS", "30")) * 24 * 3600
+
+# أقصى عدد من النتائج قبل حذف الأقدم استخداماً
+DEFAULT_MAX_ENTRIES = int(os.environ.get("SCORE_CACHE_MAX_ENTRIES", "5000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    cache_key TEXT PRIMARY KEY,
+    pdf_sha256 TEXT,
+    keywords TEXT,
+    model TEXT,
+    response TEXT,
+    created_at REAL,
+    last_used_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_last_used ON scores(last_used_at);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+COUNTERS = ["hits", "misses", "evictions"]
+
+
+def normalize_keywords(ai_value):
+    """
+    توحيد الكلمات المفتاحية حتى لا يغير الترتيب أو حالة الأحرف المفتاح
+
+    Args:
+        ai_value: الكلمات المفتاحية للوظيفة (مفصولة بفواصل أو أسطر)
+
+    Returns:
+        str: كلمات مرتبة بدون تكرار
+    """
+    parts = re.split(r"[,;\n،]+", str(ai_value or "").lower())
+    words = {" ".join(part.split()) for part in parts}
+    words.discard("")
+    return ",".join(sorted(words))
+
+
+def keywords_fingerprint(ai_value):
+    """
+    بصمة قصيرة للكلمات المفتاحية تُحفظ في سجل المتقدم لمعرفة الكلمات
+    التي قُيّم عليها
+
+    Returns:
+        str
+    """
+    return hashlib.sha256(normalize_keywords(ai_value).encode("utf-8")).hexdigest()[:16]
+
+
+def score_cache_key(pdf_sha256, ai_value, model):
+    """
+    مفتاح النتيجة المخزنة
+
+    Args:
+        pdf_sha256: بصمة ملف PDF
+        ai_value: الكلمات المفتاحية
+        model: اسم النموذج
+
+    Returns:
+        str: المفتاح
+    """
+    raw = f"{pdf_sha256}\n{normalize_keywords(ai_value)}\n{model}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """نتائج التحليل في SQLite مع حذف حسب المدة والحجم"""
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        if path is None:
+            cache_dir = os.path.join(get_app_directory(), "cache")
+            ensure_directory_exists(cache_dir)
+            path = os.path.join(cache_dir, "scores.db")
+
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def _count(self, name, amount=1):
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, pdf_sha256, ai_value, model):
+        """
+        البحث عن نتيجة مخزنة
+
+        Returns:
+            str: نص استجابة الـ AI، أو None
+        """
+        key = score_cache_key(pdf_sha256, ai_value, model)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM scores WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute(
+                    "UPDATE scores SET last_used_at = ? WHERE cache_key = ?", (now, key)
+                )
+                self._count("hits")
+                self._conn.commit()
+                return row[0]
+
+            if row:
+                # منتهية الصلاحية
+                self._conn.execute("DELETE FROM scores WHERE cache_key = ?", (key,))
+                self._count("evictions")
+
+            self._count("misses")
+            self._conn.commit()
+            return None
+
+    def put(self, pdf_sha256, ai_value, model, response):
+        """حفظ نتيجة تحليل"""
+        key = score_cache_key(pdf_sha256, ai_value, model)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scores "
+                "(cache_key, pdf_sha256, keywords, model, response, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, pdf_sha256, normalize_keywords(ai_value), model, response, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        expired = self._conn.execute(
+            "DELETE FROM scores WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+
+        overflow = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM scores WHERE cache_key IN ("
+                "SELECT cache_key FROM scores ORDER BY last_used_at LIMIT ?)",
+                (overflow,),
+            )
+        else:
+            overflow = 0
+
+        if expired + overflow:
+            self._count("evictions", expired + overflow)
+
+    def stats(self):
+        """
+        عدادات الكاش
+
+        Returns:
+            dict: hits, misses, evictions, entries, hit_rate
+        """
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+        result = {name: counters.get(name, 0) for name in COUNTERS}
+        lookups = result["hits"] + result["misses"]
+        result["entries"] = entries
+        result["hit_rate"] = result["hits"] / lookups if lookups else 0
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM scores")
+            self._conn.execute("DELETE FROM counters")
+            self._conn.commit()
+
+
+_score_cache = None
+
+
+def get_score_cache():
+    """الحصول على كاش النتائج المشترك"""
+    global _score_cache
+    if _score_cache is None:
+        _score_cache = ScoreCache()
+    return _score_cache
+
+
+# عرض العدادات أو تفريغ الكاش
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI score cache")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    cache = get_score_cache()
+    if args.clear:
+        cache.clear()
+        print("🗑️ Score cache cleared")
+
+    stats = cache.stats()
+    print(f"📦 Entries: {stats['entries']}")
+    print(f"✅ Hits: {stats['hits']}  ❌ Misses: {stats['misses']}  🧹 Evictions: {stats['evictions']}")
+    print(f"🎯 Hit rate: {stats['hit_rate']:.1%}")
@@ -0,0 +1,280 @@
+"""
+Scoring Backends Module
+مزودات تقييم السير الذاتية القابلة للتبديل:
+    gemini  - تحليل Gemini (الافتراضي)
+    keyword - تقييم محلي بـ BM25 على الكلمات المفتاحية بدون أي طلب خارجي
+    stub    - نتيجة ثابتة لنفس المدخلات بزمن استجابة وأخطاء قابلة للضبط
+              (لاختبارات الحمل بدون مفتاح API أو حصة)
+
+المزود يُختار بـ SCORING_BACKEND، وكل مزود يعيد JSON بنفس مخطط Gemini
+فالتحقق والكاش والحفظ لا تتغير. اسم النموذج جزء من مفتاح كاش النتائج
+حتى لا تختلط نتائج المزودات
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from ai_client import get_ai_client
+from prescreen import score_text
+
+
+DEFAULT_BACKEND = "gemini"
+
+# إعدادات stub: متوسط زمن الاستجابة، التذبذب حوله، نسبة الأخطاء المؤقتة
+STUB_LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", "800"))
+STUB_JITTER_MS = float(os.environ.get("STUB_JITTER_MS", "200"))
+STUB_ERROR_RATE = float(os.environ.get("STUB_ERROR_RATE", "0"))
+STUB_SEED = os.environ.get("STUB_SEED", "0")
+
+
+def _analysis_json(analyses):
+    """
+    رد بنفس شكل Gemini: كائن واحد لوظيفة واحدة، و{"jobs": [...]} لأكثر
+
+    Args:
+        analyses: [(اسم الوظيفة، التحليل)]
+    """
+    if len(analyses) == 1:
+        return json.dumps(analyses[0][1], ensure_ascii=False)
+    return json.dumps(
+        {"jobs": [dict(analysis, job=name) for name, analysis in analyses]},
+        ensure_ascii=False,
+    )
+
+
+class ScoringBackend:
+    """الواجهة العامة لمزودات التقييم"""
+
+    name = None
+    model = None
+
+    def analyze_text(self, resume_text, jobs):
+        """
+        تقييم نص سيرة ذاتية
+
+        Args:
+            resume_text: النص المستخرج
+            jobs: [(اسم الوظيفة، الكلمات المفتاحية)]
+
+        Returns:
+            نص JSON مطابق لـ ANALYSIS_SCHEMA (وظيفة واحدة) أو MULTI_ANALYSIS_SCHEMA
+        """
+        raise NotImplementedError
+
+    def analyze_file(self, pdfpath, jobs, on_stage=None):
+        """
+        تقييم ملف بدون نص قابل للاستخراج (ممسوح ضوئياً)
+
+        Args:
+            pdfpath: مسار ملف PDF
+            jobs: [(اسم الوظيفة، الكلمات المفتاحية)]
+            on_stage: تُستدعى بـ "analysis" بعد رفع الملف
+        """
+        raise NotImplementedError
+
+    def repair(self, raw_output, schema):
+        """إصلاح رد لا يطابق المخطط (المزودات المحلية لا تصلح شيئاً)"""
+        return raw_output
+
+    def snapshot(self):
+        """إحصائيات الطلبات، أو None للمزودات بدون طلبات"""
+        return None
+
+
+class GeminiBackend(ScoringBackend):
+    """تحليل Gemini عبر عميل الـ AI المشترك"""
+
+    name = "gemini"
+
+    @property
+    def model(self):
+        from functions import GEMINI_MODEL
+        return GEMINI_MODEL
+
+    def _prompt(self, jobs):
+        from functions import build_multi_job_prompt, ANALYSIS_SCHEMA, MULTI_ANALYSIS_SCHEMA
+        if len(jobs) > 1:
+            return build_multi_job_prompt(jobs), MULTI_ANALYSIS_SCHEMA
+        return None, ANALYSIS_SCHEMA
+
+    def analyze_text(self, resume_text, jobs):
+        from functions import analyze_resume_text
+        prompt, schema = self._prompt(jobs)
+        return analyze_resume_text(resume_text, jobs[0][1], prompt=prompt, schema=schema)
+
+    def analyze_file(self, pdfpath, jobs, on_stage=None):
+        from functions import upload_pdf_to_ai, analyze_uploaded_pdf, delete_uploaded_pdf
+        prompt, schema = self._prompt(jobs)
+        sample_file = upload_pdf_to_ai(pdfpath)
+        try:
+            if on_stage:
+                on_stage("analysis")
+        except BaseException:
+            delete_uploaded_pdf(sample_file)
+            raise
+        return analyze_uploaded_pdf(sample_file, jobs[0][1], prompt=prompt, schema=schema)
+
+    def repair(self, raw_output, schema):
+        from functions import repair_analysis
+        return repair_analysis(raw_output, schema)
+
+    def snapshot(self):
+        from functions import ai_client
+        return ai_client().snapshot()
+
+
+class KeywordBackend(ScoringBackend):
+    """تقييم محلي بنفس BM25 المستخدم في الفرز الأولي"""
+
+    name = "keyword"
+    model = "keyword-bm25"
+
+    def analyze_text(self, resume_text, jobs):
+        analyses = []
+        for name, keywords in jobs:
+            result = score_text(resume_text, keywords)
+            matched = ", ".join(result["matched"]) or "-"
+            missing = ", ".join(result["missing"]) or "-"
+            analyses.append((name, {
+                "rating": max(1, int(round(result["score"]))),
+                "summary": (
+                    f"Scored locally on the job keywords: {result['score']}/100. "
+                    f"Matched keywords: {matched}. Missing keywords: {missing}"
+                ),
+                "strengths": result["matched"],
+                "gaps": result["missing"],
+                "matched_keywords": result["matched"],
+            }))
+        return _analysis_json(analyses)
+
+    def analyze_file(self, pdfpath, jobs, on_stage=None):
+        raise ValueError("The keyword backend needs a PDF with extractable text")
+
+
+class StubUnavailable(ConnectionError):
+    """خطأ مؤقت مصطنع (يُعاد كما تُعاد أخطاء المزود الحقيقي)"""
+
+
+class StubBackend(ScoringBackend):
+    """
+    نتيجة ثابتة لنفس السيرة والكلمات، بزمن وأخطاء قابلة للضبط
+
+    الطلبات تمر بنفس AIClient (المهلة، إعادة المحاولة، قاطع الدائرة،
+    الإحصائيات) حتى يقيس اختبار الحمل نفس المسار الحقيقي
+    """
+
+    name = "stub"
+    model = "stub"
+
+    def __init__(self, latency_ms=STUB_LATENCY_MS, jitter_ms=STUB_JITTER_MS,
+                 error_rate=STUB_ERROR_RATE, seed=STUB_SEED):
+        """
+        Args:
+            latency_ms: متوسط زمن الاستجابة
+            jitter_ms: أقصى انحراف عن المتوسط
+            error_rate: نسبة الطلبات التي تفشل بخطأ مؤقت (0 إلى 1)
+            seed: بذرة الأرقام العشوائية للزمن والأخطاء
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _client(self):
+        # مفتاح API غير مطلوب: call لا يُعد نموذج Gemini. الإحصائيات لا تُرسل حتى
+        # لا تظهر أخطاء اختبار الحمل في صفحة صحة الـ AI
+        return get_ai_client(self.model, lambda: None, publish=False)
+
+    def _rating(self, content, keywords):
+        digest = hashlib.sha256(f"{self.seed}|{keywords}|".encode("utf-8") + content).digest()
+        return 1 + int.from_bytes(digest[:4], "big") % 100
+
+    def _respond(self, content, jobs, operation):
+        def request(remaining):
+            with self._lock:
+                latency = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+                fail = self._random.random() < self.error_rate
+
+            latency /= 1000.0
+            if latency > remaining:
+                time.sleep(remaining)
+                raise TimeoutError(f"stub {operation} exceeded {remaining:.1f}s")
+            time.sleep(latency)
+            if fail:
+                raise StubUnavailable(f"stub {operation}: injected error")
+
+            analyses = []
+            for name, keywords in jobs:
+                rating = self._rating(content, keywords)
+                analyses.append((name, {
+                    "rating": rating,
+                    "summary": f"Stub analysis ({self.model}): deterministic rating {rating}/100.",
+                    "strengths": [],
+                    "gaps": [],
+                    "matched_keywords": [],
+                }))
+            return _analysis_json(analyses)
+
+        return self._client().call(operation, request)
+
+    def analyze_text(self, resume_text, jobs):
+        return self._respond(resume_text.encode("utf-8"), jobs, "analysis")
+
+    def analyze_file(self, pdfpath, jobs, on_stage=None):
+        with open(pdfpath, "rb") as f:
+            content = f.read()
+        if on_stage:
+            on_stage("analysis")
+        return self._respond(content, jobs, "analysis")
+
+    def snapshot(self):
+        return self._client().snapshot()
+
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    KeywordBackend.name: KeywordBackend,
+    StubBackend.name: StubBackend,
+}
+
+_backends = {}
+_selected = {"name": None}
+
+
+def select_scoring_backend(name):
+    """
+    تغيير المزود الافتراضي لهذه العملية (مثل خيار --backend في الأوامر)
+
+    Args:
+        name: اسم المزود، أو None للرجوع إلى SCORING_BACKEND
+    """
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"Unknown scoring backend: {name}")
+    _selected["name"] = name
+
+
+def get_scoring_backend(name=None):
+    """
+    الحصول على مزود التقييم
+
+    Args:
+        name: اسم المزود، الافتراضي المختار أو SCORING_BACKEND
+
+    Returns:
+        ScoringBackend
+    """
+    name = name or _selected["name"] or os.environ.get("SCORING_BACKEND", DEFAULT_BACKEND)
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scoring backend: {name}")
+
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+
+    return _backends[name]
@@ -0,0 +1,447 @@
+"""
+Scoring Queue Module
+طابور تقييم دائم في scoring_queue: طلب التقديم يُحفظ فوراً بحالة Scoring
+وعمال مستقلون (scoring_worker.py) يحجزون المهام بعقد إيجار (lease) وينفذونها
+
+المهمة المحجوزة يصبح available_at فيها نهاية الإيجار، لذلك استعلام واحد
+على available_at يعيد المهام الجديدة والمهام التي توقف عاملها معاً.
+المهام التي تفشل أكثر من MAX_ATTEMPTS مرة تُنقل إلى scoring_failed
+"""
+
+import os
+import time
+import uuid
+
+from firebase_connection import reference
+from queries import (
+    change_stamp, change_feed_entry, generate_push_key, get_company_applicants, get_company_jobs
+)
+from stats_store import apply_delta, record_added, records_delta
+
+
+QUEUE_PATH = "scoring_queue"
+FAILED_PATH = "scoring_failed"
+
+# حالة المتقدم حتى ينتهي تقييمه
+SCORING_STATUS = "Scoring"
+
+# الحالة بعد التقييم (نفس حالة التقديم المباشر سابقاً)
+SCORED_STATUS = "Pending"
+
+DEFAULT_LEASE_SECONDS = int(os.environ.get("SCORING_LEASE_SECONDS", "180"))
+MAX_ATTEMPTS = int(os.environ.get("SCORING_MAX_ATTEMPTS", "5"))
+
+# حالات المهمة المحجوزة لعامل (completing/failing: أثناء كتابة النتيجة)
+LEASED_STATES = ("leased", "completing", "failing")
+
+# التأخير قبل إعادة المحاولة يتضاعف مع كل فشل
+RETRY_BASE_SECONDS = 15
+RETRY_MAX_SECONDS = 600
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _task_ref(task_id):
+    return reference(f"{QUEUE_PATH}/{task_id}")
+
+
+def enqueue_application(full_name, email, company, jobs, resume_fields):
+    """
+    حفظ طلب التقديم بحالة Scoring وإضافة مهمة تقييم في كتابة واحدة
+
+    Args:
+        full_name: الاسم الكامل
+        email: البريد الإلكتروني
+        company: اسم الشركة
+        jobs: [(اسم الوظيفة، الكلمات المفتاحية)]
+        resume_fields: حقول السيرة الذاتية من store_resume_file
+
+    Returns:
+        (task_id, {اسم الوظيفة: firebase_key})
+    """
+    now = _now_ms()
+    task_id = generate_push_key()
+    keys = {}
+    records = []
+    task_jobs = []
+    updates = {}
+
+    # سجل لكل وظيفة، والمهمة تقيّمها كلها بطلب AI واحد
+    for name, keywords in jobs:
+        key = generate_push_key()
+        record = {
+            "full_name": full_name,
+            "email": email,
+            "status": SCORING_STATUS,
+            "raiting": 0,
+            "summary": "",
+            "company": company,
+            "job": name,
+            "scoring_task": task_id,
+        }
+        record.update(resume_fields)
+        record.update(change_stamp(company))
+
+        updates[f"users/{key}"] = record
+        updates.update(change_feed_entry(company, key, record["updated_at"]))
+        records.append(record)
+        task_jobs.append({"key": key, "name": name, "keywords": keywords or ""})
+        keys[name] = key
+
+    updates[f"{QUEUE_PATH}/{task_id}"] = {
+        "company": company,
+        "jobs": task_jobs,
+        "resume_ref": resume_fields.get("resume_ref"),
+        "resume_sha256": resume_fields.get("resume_sha256"),
+        "state": "queued",
+        "attempts": 0,
+        "created_at": now,
+        "available_at": now,
+    }
+
+    reference().update(updates)
+    print(f"📥 Scoring task queued: {task_id} ({len(task_jobs)} jobs)")
+
+    for record in records:
+        try:
+            record_added(record)
+        except Exception as e:
+            print(f"⚠️ Failed to update stats: {e}")
+
+    return task_id, keys
+
+
+def enqueue_deferred(company):
+    """
+    إرسال متقدمي شركة المؤجلين في الفرز الأولي (prescreen_action = defer)
+    لطابور التقييم بالـ AI متجاهلين الحد
+
+    متقدمو نفس السيرة الذاتية في مهمة واحدة (طلب AI واحد لكل وظائفهم).
+    الحالة لا تتغير؛ scoring_task يمنع إضافتهم مرتين حتى تنتهي المهمة
+
+    Args:
+        company: اسم الشركة
+
+    Returns:
+        int: عدد المتقدمين الذين أُضيفوا
+    """
+    keywords = {
+        job.get("name"): job.get("value") or ""
+        for job in get_company_jobs(company).values() if isinstance(job, dict)
+    }
+
+    by_resume = {}
+    missing_resume = 0
+    for key, record in get_company_applicants(company).items():
+        if record.get("prescreen_decision") != "deferred" or record.get("scoring_task"):
+            continue
+        if not record.get("resume_ref"):
+            missing_resume += 1
+            continue
+        by_resume.setdefault(record["resume_ref"], []).append((key, record))
+
+    now = _now_ms()
+    updates = {}
+    queued = 0
+    for resume_ref, applicants in by_resume.items():
+        task_id = generate_push_key()
+        updates[f"{QUEUE_PATH}/{task_id}"] = {
+            "company": company,
+            "jobs": [
+                {"key": key, "name": record.get("job"), "keywords": keywords.get(record.get("job"), "")}
+                for key, record in applicants
+            ],
+            "resume_ref": resume_ref,
+            "resume_sha256": applicants[0][1].get("resume_sha256"),
+            "force": True,
+            "state": "queued",
+            "attempts": 0,
+            "created_at": now,
+            "available_at": now,
+        }
+        for key, _ in applicants:
+            updates[f"users/{key}/scoring_task"] = task_id
+            queued += 1
+
+    if updates:
+        reference().update(updates)
+
+    print(f"📥 Deferred applicants queued: {queued} in {len(by_resume)} tasks")
+    if missing_resume:
+        print(f"⚠️ {missing_resume} deferred applicants have no stored resume (run resume_store migration)")
+    return queued
+
+
+def claimable_tasks(limit=10):
+    """
+    المهام الجاهزة للحجز: الجديدة، والمؤجلة التي حان وقتها، ومنتهية الإيجار
+
+    Returns:
+        dict: {task_id: task}
+    """
+    return (
+        reference(QUEUE_PATH)
+        .order_by_child("available_at")
+        .end_at(_now_ms())
+        .limit_to_first(limit)
+        .get()
+    ) or {}
+
+
+def claim_task(task_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    حجز مهمة داخل transaction (عامل واحد فقط ينجح)
+
+    Args:
+        task_id: معرف المهمة
+        worker_id: معرف العامل
+        lease_seconds: مدة الإيجار
+
+    Returns:
+        (task, lease_token) أو (None, None) إذا حجزها عامل آخر
+    """
+    token = uuid.uuid4().hex
+    now = _now_ms()
+
+    def update(task):
+        if not task or task.get("available_at", 0) > now:
+            return task
+
+        if task.get("state") in LEASED_STATES:
+            print(f"♻️ Reclaiming expired lease: {task_id} (was {task.get('worker')})")
+
+        task["state"] = "leased"
+        task["worker"] = worker_id
+        task["lease_token"] = token
+        task["attempts"] = task.get("attempts", 0) + 1
+        task["leased_at"] = now
+        task["available_at"] = now + lease_seconds * 1000
+        return task
+
+    task = _task_ref(task_id).transaction(update)
+    if task and task.get("lease_token") == token:
+        return task, token
+    return None, None
+
+
+def renew_lease(task_id, token, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    تمديد إيجار مهمة جارية
+
+    Returns:
+        bool: False إذا فُقد الإيجار (انتهى وحجزها عامل آخر)
+    """
+    def update(task):
+        if task and task.get("lease_token") == token:
+            task["available_at"] = _now_ms() + lease_seconds * 1000
+        return task
+
+    task = _task_ref(task_id).transaction(update)
+    return bool(task) and task.get("lease_token") == token
+
+
+def release_task(task_id, token):
+    """إرجاع مهمة لم تبدأ للطابور بدون احتسابها كمحاولة"""
+    def update(task):
+        if task and task.get("lease_token") == token:
+            task.update(state="queued", worker=None, lease_token=None,
+                        attempts=max(0, task.get("attempts", 1) - 1),
+                        available_at=_now_ms())
+        return task
+
+    _task_ref(task_id).transaction(update)
+
+
+def _finish_lease(task_id, token, state):
+    """
+    التحقق من الإيجار وتغيير حالة المهمة داخل transaction قبل كتابة النتيجة
+
+    المهمة تبقى محجوزة لهذا العامل مدة إيجار كاملة: لا يحجزها عامل آخر أثناء
+    كتابة النتيجة، وإذا توقف العامل قبل الكتابة تعود للطابور بعدها
+
+    Args:
+        task_id: معرف المهمة
+        token: رمز الإيجار
+        state: completing أو failing
+
+    Returns:
+        bool: False إذا فُقد الإيجار (لا تُكتب النتيجة)
+    """
+    def update(task):
+        if task and task.get("lease_token") == token:
+            task["state"] = state
+            task["available_at"] = _now_ms() + DEFAULT_LEASE_SECONDS * 1000
+        return task
+
+    task = _task_ref(task_id).transaction(update)
+    return bool(task) and task.get("lease_token") == token and task.get("state") == state
+
+
+def _applicant_updates(task, fields_for_job):
+    """
+    تحديثات سجلات المتقدمين والتغيير في العدادات
+
+    الحالة تتغير فقط إذا بقيت Scoring (المدير قد يكون غيّرها أثناء التقييم)،
+    والسجلات المحذوفة أثناء التقييم تُتجاهل
+
+    Returns:
+        (updates, [(job, delta)])
+    """
+    updates = {}
+    deltas = []
+
+    for job in task.get("jobs") or []:
+        old = reference(f"users/{job['key']}").get()
+        if not isinstance(old, dict):
+            continue
+
+        fields = dict(fields_for_job(job), scoring_task=None)
+        if old.get("status") == SCORING_STATUS:
+            fields["status"] = SCORED_STATUS
+        fields.update(change_stamp(task.get("company")))
+
+        for name, value in fields.items():
+            updates[f"users/{job['key']}/{name}"] = value
+        updates.update(change_feed_entry(task.get("company"), job["key"], fields["updated_at"]))
+        deltas.append((job["name"], records_delta(old, dict(old, **fields))))
+
+    return updates, deltas
+
+
+def _apply_deltas(company, deltas):
+    for job, delta in deltas:
+        try:
+            apply_delta(company, job, delta)
+        except Exception as e:
+            print(f"⚠️ Failed to update stats: {e}")
+
+
+def complete_task(task_id, task, token, results):
+    """
+    حفظ نتائج التقييم وحذف المهمة في كتابة واحدة
+
+    Args:
+        task_id: معرف المهمة
+        task: المهمة كما أعادها claim_task
+        token: رمز الإيجار
+        results: jobs من score_resume_for_jobs {اسم الوظيفة: rating, summary, source, fields}
+
+    Returns:
+        bool: False إذا فُقد الإيجار (العامل الذي حجزها بعد ذلك يحفظ النتيجة)
+    """
+    if not _finish_lease(task_id, token, "completing"):
+        print(f"⚠️ Lease lost, discarding result: {task_id}")
+        return False
+
+    def fields_for_job(job):
+        result = results[job["name"]]
+        return dict(result["fields"], **{
+            "raiting": result["rating"],
+            "summary": result["summary"],
+            "scoring_source": result["source"],
+        })
+
+    updates, deltas = _applicant_updates(task, fields_for_job)
+    updates[f"{QUEUE_PATH}/{task_id}"] = None
+    reference().update(updates)
+
+    _apply_deltas(task.get("company"), deltas)
+    print(f"✅ Scoring task done: {task_id}")
+    return True
+
+
+def fail_task(task_id, task, token, error):
+    """
+    تسجيل فشل مهمة: إعادة المحاولة لاحقاً، أو نقلها إلى scoring_failed
+    بعد MAX_ATTEMPTS محاولة مع تحويل المتقدمين للمراجعة اليدوية
+
+    Returns:
+        bool: True إذا نُقلت المهمة إلى scoring_failed
+    """
+    attempts = task.get("attempts", 1)
+
+    if attempts < MAX_ATTEMPTS:
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        available_at = _now_ms() + delay * 1000
+
+        def update(current):
+            if current and current.get("lease_token") == token:
+                current.update(state="queued", worker=None, lease_token=None,
+                               last_error=str(error), available_at=available_at)
+            return current
+
+        # القيمة المحفوظة تحدد إن كان الإيجار ما زال لهذا العامل
+        current = _task_ref(task_id).transaction(update)
+        if not (current and current.get("state") == "queued"
+                and current.get("available_at") == available_at):
+            print(f"⚠️ Lease lost, discarding failure: {task_id}")
+            return False
+
+        print(f"🔁 Scoring task {task_id} failed (attempt {attempts}/{MAX_ATTEMPTS}), retry in {delay}s: {error}")
+        return False
+
+    if not _finish_lease(task_id, token, "failing"):
+        print(f"⚠️ Lease lost, discarding failure: {task_id}")
+        return False
+
+    summary = f"Automatic scoring failed after {attempts} attempts: {error}"
+    updates, deltas = _applicant_updates(task, lambda job: {
+        "summary": summary,
+        "scoring_error": str(error),
+    })
+    updates[f"{QUEUE_PATH}/{task_id}"] = None
+    updates[f"{FAILED_PATH}/{task_id}"] = dict(
+        task, state="failed", worker=None, lease_token=None,
+        last_error=str(error), failed_at=_now_ms()
+    )
+    reference().update(updates)
+
+    _apply_deltas(task.get("company"), deltas)
+    print(f"❌ Scoring task {task_id} moved to {FAILED_PATH}: {error}")
+    return True
+
+
+def retry_failed_tasks():
+    """
+    إعادة كل المهام الفاشلة للطابور (بعد إصلاح السبب)
+
+    Returns:
+        int: عدد المهام
+    """
+    failed = reference(FAILED_PATH).get() or {}
+    if not failed:
+        return 0
+
+    now = _now_ms()
+    updates = {}
+    for task_id, task in failed.items():
+        updates[f"{FAILED_PATH}/{task_id}"] = None
+        updates[f"{QUEUE_PATH}/{task_id}"] = dict(
+            task, state="queued", attempts=0, available_at=now, failed_at=None
+        )
+    reference().update(updates)
+
+    print(f"🔁 Re-queued {len(failed)} failed scoring tasks")
+    return len(failed)
+
+
+def queue_status():
+    """
+    ملخص الطابور
+
+    Returns:
+        dict: queued, leased, failed, oldest_age_seconds
+    """
+    tasks = reference(QUEUE_PATH).get() or {}
+    failed = reference(FAILED_PATH).get(shallow=True) or {}
+    now = _now_ms()
+
+    created = [t.get("created_at", now) for t in tasks.values()]
+    return {
+        "queued": sum(1 for t in tasks.values() if t.get("state") not in LEASED_STATES),
+        "leased": sum(1 for t in tasks.values() if t.get("state") in LEASED_STATES),
+        "failed": len(failed),
+        "oldest_age_seconds": (now - min(created)) / 1000 if created else 0,
+    }
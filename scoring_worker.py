@@ -0,0 +1,234 @@
+"""
+Scoring Worker Module
+عامل تقييم بدون واجهة: يحجز مهام scoring_queue وينفذها بالتوازي
+
+يمكن تشغيل أي عدد من العمال على أجهزة مختلفة؛ كل مهمة تُحجز بإيجار
+يُجدد أثناء التنفيذ، وإذا توقف العامل تعود المهمة للطابور بعد انتهائه
+
+مثال:
+    python scoring_worker.py --workers 4 --rate 30
+    python scoring_worker.py --status
+    python scoring_worker.py --enqueue-deferred "My Company"
+    SCORING_BACKEND=stub STUB_ERROR_RATE=0.05 python scoring_worker.py --workers 16 --rate 0
+"""
+
+import argparse
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk_score import RateLimiter
+from functions import score_resume_for_jobs
+from resume_store import resume_file
+from scoring_backends import BACKENDS, get_scoring_backend, select_scoring_backend
+from scoring_queue import (
+    DEFAULT_LEASE_SECONDS,
+    MAX_ATTEMPTS,
+    claimable_tasks,
+    claim_task,
+    renew_lease,
+    complete_task,
+    fail_task,
+    retry_failed_tasks,
+    enqueue_deferred,
+    queue_status,
+)
+
+
+DEFAULT_POLL_SECONDS = 5
+
+
+def score_task(task, limiter=None):
+    """
+    تقييم مهمة واحدة (كل وظائفها بطلب AI واحد)
+
+    Returns:
+        dict: {اسم الوظيفة: rating, summary, source, fields}
+    """
+    jobs = [(job["name"], job.get("keywords")) for job in task.get("jobs") or []]
+    if not jobs:
+        raise ValueError("Scoring task has no jobs")
+
+    with resume_file(task) as path:
+        scored = score_resume_for_jobs(
+            path, jobs, task.get("company"),
+            before_ai=limiter.acquire if limiter else None,
+            force=bool(task.get("force")),
+        )
+    return scored["jobs"]
+
+
+class ScoringWorker:
+    """حلقة الحجز والتنفيذ وتجديد الإيجارات لعامل واحد"""
+
+    def __init__(self, workers=2, rate=30, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 poll_seconds=DEFAULT_POLL_SECONDS, worker_id=None):
+        """
+        Args:
+            workers: عدد المهام التي تُنفذ في نفس الوقت
+            rate: أقصى عدد طلبات AI في الدقيقة (0 بدون حد)
+            lease_seconds: مدة الإيجار قبل أن تُعتبر المهمة متوقفة
+            poll_seconds: الانتظار عندما يكون الطابور فارغاً
+            worker_id: معرف العامل (الافتراضي host-pid)
+        """
+        self.workers = workers
+        self.limiter = RateLimiter(rate)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = min(poll_seconds, lease_seconds / 3)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.running = {}  # task_id -> (token, future)
+        self.counts = {"done": 0, "retried": 0, "failed": 0}
+        self._last_renewal = 0.0
+
+    def process(self, task_id, task, token):
+        """تنفيذ مهمة محجوزة وتسجيل النتيجة أو الفشل"""
+        if task.get("attempts", 1) > MAX_ATTEMPTS:
+            # عامل سابق توقف أثناءها في كل المحاولات (مثل ملف يسبب انهيار)
+            failed = fail_task(task_id, task, token, "worker stopped while scoring")
+            return "failed" if failed else "retried"
+
+        try:
+            results = score_task(task, self.limiter)
+        except Exception as e:
+            print(f"❌ {task_id}: {e}")
+            failed = fail_task(task_id, task, token, e)
+            return "failed" if failed else "retried"
+
+        complete_task(task_id, task, token, results)
+        return "done"
+
+    def _reap(self):
+        for task_id, (token, future) in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[task_id]
+            try:
+                self.counts[future.result()] += 1
+            except Exception as e:
+                # فشل حفظ النتيجة: الإيجار ينتهي وتعود المهمة للطابور
+                print(f"❌ {task_id}: failed to record result: {e}")
+
+    def _renew(self):
+        if time.monotonic() - self._last_renewal < self.lease_seconds / 3:
+            return
+        self._last_renewal = time.monotonic()
+
+        for task_id, (token, _) in list(self.running.items()):
+            try:
+                if not renew_lease(task_id, token, self.lease_seconds):
+                    print(f"⚠️ Lease lost: {task_id}")
+            except Exception as e:
+                print(f"⚠️ Failed to renew lease {task_id}: {e}")
+
+    def _claim(self, executor):
+        """حجز مهام بعدد الأماكن الفارغة، ويعيد عدد المهام المحجوزة"""
+        free = self.workers - len(self.running)
+        if free <= 0:
+            return 0
+
+        claimed = 0
+        # ضعف العدد لأن عمالاً آخرين قد يسبقوننا لبعضها
+        for task_id in claimable_tasks(free * 2):
+            if claimed >= free:
+                break
+            if task_id in self.running:
+                continue
+
+            task, token = claim_task(task_id, self.worker_id, self.lease_seconds)
+            if task is None:
+                continue
+
+            print(f"📋 Claimed {task_id} (attempt {task['attempts']})")
+            self.running[task_id] = (token, executor.submit(self.process, task_id, task, token))
+            claimed += 1
+
+        return claimed
+
+    def run(self, once=False):
+        """
+        تشغيل العامل حتى Ctrl+C
+
+        Args:
+            once: التوقف عندما يصبح الطابور فارغاً
+        """
+        print(f"👷 Scoring worker {self.worker_id}: {self.workers} workers, "
+              f"lease {self.lease_seconds}s, backend {get_scoring_backend().name}")
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        stopping = False
+
+        try:
+            while True:
+                try:
+                    self._reap()
+                    self._renew()
+
+                    claimed = 0 if stopping else self._claim(executor)
+
+                    if (once or stopping) and not self.running and not claimed:
+                        break
+
+                    time.sleep(0.5 if claimed else self.poll_seconds)
+
+                except KeyboardInterrupt:
+                    if stopping:
+                        raise
+                    stopping = True
+                    print("\n🛑 Stopping: finishing running tasks (Ctrl+C again to abort)")
+
+                except Exception as e:
+                    # انقطاع الشبكة مثلاً: المحاولة في الدورة التالية
+                    print(f"⚠️ Worker loop error: {e}")
+                    time.sleep(self.poll_seconds)
+
+        except KeyboardInterrupt:
+            # المهام الجارية تُترك ويعيدها انتهاء الإيجار للطابور
+            print("\n🛑 Aborted: running tasks will be reclaimed after their lease expires")
+            executor.shutdown(wait=False, cancel_futures=True)
+            return self.counts
+
+        executor.shutdown(wait=True)
+
+        ai = get_scoring_backend().snapshot() or {"count": 0}
+        print(
+            f"✅ Worker stopped: {self.counts['done']} done, {self.counts['retried']} retried, "
+            f"{self.counts['failed']} failed, {ai['count']} AI calls"
+        )
+        return self.counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Claim and score applications from the scoring queue")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=30, help="max AI requests per minute (0 = unlimited)")
+    parser.add_argument("--lease", type=int, default=DEFAULT_LEASE_SECONDS, help="lease seconds per task")
+    parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS)
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    parser.add_argument("--status", action="store_true", help="print queue status and exit")
+    parser.add_argument("--retry-failed", action="store_true", help="re-queue failed tasks and exit")
+    parser.add_argument("--enqueue-deferred", metavar="COMPANY", default=None,
+                        help="queue the company's prescreen-deferred applicants for AI scoring and exit")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="scoring backend (default: SCORING_BACKEND or gemini)")
+    args = parser.parse_args()
+
+    select_scoring_backend(args.backend)
+
+    if args.status:
+        status = queue_status()
+        print(
+            f"📊 Queued: {status['queued']}  Leased: {status['leased']}  Failed: {status['failed']}  "
+            f"Oldest: {status['oldest_age_seconds']:.0f}s"
+        )
+    elif args.retry_failed:
+        retry_failed_tasks()
+    elif args.enqueue_deferred:
+        enqueue_deferred(args.enqueue_deferred)
+    else:
+        ScoringWorker(
+            workers=args.workers,
+            rate=args.rate,
+            lease_seconds=args.lease,
+            poll_seconds=args.poll,
+        ).run(once=args.once)
@@ -0,0 +1,187 @@
+"""
+Search Index Module
+فهرس بحث في الذاكرة لجدول المتقدمين بدل المرور على الصفوف مع كل حرف
+
+لكل كلمة في الاسم والبريد والوظيفة مجموعة أرقام الصفوف التي تحتويها
+(postings)، والمفردات مرتبة فالبادئة تُحل بـ bisect. الحالة والوظيفة
+والتقييم والشهر أوجه بـ bitmap لكل قيمة (facets.py). الفهرس يُبنى مرة
+عند تحميل البيانات ويُحدَّث سجلاً بسجل مع التحديثات الفورية
+"""
+
+import bisect
+
+from facets import FacetIndex
+from prescreen import tokenize
+
+
+# الحقول التي يبحث فيها مربع البحث
+SEARCH_FIELDS = ["full_name", "email", "job"]
+
+
+def bitmap_from_ids(ids):
+    """تحويل أرقام صفوف إلى bitmap"""
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def bitmap_ids(bits):
+    """أرقام الصفوف في bitmap بالترتيب (تتخطى البايتات الفارغة)"""
+    ids = []
+    buf = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for index, byte in enumerate(buf):
+        if byte:
+            base = index * 8
+            ids.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return ids
+
+
+class SearchIndex:
+    """فهرس متقدمي شركة واحدة بمفتاح Firebase"""
+
+    def __init__(self):
+        self.facets = FacetIndex()
+        self.clear()
+
+    def clear(self):
+        self._ids = {}           # firebase_key -> رقم الصف في الفهرس
+        self._keys = []          # رقم الصف -> firebase_key (None بعد الحذف)
+        self._terms = []         # رقم الصف -> كلماته (لإزالتها عند التحديث)
+        self._postings = {}      # كلمة -> set(أرقام الصفوف)
+        self._vocabulary = []    # الكلمات مرتبة للبحث بالبادئة
+        self.facets.clear()
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ===== البناء والتحديث =====
+
+    def build(self, records):
+        """
+        بناء الفهرس من كل السجلات
+
+        Args:
+            records: {firebase_key: بيانات المتقدم}
+        """
+        self.clear()
+        # bitmaps الأوجه تُبنى دفعة واحدة بدل عملية على عدد كبير لكل سجل
+        self.facets.begin_build()
+        for key, record in records.items():
+            row = len(self._keys)
+            self._ids[key] = row
+            self._keys.append(key)
+            self._terms.append(())
+            self._index(row, record, bulk=True)
+
+        self._vocabulary = sorted(self._postings)
+        self.facets.finish_build(bitmap_from_ids)
+
+    def upsert(self, key, record):
+        """إضافة سجل أو تحديث كلماته وحالته"""
+        row = self._ids.get(key)
+        if row is None:
+            row = len(self._keys)
+            self._ids[key] = row
+            self._keys.append(key)
+            self._terms.append(())
+        else:
+            self._unindex(row)
+        self._index(row, record)
+
+    def remove(self, key):
+        """حذف سجل (رقم صفه لا يُعاد استخدامه حتى البناء التالي)"""
+        row = self._ids.pop(key, None)
+        if row is None:
+            return
+        self._unindex(row)
+        self._keys[row] = None
+
+    def _index(self, row, record, bulk=False):
+        terms = set(tokenize(" ".join(str(record.get(field) or "") for field in SEARCH_FIELDS)))
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                if not bulk:
+                    bisect.insort(self._vocabulary, term)
+            postings.add(row)
+
+        self._terms[row] = tuple(terms)
+        self.facets.add(row, self._keys[row], record)
+
+    def _unindex(self, row):
+        for term in self._terms[row]:
+            postings = self._postings[term]
+            postings.discard(row)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+        self._terms[row] = ()
+        self.facets.remove(row)
+
+    # ===== البحث =====
+
+    def _prefix_rows(self, prefix):
+        """الصفوف التي تحتوي كلمة تبدأ بالبادئة"""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff", start)
+        if end - start == 1:
+            return self._postings[self._vocabulary[start]]
+
+        rows = set()
+        for term in self._vocabulary[start:end]:
+            rows |= self._postings[term]
+        return rows
+
+    def text_rows(self, text):
+        """
+        الصفوف المطابقة للنص
+
+        كل كلمة في النص تُطابق كبادئة لكلمة في الاسم أو البريد أو الوظيفة،
+        والصف يجب أن يطابق كل الكلمات
+
+        Returns:
+            set أو None إذا لم يوجد نص
+        """
+        terms = tokenize(text)
+        if not terms:
+            return None
+
+        rows = None
+        # التقاطع يبدأ بالأصغر فلا تُنسخ إلا أصغر مجموعة
+        for matched in sorted((self._prefix_rows(term) for term in set(terms)), key=len):
+            rows = set(matched) if rows is None else rows & matched
+            if not rows:
+                return set()
+        return rows
+
+    def search(self, text="", selections=None, within=None):
+        """
+        مفاتيح السجلات المطابقة وعدد كل خيار في الأوجه
+
+        Args:
+            text: نص البحث
+            selections: {وجه: مجموعة قيم} مثل {"status": {"Approved"}}
+            within: مفاتيح مقيدة مسبقاً (مثل نتائج البحث داخل الملخصات) أو None
+
+        Returns:
+            (set مفاتيح Firebase أو None لإظهار الكل, {وجه: {قيمة: عدد}})
+        """
+        base = None
+        rows = self.text_rows(text)
+        if within is not None:
+            within_rows = {self._ids[key] for key in within if key in self._ids}
+            rows = within_rows if rows is None else rows & within_rows
+        if rows is not None:
+            base = bitmap_from_ids(rows)
+
+        counts = self.facets.counts(selections, base)
+        bits = self.facets.filter_bits(selections, base)
+        if bits is None:
+            return None, counts
+        return {self._keys[row] for row in bitmap_ids(bits)}, counts
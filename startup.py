@@ -0,0 +1,228 @@
+"""
+Startup Module
+تشغيل النوافذ مع قياس زمن البدء (--profile-startup)
+
+لا يستورد هذا الموديول أي مكتبة ثقيلة في أعلاه حتى يمكن تفعيل القياس
+قبل استيراد Qt و Firebase
+
+مثال:
+    python main.py --profile-startup
+    python startup.py admin --profile-startup
+"""
+
+import builtins
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+
+PROFILE_FLAG = "--profile-startup"
+
+# حد زمن البدء بالميلي ثانية (اختياري): الخروج برمز 1 عند تجاوزه
+BUDGET_ENV = "STARTUP_BUDGET_MS"
+
+# النوافذ التي يمكن تشغيلها: (الموديول، الكلاس)
+WINDOWS = {
+    "form": ("main", "ModernResumeApp"),
+    "login": ("login", "CompanyLogin"),
+    "admin": ("admin", "EnhancedAdminPage"),
+}
+
+
+class ImportTimer:
+    """قياس زمن استيراد كل موديول (الزمن الكلي وزمن الموديول نفسه)"""
+
+    def __init__(self):
+        self.times = {}
+        self._stack = []
+        self._thread = threading.get_ident()
+        self._original = None
+
+    def install(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original or builtins.__import__
+
+        # المستورد مسبقاً أو من خيط آخر لا يُقاس
+        if (level == 0 and name in sys.modules) or threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+
+        started = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.times.setdefault(self._full_name(name, globals, level), (elapsed, elapsed - children))
+
+    @staticmethod
+    def _full_name(name, globals, level):
+        if not level:
+            return name
+        package = (globals or {}).get("__package__")
+        if not package:
+            return "." * level + name
+        try:
+            return importlib.util.resolve_name("." * level + name, package)
+        except ImportError:
+            return "." * level + name
+
+    def slowest(self, limit=15):
+        """
+        Returns:
+            list: [(module, cumulative, self)] مرتبة حسب زمن الموديول نفسه
+        """
+        rows = [(name, total, own) for name, (total, own) in self.times.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:limit]
+
+
+class StartupProfile:
+    """علامات زمنية من بدء التشغيل حتى أول رسم للنافذة"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+        self.imports = ImportTimer()
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def total(self):
+        return (self.marks[-1][1] if self.marks else time.perf_counter()) - self.started
+
+    def report(self):
+        print("\n" + "=" * 50)
+        print("⏱️ Startup profile")
+        print("=" * 50)
+
+        previous = self.started
+        for label, timestamp in self.marks:
+            print(f"   {label:<24} {(timestamp - previous) * 1000:>8.1f} ms")
+            previous = timestamp
+        print(f"   {'total':<24} {self.total() * 1000:>8.1f} ms")
+
+        print("\n📦 Slowest imports (self / cumulative):")
+        for name, total, own in self.imports.slowest():
+            print(f"   {name:<40} {own * 1000:>8.1f} ms {total * 1000:>8.1f} ms")
+        print("=" * 50 + "\n")
+
+    def over_budget(self):
+        budget = os.environ.get(BUDGET_ENV)
+        if not budget:
+            return False
+        over = self.total() * 1000 > float(budget)
+        if over:
+            print(f"❌ Startup took {self.total() * 1000:.0f} ms, budget is {budget} ms")
+        return over
+
+
+profile = None
+
+
+def profiling_requested(argv=None):
+    return PROFILE_FLAG in (sys.argv if argv is None else argv)
+
+
+def begin_profile():
+    """بدء القياس (يجب استدعاؤها قبل استيراد أي مكتبة ثقيلة)"""
+    global profile
+    if profile is None:
+        profile = StartupProfile()
+        profile.imports.install()
+    return profile
+
+
+def mark(label):
+    """إضافة علامة زمنية إذا كان القياس مفعلاً"""
+    if profile is not None:
+        profile.mark(label)
+
+
+def _watch_first_paint(window, app):
+    """طباعة التقرير والخروج بعد أول رسم للنافذة"""
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                mark("first paint")
+                profile.imports.uninstall()
+                QTimer.singleShot(0, finish)
+            return False
+
+    def finish():
+        profile.report()
+        app.exit(1 if profile.over_budget() else 0)
+
+    window._first_paint_filter = FirstPaintFilter(window)
+    window.installEventFilter(window._first_paint_filter)
+
+
+def run_window(window_class, font=None, style=None, palette=None):
+    """
+    إنشاء QApplication وعرض النافذة
+
+    Args:
+        window_class: كلاس النافذة
+        font: خط التطبيق (اختياري)
+        style: نمط Qt (اختياري)
+        palette: ألوان التطبيق (اختياري)
+    """
+    from PyQt5.QtWidgets import QApplication
+
+    mark("imports")
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    if style:
+        app.setStyle(style)
+    if palette is not None:
+        app.setPalette(palette)
+    if font is not None:
+        app.setFont(font)
+    mark("QApplication")
+
+    window = window_class()
+    mark("window constructed")
+
+    window.show()
+    mark("window shown")
+
+    if profile is not None:
+        _watch_first_paint(window, app)
+
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    # النوافذ تستورد "startup" فيجب أن تحصل على نفس النسخة
+    sys.modules.setdefault("startup", sys.modules[__name__])
+
+    if profiling_requested():
+        begin_profile()
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Start a Recruitmentify window")
+    parser.add_argument("window", nargs="?", choices=sorted(WINDOWS), default="form")
+    parser.add_argument(PROFILE_FLAG, action="store_true",
+                        help="print an import-time and first-paint breakdown, then exit")
+    args, _ = parser.parse_known_args()
+
+    module_name, class_name = WINDOWS[args.window]
+    __import__(module_name)  # عبر builtins.__import__ حتى يُقاس
+    window_class = getattr(sys.modules[module_name], class_name)
+    run_window(window_class, style="Fusion" if args.window == "admin" else None)
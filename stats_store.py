@@ -0,0 +1,248 @@
+"""
+Stats Store Module
+عدادات مجمّعة لكل شركة ووظيفة في stats/{company}/{job} تُحدَّث بشكل ذري
+"""
+
+from firebase_connection import reference
+
+from queries import get_company_applicants
+from utils import encode_key
+
+
+STATS_PATH = "stats"
+
+# الحالة -> اسم العداد
+STATUS_COUNTERS = {
+    "Approved": "approved",
+    "Pending": "pending",
+    "Rejected": "rejected",
+}
+
+COUNTERS = ["total", "approved", "pending", "rejected", "rating_sum", "rating_count"]
+
+
+def _job_key(job):
+    # وظيفة بدون اسم تحتاج مفتاحاً غير فارغ
+    return encode_key(job) or "_"
+
+
+def _stats_ref(company, job=None):
+    path = f"{STATS_PATH}/{encode_key(company)}"
+    if job is not None:
+        path += f"/{_job_key(job)}"
+    return reference(path)
+
+
+def _rating_value(record):
+    rating = record.get("raiting", 0)
+    if not rating:
+        return None
+    try:
+        return float(rating)
+    except (TypeError, ValueError):
+        return None
+
+
+def record_delta(record, sign=1):
+    """
+    حساب التغيير في العدادات الناتج عن إضافة أو حذف سجل
+
+    Args:
+        record: سجل المتقدم
+        sign: 1 للإضافة، -1 للحذف
+
+    Returns:
+        dict: {counter: delta}
+    """
+    delta = {"total": sign}
+
+    counter = STATUS_COUNTERS.get(record.get("status"))
+    if counter:
+        delta[counter] = sign
+
+    rating = _rating_value(record)
+    if rating is not None:
+        delta["rating_sum"] = sign * rating
+        delta["rating_count"] = sign
+
+    return delta
+
+
+def apply_delta(company, job, delta):
+    """
+    تطبيق تغيير على عدادات وظيفة داخل transaction
+
+    Args:
+        company: اسم الشركة
+        job: اسم الوظيفة
+        delta: {counter: delta}
+    """
+    if not company or not delta:
+        return
+
+    job = job or ""
+
+    def update(current):
+        current = current or {"job": job}
+        for counter, change in delta.items():
+            current[counter] = current.get(counter, 0) + change
+        return current
+
+    _stats_ref(company, job).transaction(update)
+
+
+def record_added(record):
+    """تحديث العدادات بعد إضافة متقدم"""
+    apply_delta(record.get("company"), record.get("job"), record_delta(record, 1))
+
+
+def record_removed(record):
+    """تحديث العدادات بعد حذف متقدم"""
+    apply_delta(record.get("company"), record.get("job"), record_delta(record, -1))
+
+
+def record_status_changed(record, old_status, new_status):
+    """
+    تحديث العدادات بعد تغيير حالة متقدم
+
+    Args:
+        record: سجل المتقدم (يحتوي company و job)
+        old_status: الحالة السابقة
+        new_status: الحالة الجديدة
+    """
+    if old_status == new_status:
+        return
+
+    delta = {}
+    old_counter = STATUS_COUNTERS.get(old_status)
+    new_counter = STATUS_COUNTERS.get(new_status)
+    if old_counter:
+        delta[old_counter] = -1
+    if new_counter:
+        delta[new_counter] = delta.get(new_counter, 0) + 1
+
+    apply_delta(record.get("company"), record.get("job"), delta)
+
+
+def records_delta(old_record, new_record):
+    """
+    التغيير في العدادات عند تعديل سجل (مثل تغيير التقييم)
+
+    Args:
+        old_record: السجل قبل التعديل
+        new_record: السجل بعد التعديل (نفس الشركة والوظيفة)
+
+    Returns:
+        dict: {counter: delta} بدون القيم الصفرية
+    """
+    delta = record_delta(new_record, 1)
+    for counter, change in record_delta(old_record, -1).items():
+        delta[counter] = delta.get(counter, 0) + change
+    return {counter: change for counter, change in delta.items() if change}
+
+
+def summarize_jobs(jobs):
+    """
+    جمع عدادات الوظائف في إحصائيات الشركة
+
+    Args:
+        jobs: {job_key: عدادات الوظيفة}
+
+    Returns:
+        dict: total, pending, approved, rejected, avg_rating, by_job
+    """
+    stats = {counter: 0 for counter in COUNTERS}
+    by_job = {}
+
+    for job_stats in (jobs or {}).values():
+        if not isinstance(job_stats, dict):
+            continue
+        for counter in COUNTERS:
+            stats[counter] += job_stats.get(counter, 0)
+        by_job[job_stats.get("job", "")] = job_stats.get("total", 0)
+
+    rating_count = stats.pop("rating_count")
+    rating_sum = stats.pop("rating_sum")
+    stats["avg_rating"] = rating_sum / rating_count if rating_count else 0
+    stats["by_job"] = by_job
+
+    return stats
+
+
+def get_company_stats(company):
+    """
+    قراءة إحصائيات شركة من العقدة المجمّعة (قراءة واحدة صغيرة)
+
+    Args:
+        company: اسم الشركة
+
+    Returns:
+        dict: إحصائيات الشركة
+    """
+    return summarize_jobs(_stats_ref(company).get())
+
+
+def compute_stats(records):
+    """
+    حساب العدادات من الصفر لمجموعة سجلات
+
+    Returns:
+        dict: {company: {job: عدادات}}
+    """
+    result = {}
+
+    for record in records:
+        if not isinstance(record, dict) or not record.get("company"):
+            continue
+        job = record.get("job") or ""
+        jobs = result.setdefault(record["company"], {})
+        current = jobs.setdefault(job, {"job": job})
+        for counter, change in record_delta(record, 1).items():
+            current[counter] = current.get(counter, 0) + change
+
+    return result
+
+
+def rebuild_stats(company=None):
+    """
+    إعادة بناء العدادات من سجلات المتقدمين (مهمة المطابقة)
+
+    Args:
+        company: شركة واحدة، أو None لكل الشركات
+    """
+    if company:
+        records = get_company_applicants(company).values()
+        targets = [company]
+    else:
+        records = (reference("users").get() or {}).values()
+        targets = None
+
+    computed = compute_stats(records)
+
+    if targets is None:
+        # كل الشركات: استبدال العقدة بالكامل
+        reference(STATS_PATH).set({
+            encode_key(c): {_job_key(j): s for j, s in jobs.items()}
+            for c, jobs in computed.items()
+        })
+    else:
+        for c in targets:
+            jobs = computed.get(c)
+            if jobs:
+                _stats_ref(c).set({_job_key(j): s for j, s in jobs.items()})
+            else:
+                _stats_ref(c).delete()
+
+    print(f"✅ Stats rebuilt for {len(computed) if targets is None else len(targets)} companies")
+    return computed
+
+
+# مهمة المطابقة
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild stats/{company}/{job} from users")
+    parser.add_argument("--company", default=None)
+    args = parser.parse_args()
+
+    rebuild_stats(args.company)
@@ -0,0 +1,163 @@
+"""
+Submission Worker Module
+إرسال طلبات التقديم (حفظ الملف، الإضافة لطابور التقييم) في QThreadPool
+بعيداً عن واجهة المستخدم؛ التقييم نفسه يتم في scoring_worker.py
+"""
+
+import threading
+import uuid
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from resume_store import store_resume_file
+from scoring_queue import enqueue_application
+
+
+# مراحل الطلب بالترتيب: (الاسم، العنوان المعروض)
+STAGES = [
+    ("upload", "رفع الملف"),
+    ("queue", "الإضافة لطابور التقييم"),
+]
+
+STAGE_LABELS = dict(STAGES)
+
+# عدد الطلبات التي تُعالج في نفس الوقت
+DEFAULT_MAX_WORKERS = 4
+
+
+class SubmissionCancelled(Exception):
+    """تم إلغاء الطلب قبل الحفظ"""
+
+
+class SubmissionSignals(QObject):
+    """
+    إشارات طلب واحد (QRunnable لا يرث QObject)
+
+    تُنشأ في خيط الواجهة لذلك تصل الإشارات إليه عبر queued connection
+    """
+
+    stage = pyqtSignal(str, str)        # submission_id, stage
+    finished = pyqtSignal(str, dict)    # submission_id, result
+    failed = pyqtSignal(str, str)       # submission_id, error
+    cancelled = pyqtSignal(str)         # submission_id
+
+
+class SubmissionTask(QRunnable):
+    """طلب تقديم واحد (لوظيفة أو أكثر): رفع الملف ← الإضافة للطابور"""
+
+    def __init__(self, submission_id, application):
+        """
+        Args:
+            submission_id: معرف الطلب
+            application: full_name, email, company, jobs [(name, keywords)], file_path
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.submission_id = submission_id
+        self.application = application
+        self.signals = SubmissionSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """
+        طلب الإلغاء
+
+        الطلب الجاري لا يمكن قطعه في منتصف اتصال الشبكة، فيتوقف عند
+        بداية المرحلة التالية. بعد بدء الإضافة للطابور لا يمكن الإلغاء.
+        """
+        self._cancel.set()
+
+    def _enter(self, stage):
+        if self._cancel.is_set():
+            raise SubmissionCancelled()
+        self.signals.stage.emit(self.submission_id, stage)
+
+    def run(self):
+        app = self.application
+
+        try:
+            # الملف يُخزَّن مرة واحدة حسب بصمته
+            self._enter("upload")
+            resume_fields = store_resume_file(app["file_path"])
+
+            # السجلات والمهمة في كتابة واحدة، والتقييم في عامل منفصل
+            self._enter("queue")
+            task_id, keys = enqueue_application(
+                app["full_name"], app["email"], app["company"], app["jobs"], resume_fields
+            )
+
+            self.signals.finished.emit(self.submission_id, {"task_id": task_id, "keys": keys})
+
+        except SubmissionCancelled:
+            print(f"🚫 Submission cancelled: {self.submission_id}")
+            self.signals.cancelled.emit(self.submission_id)
+
+        except Exception as e:
+            print(f"❌ Submission failed ({self.submission_id}): {e}")
+            self.signals.failed.emit(self.submission_id, str(e))
+
+
+class SubmissionPool(QObject):
+    """إدارة الطلبات الجارية وتجميع إشاراتها"""
+
+    stageChanged = pyqtSignal(str, str)
+    finished = pyqtSignal(str, dict)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.tasks = {}
+
+    def submit(self, application):
+        """
+        إضافة طلب إلى الطابور
+
+        Args:
+            application: full_name, email, company, jobs [(name, keywords)], file_path
+
+        Returns:
+            str: معرف الطلب
+        """
+        submission_id = uuid.uuid4().hex[:8]
+        task = SubmissionTask(submission_id, dict(application))
+
+        task.signals.stage.connect(self.stageChanged)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.cancelled.connect(self._on_cancelled)
+
+        self.tasks[submission_id] = task
+        self.pool.start(task)
+        return submission_id
+
+    def cancel(self, submission_id):
+        """إلغاء طلب: يُحذف من الطابور إن لم يبدأ، وإلا يتوقف عند المرحلة التالية"""
+        task = self.tasks.get(submission_id)
+        if task is None:
+            return
+
+        if self.pool.tryTake(task):
+            self._on_cancelled(submission_id)
+        else:
+            task.cancel()
+
+    def active_count(self):
+        return len(self.tasks)
+
+    def wait_for_done(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _on_finished(self, submission_id, result):
+        self.tasks.pop(submission_id, None)
+        self.finished.emit(submission_id, result)
+
+    def _on_failed(self, submission_id, error):
+        self.tasks.pop(submission_id, None)
+        self.failed.emit(submission_id, error)
+
+    def _on_cancelled(self, submission_id):
+        self.tasks.pop(submission_id, None)
+        self.cancelled.emit(submission_id)
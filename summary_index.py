@@ -0,0 +1,127 @@
+"""
+Summary Index Module
+بحث نصي مرتب (BM25) داخل ملخصات الـ AI في القاعدة المحلية
+
+جدول FTS5 خارجي المحتوى فوق users.summary تحدّثه triggers مع كل كتابة
+في users، فالفهرس يبقى محدّثاً مع المزامنة والتحديثات الفورية بدون إعادة
+بناء. الاستعلام يدعم العبارات بين علامتي تنصيص والبادئات بـ *
+"""
+
+import re
+import sqlite3
+
+
+# أقصى عدد نتائج للبحث
+DEFAULT_LIMIT = 500
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS summary_fts USING fts5(
+    summary,
+    content='users',
+    content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS users_summary_ai AFTER INSERT ON users BEGIN
+    INSERT INTO summary_fts(rowid, summary) VALUES (new.rowid, new.summary);
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_summary_ad AFTER DELETE ON users BEGIN
+    INSERT INTO summary_fts(summary_fts, rowid, summary) VALUES ('delete', old.rowid, old.summary);
+END;
+
+CREATE TRIGGER IF NOT EXISTS users_summary_au AFTER UPDATE OF summary ON users BEGIN
+    INSERT INTO summary_fts(summary_fts, rowid, summary) VALUES ('delete', old.rowid, old.summary);
+    INSERT INTO summary_fts(rowid, summary) VALUES (new.rowid, new.summary);
+END;
+"""
+
+# عبارة بين علامتي تنصيص، أو كلمة (مع * اختيارية للبادئة)
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def install_summary_index(conn):
+    """
+    إنشاء جدول الفهرس وال triggers (وفهرسة السجلات الموجودة أول مرة)
+
+    Args:
+        conn: اتصال القاعدة المحلية
+
+    Returns:
+        bool: False إذا كانت نسخة SQLite بدون FTS5
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'summary_fts'"
+    ).fetchone()
+
+    try:
+        conn.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Summary search unavailable (SQLite without FTS5): {e}")
+        return False
+
+    if not exists:
+        conn.execute("INSERT INTO summary_fts(summary_fts) VALUES ('rebuild')")
+        conn.commit()
+        print("🔎 Summary search index built")
+
+    return True
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def to_match_query(text):
+    """
+    تحويل نص المستخدم إلى استعلام FTS5 آمن
+
+    كل الكلمات مطلوبة، "عبارة" تُطابق كلماتها متتالية، وكلمة* تُطابق كبادئة.
+    رموز FTS5 الأخرى (OR، NEAR، الأقواس) تُعامل ككلمات عادية
+
+    Returns:
+        str أو None إذا لم يوجد ما يُبحث عنه
+    """
+    parts = []
+    for phrase, word in _QUERY_PART.findall(text or ""):
+        if phrase.strip():
+            parts.append(_quote(phrase.strip()))
+        elif word:
+            prefix = word.endswith("*")
+            word = word.rstrip("*")
+            if re.search(r"\w", word):
+                parts.append(_quote(word) + ("*" if prefix else ""))
+    return " ".join(parts) or None
+
+
+def search_summaries(conn, company, text, limit=DEFAULT_LIMIT):
+    """
+    البحث في ملخصات متقدمي شركة مرتبة حسب BM25
+
+    Args:
+        conn: اتصال القاعدة المحلية
+        company: اسم الشركة
+        text: نص البحث
+        limit: أقصى عدد نتائج
+
+    Returns:
+        (list, bool): [(firebase_key, score)] الأفضل أولاً (score أقل = أفضل)،
+                      و True إذا وُجدت نتائج أكثر من limit لم تُعاد
+    """
+    query = to_match_query(text)
+    if not query:
+        return [], False
+
+    rows = conn.execute(
+        """
+        SELECT u.key, bm25(summary_fts) AS score
+        FROM summary_fts
+        JOIN users u ON u.rowid = summary_fts.rowid
+        WHERE summary_fts MATCH ? AND u.company = ?
+        ORDER BY score
+        LIMIT ?
+        """,
+        (query, company, limit + 1),
+    ).fetchall()
+    # صف إضافي لمعرفة هل قُطعت النتائج
+    return [(row[0], row[1]) for row in rows[:limit]], len(rows) > limit
@@ -42,6 +42,31 @@ def get_app_directory():
         return os.path.dirname(os.path.abspath(__file__))
 
 
+# الأحرف غير المسموحة في مفاتيح Firebase
+_FIREBASE_KEY_ESCAPES = {
+    "%": "%25",
+    ".": "%2E",
+    "#": "%23",
+    "$": "%24",
+    "[": "%5B",
+    "]": "%5D",
+    "/": "%2F",
+}
+
+
+def encode_key(text):
+    """
+    تحويل نص (بريد، اسم شركة، اسم وظيفة) إلى مفتاح Firebase صالح
+    
+    Args:
+        text: النص الأصلي
+        
+    Returns:
+        المفتاح
+    """
+    return "".join(_FIREBASE_KEY_ESCAPES.get(ch, ch) for ch in str(text))
+
+
 def ensure_directory_exists(directory):
     """
     التأكد من وجود مجلد، إنشاؤه إذا لم يكن موجوداً